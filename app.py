@@ -1,74 +1,121 @@
 import time
+from collections import deque
+from itertools import islice
+
 import streamlit as st
 
 from ui.runner import start_background_loop, stop_background_loop, RunnerState
-from ui.engine_bridge import run_engine_for_ui, EngineConfig
+from ui.engine_bridge import run_engine_for_ui, EngineConfig, MESSAGE_TYPES
+from runtime.sampling import SAMPLERS
+from ui.history import MetricsHistory
+from ui.process_runner import start_engine_process
+from storage.timeseries import TimeSeriesStore
 
 
 # ---------------- Helpers ----------------
 
+EPS_COLUMNS = ("ingest_eps", "process_eps", "aggregate_eps")
+LAT_COLUMNS = ("lat_avg_ms", "lat_p50_ms", "lat_p95_ms")
+DROP_COLUMNS = ("drop_ratio", "dropped_total")
+
 def ensure_state():
     if "runner" not in st.session_state:
         st.session_state.runner = RunnerState()
-    if "buffer" not in st.session_state:
-        st.session_state.buffer = []
+    if "rings" not in st.session_state:
+        st.session_state.rings = {kind: deque(maxlen=2000) for kind in MESSAGE_TYPES}
     if "last_drained_at" not in st.session_state:
         st.session_state.last_drained_at = 0.0
+    if "sampling" not in st.session_state:
+        st.session_state.sampling = None
     if "metrics_history" not in st.session_state:
-        st.session_state.metrics_history = []
+        st.session_state.metrics_history = MetricsHistory(EPS_COLUMNS + LAT_COLUMNS + DROP_COLUMNS)
+        st.session_state.metrics_last_id = None
     if "last_engine_cfg" not in st.session_state:
         st.session_state.last_engine_cfg = None
+    if "store" not in st.session_state:
+        st.session_state.store = TimeSeriesStore()
 
 
 def is_running(state: RunnerState) -> bool:
     return state.thread is not None and state.thread.is_alive()
 
 
+def resize_rings(max_items: int):
+    rings = st.session_state.rings
+    if rings["event"].maxlen != max_items:
+        st.session_state.rings = {kind: deque(rings[kind], maxlen=max_items) for kind in MESSAGE_TYPES}
+
+
 def drain_queue(state: RunnerState, limit: int = 300):
+    """Moves up to ``limit`` envelopes into the per-type rings; returns the number of items."""
     if state.out_queue is None:
         return 0
 
+    rings = st.session_state.rings
     drained = 0
-    while drained < limit:
+    for _ in range(limit):
         try:
-            item = state.out_queue.get_nowait()
+            env = state.out_queue.get_nowait()
         except Exception:
             break
-        st.session_state.buffer.append(item)
-        drained += 1
+        rings[env["type"]].extend(env["items"])
+        if "sampling" in env:
+            st.session_state.sampling = env["sampling"]
+        if env["type"] == "metrics":
+            for snap in env["items"]:
+                push_metrics_history(snap, env["ts"])
+        drained += len(env["items"])
 
     st.session_state.last_drained_at = time.time()
     return drained
 
 
-def trim_buffer(max_items: int):
-    if len(st.session_state.buffer) > max_items:
-        st.session_state.buffer = st.session_state.buffer[-max_items:]
+def tail(ring, n: int):
+    return list(islice(reversed(ring), n))[::-1]
 
 
-def split_buffer(items):
-    events = [x for x in items if x.get("type") == "event"]
-    aggs = [x for x in items if x.get("type") == "agg"]
-    metrics = [x for x in items if x.get("type") == "metrics"]
-    return events, aggs, metrics
+def latest(ring):
+    return ring[-1] if ring else None
 
 
-def latest_metrics(metrics_items):
-    if not metrics_items:
-        return None
-    return metrics_items[-1].get("data")
-
-
-def push_metrics_history(snap: dict | None):
+def push_metrics_history(snap: dict | None, ts: float):
     if not snap:
         return
 
     cur_id = (snap.get("ingested_total"), snap.get("processed_total"), snap.get("aggregated_total"))
-    last_id = st.session_state.metrics_history[-1]["_id"] if st.session_state.metrics_history else None
-
-    if cur_id != last_id:
-        st.session_state.metrics_history.append({"_id": cur_id, "ts": time.time(), "snap": snap})
-        st.session_state.metrics_history = st.session_state.metrics_history[-200:]
+    if cur_id == st.session_state.metrics_last_id:
+        return
+    st.session_state.metrics_last_id = cur_id
+
+    rates = snap.get("rates_eps", {}) or {}
+    lat = snap.get("event_processing_latency_ms", {}) or {}
+    dropped = snap.get("dropped_total", 0) or 0
+    processed = snap.get("processed_total", 0) or 0
+
+    # the snapshot's own time: one rerun may drain several, possibly late
+    st.session_state.metrics_history.append(ts, {
+        "ingest_eps": safe_float(rates.get("ingest")),
+        "process_eps": safe_float(rates.get("process")),
+        "aggregate_eps": safe_float(rates.get("aggregate")),
+        "lat_avg_ms": safe_float(lat.get("avg_ms")),
+        "lat_p50_ms": safe_float(lat.get("p50_ms")),
+        "lat_p95_ms": safe_float(lat.get("p95_ms")),
+        "drop_ratio": (dropped / processed) if processed else 0.0,
+        "dropped_total": safe_float(dropped),
+    })
+
+
+def span_label(hist: MetricsHistory, level: int) -> str:
+    # raw level: what it holds so far; coarser levels: what they hold once full
+    seconds = hist.span_seconds(level)
+    width = hist.levels[level].width
+    if seconds >= 3600:
+        span = f"{seconds / 3600:.3g} h"
+    elif seconds >= 60:
+        span = f"{seconds / 60:.3g} min"
+    else:
+        span = f"{seconds:.0f} s"
+    return f"Last {span} ({f'{width:g} s' if width else 'raw'})"
 
 
 def safe_float(x, default=0.0):
@@ -86,8 +133,8 @@ ensure_state()
 st.sidebar.title("📡 Control Panel")
 
 refresh_ms = st.sidebar.slider("Refresh interval (ms)", 100, 2000, 300, 50)
-max_buffer = st.sidebar.slider("Max buffer size", 200, 8000, 2000, 200)
-drain_limit = st.sidebar.slider("Drain per tick", 50, 1000, 300, 50)
+max_buffer = st.sidebar.slider("Max buffer size (per type)", 200, 8000, 2000, 200)
+drain_limit = st.sidebar.slider("Envelopes drained per tick", 50, 1000, 300, 50)
 
 st.sidebar.divider()
 
@@ -111,8 +158,23 @@ cfg = EngineConfig(
     merged_queue_size=int(merged_queue_size),
 )
 
+separate_process = st.sidebar.toggle(
+    "Run engine in separate process",
+    value=False,
+    help="Keeps dashboard reruns from competing with event processing for the GIL. Applies on next start.",
+)
+
+st.sidebar.subheader("🧾 Raw event tap")
+tap_mode = st.sidebar.selectbox(
+    "Sampling",
+    ["rate", "reservoir", "off"],
+    format_func={"rate": "Rate-limited (1 per source / 100 ms)", "reservoir": "Reservoir (25 per tick)", "off": "Off"}.get,
+    help="Off removes the tap from the pipeline entirely. Applies on next start.",
+)
+errors_always = st.sidebar.checkbox("Always show errors", value=True, disabled=tap_mode == "off")
+
 if st.session_state.last_engine_cfg != cfg:
-    st.session_state.metrics_history = []
+    st.session_state.metrics_history.clear()
     st.session_state.last_engine_cfg = cfg
 
 c1, c2 = st.sidebar.columns(2)
@@ -120,17 +182,25 @@ c1, c2 = st.sidebar.columns(2)
 with c1:
     if st.sidebar.button("▶ Start", type="primary", use_container_width=True):
         if not is_running(st.session_state.runner):
-            st.session_state.runner = start_background_loop(run_engine_for_ui, cfg)
+            sampler = SAMPLERS[tap_mode](errors_always=errors_always) if tap_mode != "off" else None
+            st.session_state.sampling = None
+            if separate_process:
+                st.session_state.runner = start_engine_process(cfg, st.session_state.store, sampler=sampler)
+            else:
+                st.session_state.runner = start_background_loop(
+                    run_engine_for_ui, cfg, st.session_state.store, sampler=sampler
+                )
 
 with c2:
     if st.sidebar.button("⏹ Stop", use_container_width=True):
         stop_background_loop(st.session_state.runner)
 
 if st.sidebar.button("🧹 Clear buffer", use_container_width=True):
-    st.session_state.buffer = []
+    for ring in st.session_state.rings.values():
+        ring.clear()
 
 if st.sidebar.button("🧹 Clear charts history", use_container_width=True):
-    st.session_state.metrics_history = []
+    st.session_state.metrics_history.clear()
 
 running = is_running(st.session_state.runner)
 st.sidebar.success("RUNNING ✅" if running else "STOPPED ⏹️")
@@ -143,20 +213,17 @@ else:
     st.success("✅ Normal mode — stable operation expected")
 st.caption("Asyncio streaming pipeline • map/filter/window/reduce • tumbling windows • live metrics")
 
+resize_rings(max_buffer)
 drained_now = drain_queue(st.session_state.runner, limit=drain_limit)
-trim_buffer(max_buffer)
 
-items = st.session_state.buffer
-events, aggs, metrics_items = split_buffer(items)
-snap = latest_metrics(metrics_items)
-
-push_metrics_history(snap)
+rings = st.session_state.rings
+snap = latest(rings["metrics"])
 
 k1, k2, k3, k4 = st.columns(4)
 k1.metric("Queue drained (this tick)", drained_now)
-k2.metric("Buffered updates", len(items))
-k3.metric("Agg windows seen", len(aggs))
-k4.metric("Metrics snapshots", len(metrics_items))
+k2.metric("Buffered updates", sum(len(r) for r in rings.values()))
+k3.metric("Agg windows seen", len(rings["agg"]))
+k4.metric("Metrics snapshots", len(rings["metrics"]))
 
 st.divider()
 
@@ -169,8 +236,17 @@ col_raw, col_agg = st.columns([1.2, 1.0], gap="large")
 with col_raw:
     with st.expander("🧾 Raw data generated (unprocessed)", expanded=True):
         st.caption("Events produced by sources before windowing/aggregation.")
-        raw_payloads = [x.get("data") for x in events[-25:]]
-        if not raw_payloads:
+        sampling = st.session_state.sampling
+        if sampling:
+            seen = sampling["sampled_total"] + sampling["skipped_total"]
+            st.caption(
+                f"Sampled {sampling['sampled_total']:,} of {seen:,} events ({sampling['fraction']:.1%}); "
+                f"{sampling['skipped_total']:,} skipped."
+            )
+        raw_payloads = tail(rings["event"], 25)
+        if not raw_payloads and tap_mode == "off":
+            st.info("Raw event tap is off.")
+        elif not raw_payloads:
             st.info("No raw events yet. Press Start.")
         else:
             st.json(raw_payloads)
@@ -178,7 +254,7 @@ with col_raw:
 with col_agg:
     with st.expander("🪟 Aggregated windows", expanded=True):
         st.caption("Tumbling-window outputs (aggregated events).")
-        agg_payloads = [x.get("data") for x in aggs[-15:]]
+        agg_payloads = tail(rings["agg"], 15)
         if not agg_payloads:
             st.info("No aggregations yet. Wait ~5 seconds after Start.")
         else:
@@ -213,6 +289,43 @@ with st.expander("✅ KPIs (derived from metrics snapshot)", expanded=True):
         c3.metric("Latency p95 (ms)", f"{safe_float(lat.get('p95_ms')):.3f}")
         c4.metric("Dropped total", int(dropped))
 
+        loop = snap.get("loop", {}) or {}
+        if loop:
+            lag = loop.get("lag_ms", {}) or {}
+            l1, l2, l3, l4 = st.columns(4)
+            l1.metric("Loop lag p50 (ms)", f"{safe_float(lag.get('p50_ms')):.2f}")
+            l2.metric("Loop lag p99 (ms)", f"{safe_float(lag.get('p99_ms')):.2f}")
+            l3.metric("Asyncio tasks", int(loop.get("tasks_total", 0) or 0))
+            l4.metric("Slow callbacks", int(loop.get("slow_callbacks_total", 0) or 0))
+            if loop.get("slow_callbacks"):
+                with st.expander("Recent slow callbacks", expanded=False):
+                    st.json(loop["slow_callbacks"][-5:])
+
+        freshness = snap.get("result_freshness_ms", {}) or {}
+        if freshness:
+            st.caption("Result freshness: emit time minus oldest contributing event (ms)")
+            fcols = st.columns(len(freshness))
+            for col, (src, f) in zip(fcols, freshness.items()):
+                oldest = f.get("oldest", {}) or {}
+                col.metric(f"{src} p95", f"{safe_float(oldest.get('p95_ms')):.0f}")
+
+        stages = snap.get("stage_latency_ms", {}) or {}
+        if stages:
+            st.caption("Per-stage latency (sampled, ms)")
+            st.bar_chart(
+                [
+                    {
+                        "stage": stage,
+                        "p50": safe_float(s.get("p50_ms")),
+                        "p95": safe_float(s.get("p95_ms")),
+                        "p99": safe_float(s.get("p99_ms")),
+                    }
+                    for stage, s in stages.items()
+                ],
+                x="stage",
+                y=["p50", "p95", "p99"],
+            )
+
         with st.expander("Details (raw snapshot JSON)", expanded=False):
             st.json(snap)
 
@@ -223,49 +336,56 @@ st.divider()
 # ======================
 
 with st.expander("📊 Performance graphs", expanded=True):
-    hist = st.session_state.metrics_history
+    hist: MetricsHistory = st.session_state.metrics_history
 
-    if not hist:
+    if not len(hist):
         st.info("No history yet. Start the engine and wait a few seconds.")
     else:
-        eps_series = []
-        lat_series = []
-        drop_series = []
-
-        for p in hist:
-            s = p["snap"]
-            rates = s.get("rates_eps", {}) or {}
-            lat = s.get("event_processing_latency_ms", {}) or {}
-            dropped = s.get("dropped_total", 0) or 0
-            processed = s.get("processed_total", 0) or 0
-            ratio = (dropped / processed) if processed else 0.0
-
-            eps_series.append({
-                "ingest_eps": safe_float(rates.get("ingest")),
-                "process_eps": safe_float(rates.get("process")),
-                "aggregate_eps": safe_float(rates.get("aggregate")),
-            })
-            lat_series.append({
-                "lat_avg_ms": safe_float(lat.get("avg_ms")),
-                "lat_p50_ms": safe_float(lat.get("p50_ms")),
-                "lat_p95_ms": safe_float(lat.get("p95_ms")),
-            })
-            drop_series.append({
-                "drop_ratio": safe_float(ratio),
-                "dropped_total": safe_float(dropped),
-            })
-
-        g1, g2 = st.columns(2)
-        with g1:
-            st.subheader("EPS (events/sec)")
-            st.line_chart(eps_series)
-
-        with g2:
-            st.subheader("Latency (ms)")
-            st.line_chart(lat_series)
-
-        st.subheader("Drops")
-        st.line_chart(drop_series)
+        h1, h2 = st.columns([2, 1])
+        level = h1.radio(
+            "Span",
+            range(len(hist.levels)),
+            format_func=lambda i: span_label(hist, i),
+            horizontal=True,
+        )
+        max_points = h2.slider("Points per chart", 50, 1000, 300, 50)
+
+        if not len(hist.levels[level]):
+            st.info("No complete bucket at this resolution yet.")
+        else:
+            g1, g2 = st.columns(2)
+            with g1:
+                st.subheader("EPS (events/sec)")
+                st.line_chart(hist.chart(EPS_COLUMNS, max_points, level), x="time")
+
+            with g2:
+                st.subheader("Latency (ms)")
+                st.line_chart(hist.chart(LAT_COLUMNS, max_points, level), x="time")
+
+            st.subheader("Drops")
+            st.line_chart(hist.chart(DROP_COLUMNS, max_points, level), x="time")
+
+st.divider()
+
+# ======================
+# Row 4: History (time-series store)
+# ======================
+
+with st.expander("🗄️ History (time-series store)", expanded=False):
+    store: TimeSeriesStore = st.session_state.store
+    keys = store.series()
+    if not keys:
+        st.info("No history stored yet.")
+    else:
+        h1, h2 = st.columns([2, 1])
+        key = h1.selectbox("Series", keys, format_func=lambda k: f"{k[0]} / {k[1]}")
+        minutes = h2.slider("Last N minutes", 1, 120, 10)
+        end = time.time()
+        res = store.query(key[0], key[1], end - minutes * 60, end + 1)
+        if not len(res.values):
+            st.info("No points in range.")
+        else:
+            st.line_chart([{"value": v} for v in res.values])
 
 if running:
     time.sleep(refresh_ms / 1000.0)
@@ -0,0 +1,119 @@
+"""
+Encode/decode throughput and size of the binary codec vs pickle and JSON.
+
+    python -m benchmarks.bench_codec [--events 20000] [--repeat 5]
+"""
+import argparse
+import json
+import pickle
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from core.codec import decode_events, encode_events
+from core.models import Event, EventSource, EventType
+from core.serialization import event_from_dict, event_to_dict
+from runtime.async_processor import WindowBatch, aggregate_batch
+
+
+def synthetic_events(n: int, seed: int = 7) -> List[Event]:
+    rng = random.Random(seed)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    out: List[Event] = []
+    for i in range(n):
+        ts = t0 + timedelta(milliseconds=i * 3)
+        kind = i % 3
+        if kind == 0:
+            payload = {
+                "sensor_id": f"sensor-{rng.randrange(16)}",
+                "metric": "temperature",
+                "value": round(20 + rng.gauss(0, 0.3), 3),
+                "unit": "°C",
+                "location": "lab-1",
+            }
+            src, tags = EventSource.SENSOR, {"metric": "temperature", "sensor_id": payload["sensor_id"]}
+        elif kind == 1:
+            level = rng.choice(["DEBUG", "INFO", "WARNING", "ERROR"])
+            payload = {"level": level, "message": "Operation completed successfully", "service": "auth-service", "host": "node-1"}
+            src, tags = EventSource.LOG, {"service": "auth-service", "level": level}
+        else:
+            payload = {
+                "user_id": f"user-{rng.randrange(100)}",
+                "action": rng.choice(["login", "logout", "click", "purchase"]),
+                "resource": rng.choice(["/home", "/dashboard", "/checkout"]),
+                "success": rng.random() > 0.1,
+                "timestamp": ts.isoformat(),
+            }
+            src, tags = EventSource.FEED, {"action": payload["action"], "success": str(payload["success"])}
+        event_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        out.append(Event(id=event_id, source=src, event_type=EventType.RAW, timestamp=ts, payload=payload, tags=tags))
+    return out
+
+
+def synthetic_aggregates(events: List[Event], window: timedelta = timedelta(seconds=5)) -> List[Event]:
+    out: List[Event] = []
+    start = events[0].timestamp
+    for i in range(0, len(events), 300):
+        out.extend(aggregate_batch(WindowBatch(start=start, end=start + window, events=events[i: i + 300])))
+        start += window
+    return out
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_formats(events: List[Event], repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    formats = {
+        "codec": (encode_events, lambda b: decode_events(memoryview(b))),
+        "pickle": (
+            lambda evs: pickle.dumps(evs, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+        ),
+        "json": (
+            lambda evs: json.dumps([event_to_dict(e) for e in evs]).encode(),
+            lambda b: [event_from_dict(d) for d in json.loads(b)],
+        ),
+    }
+
+    n = len(events)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (enc, dec) in formats.items():
+        blob = enc(events)
+        results[name] = {
+            "bytes_per_event": len(blob) / n,
+            "encode_eps": n / _best(lambda: enc(events), repeat),
+            "decode_eps": n / _best(lambda: dec(blob), repeat),
+        }
+    return results
+
+
+def _print(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n{title}")
+    print(f"{'format':<8} {'bytes/event':>12} {'encode eps':>14} {'decode eps':>14}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['bytes_per_event']:>12.1f} {r['encode_eps']:>14,.0f} {r['decode_eps']:>14,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = synthetic_events(args.events)
+    _print(f"Raw events (n={len(raw)})", bench_formats(raw, args.repeat))
+
+    aggs = synthetic_aggregates(raw)
+    _print(f"Aggregated events (n={len(aggs)})", bench_formats(aggs, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
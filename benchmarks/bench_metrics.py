@@ -0,0 +1,126 @@
+"""
+Microbenchmarks for the metrics hot path.
+
+    python -m benchmarks.bench_metrics [--n 200000]
+
+Compares the bucketed RateMeter with the previous deque-of-timestamps
+implementation (kept here only as a reference point), and times the
+log-bucketed LatencyMeter.
+"""
+import argparse
+import sys
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from metrics.collector import LatencyMeter, MetricsCollector, RateMeter
+
+
+class DequeRateMeter:
+    def __init__(self, window_seconds: float = 10.0):
+        self.window_seconds = window_seconds
+        self._timestamps: deque = deque()
+
+    def mark(self, n: int = 1) -> None:
+        t = time.time()
+        for _ in range(n):
+            self._timestamps.append(t)
+        self._trim(t)
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._timestamps and self._timestamps[0] < cutoff:
+            self._timestamps.popleft()
+
+    def rate_per_sec(self) -> float:
+        self._trim(time.time())
+        return len(self._timestamps) / self.window_seconds
+
+
+def _ns_per_op(fn: Callable[[], None], n: int) -> float:
+    t0 = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - t0) / n
+
+
+def bench_rate_meters(n: int) -> Dict[str, Dict[str, float]]:
+    out: Dict[str, Dict[str, float]] = {}
+    for name, factory in (("bucketed", RateMeter), ("deque", DequeRateMeter)):
+        meter = factory()
+        mark1 = _ns_per_op(meter.mark, n)
+        mark100 = _ns_per_op(lambda: meter.mark(100), max(n // 100, 1))
+        rate = _ns_per_op(meter.rate_per_sec, 1000)
+
+        state = meter._counts if isinstance(meter, RateMeter) else meter._timestamps
+        out[name] = {
+            "mark_ns": mark1,
+            "mark100_ns": mark100,
+            "rate_per_sec_ns": rate,
+            "state_bytes": sys.getsizeof(state),
+        }
+    return out
+
+
+def bench_latency_meter(n: int) -> Dict[str, float]:
+    meter = LatencyMeter()
+    i = 0
+
+    def add():
+        nonlocal i
+        i += 1
+        meter.add(0.5 + (i % 997) * 0.37)
+
+    return {
+        "add_ns": _ns_per_op(add, n),
+        "snapshot_us": _ns_per_op(meter.snapshot, 200) / 1000.0,
+        "merged_us": _ns_per_op(lambda: LatencyMeter.merged([meter, meter, meter]), 50) / 1000.0,
+    }
+
+
+def bench_collector(n: int) -> Dict[str, float]:
+    m = MetricsCollector()
+    sources = ("sensor", "log", "feed")
+    i = 0
+
+    def ingest():
+        nonlocal i
+        i += 1
+        m.record_ingest(sources[i % 3], dropped=False)
+
+    def processed():
+        nonlocal i
+        i += 1
+        m.record_processed(sources[i % 3], 1.5)
+
+    return {
+        "record_ingest_ns": _ns_per_op(ingest, n),
+        "record_processed_ns": _ns_per_op(processed, n),
+        "snapshot_us": _ns_per_op(m.snapshot, 200) / 1000.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"\nRateMeter (n={args.n})")
+    print(f"{'impl':<10} {'mark ns':>10} {'mark(100) ns':>14} {'rate ns':>10} {'state bytes':>12}")
+    for name, r in bench_rate_meters(args.n).items():
+        print(
+            f"{name:<10} {r['mark_ns']:>10.0f} {r['mark100_ns']:>14.0f} "
+            f"{r['rate_per_sec_ns']:>10.0f} {r['state_bytes']:>12,.0f}"
+        )
+
+    print("\nLatencyMeter")
+    for k, v in bench_latency_meter(args.n).items():
+        print(f"{k:<22} {v:>10.1f}")
+
+    print("\nMetricsCollector")
+    for k, v in bench_collector(args.n).items():
+        print(f"{k:<22} {v:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
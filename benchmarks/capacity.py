@@ -0,0 +1,257 @@
+"""
+Capacity curve: ramps offered load until the engine stops keeping up.
+
+    python -m benchmarks.capacity [--start 500] [--factor 1.5] [--max 200000]
+                                  [--step-seconds 3] [--refine 2]
+                                  [--merged-queue 500] [--blocking] [--delay-ms 0]
+                                  [--window-seconds 1]
+                                  [--max-drop-ratio 0.001] [--max-p99-ms 250]
+                                  [--output capacity.json]
+
+Each step runs a fresh bus + live aggregation pipeline fed by a RampSource
+at a fixed rate. It records offered load, throughput, drop ratio and
+latency percentiles. A step is sustainable when all of these hold:
+- throughput reaches ``min_throughput_ratio`` of the target
+- the drop ratio stays under ``max_drop_ratio``
+- p99 latency (event timestamp to dequeue) stays under ``max_p99_ms``
+
+The rate grows geometrically until a step fails. The gap between the last
+good and the first bad rate is then bisected ``--refine`` times.
+
+The source runs on the same loop as the pipeline, as the live sources do,
+so the curve includes the cost of producing events.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from core.bus import EventBus
+from metrics.collector import MetricsCollector
+from runtime.async_processor import run_live_aggregation
+from sources.ramp_source import RampSource
+
+
+@dataclass(frozen=True)
+class CapacityConfig:
+    merged_queue_size: int = 500
+    drop_on_full: bool = True
+    window_seconds: float = 1.0
+    artificial_delay_ms: float = 0.0
+    tick_seconds: float = 0.01
+
+
+@dataclass(frozen=True)
+class Slo:
+    max_drop_ratio: float = 0.001
+    max_p99_ms: float = 250.0
+    min_throughput_ratio: float = 0.95
+
+
+@dataclass
+class StepResult:
+    target_eps: float
+    offered_eps: float
+    throughput_eps: float
+    drop_ratio: float
+    p50_ms: Optional[float]
+    p99_ms: Optional[float]
+    queue_high_water: int
+    sustainable: bool
+
+
+@dataclass
+class CapacityReport:
+    config: CapacityConfig
+    slo: Slo
+    steps: List[StepResult] = field(default_factory=list)
+    max_sustainable_eps: Optional[float] = None
+
+
+async def run_step(rate_eps: float, config: CapacityConfig, slo: Slo, seconds: float) -> StepResult:
+    metrics = MetricsCollector()
+    stop = asyncio.Event()
+    bus = EventBus(
+        merged_queue_size=config.merged_queue_size,
+        drop_on_full=config.drop_on_full,
+        metrics=metrics,
+        enable_per_source_queues=False,
+    )
+    source = RampSource(bus, stop, rate_eps=rate_eps, tick_seconds=config.tick_seconds)
+    out_q: asyncio.Queue = asyncio.Queue()
+
+    async def on_batch_delay() -> None:
+        if config.artificial_delay_ms > 0:
+            await asyncio.sleep(config.artificial_delay_ms / 1000.0)
+
+    async def discard() -> None:
+        while True:
+            await out_q.get()
+
+    loop = asyncio.get_running_loop()
+    tasks = [
+        asyncio.create_task(
+            run_live_aggregation(
+                bus.get_merged_queue(),
+                out_q,
+                timedelta(seconds=config.window_seconds),
+                stop,
+                metrics=metrics,
+                on_after_batch=on_batch_delay,
+            )
+        ),
+        asyncio.create_task(discard()),
+        asyncio.create_task(bus.sample_queue_depths(stop, interval_seconds=0.02)),
+        asyncio.create_task(source.run()),
+    ]
+
+    t0 = loop.time()
+    await asyncio.sleep(seconds)
+    elapsed = loop.time() - t0
+
+    # read counters before shutdown flushes the open window
+    processed = metrics.processed_total
+    ingested = metrics.ingested_total
+    dropped = metrics.dropped_total
+    latency = metrics.global_latency().histogram(cumulative=True)
+    p50, p99 = latency.quantiles((0.5, 0.99))
+    depth = metrics.queue_depths.get("merged")
+
+    stop.set()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    throughput = processed / elapsed
+    drop_ratio = dropped / ingested if ingested else 0.0
+    sustainable = (
+        throughput >= slo.min_throughput_ratio * rate_eps
+        and drop_ratio <= slo.max_drop_ratio
+        and p99 is not None
+        and p99 <= slo.max_p99_ms
+    )
+    return StepResult(
+        target_eps=rate_eps,
+        offered_eps=source.published_total / elapsed,
+        throughput_eps=throughput,
+        drop_ratio=drop_ratio,
+        p50_ms=p50,
+        p99_ms=p99,
+        queue_high_water=depth.high_water if depth is not None else 0,
+        sustainable=sustainable,
+    )
+
+
+async def find_capacity(
+    config: CapacityConfig = CapacityConfig(),
+    slo: Slo = Slo(),
+    start_eps: float = 500.0,
+    factor: float = 1.5,
+    max_eps: float = 200_000.0,
+    step_seconds: float = 3.0,
+    refine: int = 2,
+    on_step=None,
+) -> CapacityReport:
+    report = CapacityReport(config=config, slo=slo)
+
+    async def step(rate: float) -> StepResult:
+        result = await run_step(rate, config, slo, step_seconds)
+        report.steps.append(result)
+        if on_step is not None:
+            on_step(result)
+        return result
+
+    good: Optional[float] = None
+    bad: Optional[float] = None
+    rate = start_eps
+    while rate <= max_eps:
+        if (await step(rate)).sustainable:
+            good = rate
+            rate *= factor
+        else:
+            bad = rate
+            break
+
+    if good is not None and bad is not None:
+        for _ in range(refine):
+            mid = (good + bad) / 2
+            if (await step(mid)).sustainable:
+                good = mid
+            else:
+                bad = mid
+
+    report.max_sustainable_eps = good
+    return report
+
+
+# -------------------------
+# REPORTING
+# -------------------------
+
+def _fmt(v: Optional[float], spec: str) -> str:
+    return format(v, spec) if v is not None else "-"
+
+
+def _print_step(r: StepResult) -> None:
+    print(
+        f"{r.target_eps:>10,.0f} {r.offered_eps:>10,.0f} {r.throughput_eps:>10,.0f} "
+        f"{r.drop_ratio:>8.2%} {_fmt(r.p50_ms, '>9.1f')} {_fmt(r.p99_ms, '>9.1f')} "
+        f"{r.queue_high_water:>6} {'ok' if r.sustainable else 'FAIL':>5}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=float, default=500.0)
+    parser.add_argument("--factor", type=float, default=1.5)
+    parser.add_argument("--max", type=float, default=200_000.0)
+    parser.add_argument("--step-seconds", type=float, default=3.0)
+    parser.add_argument("--refine", type=int, default=2)
+    parser.add_argument("--merged-queue", type=int, default=500)
+    parser.add_argument("--blocking", action="store_true", help="block producers instead of dropping")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="artificial delay per closed window")
+    parser.add_argument("--window-seconds", type=float, default=1.0)
+    parser.add_argument("--max-drop-ratio", type=float, default=0.001)
+    parser.add_argument("--max-p99-ms", type=float, default=250.0)
+    parser.add_argument("--output", type=Path, default=None, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    config = CapacityConfig(
+        merged_queue_size=args.merged_queue,
+        drop_on_full=not args.blocking,
+        window_seconds=args.window_seconds,
+        artificial_delay_ms=args.delay_ms,
+    )
+    slo = Slo(max_drop_ratio=args.max_drop_ratio, max_p99_ms=args.max_p99_ms)
+
+    print(f"{'target':>10} {'offered':>10} {'through':>10} {'drops':>8} {'p50 ms':>9} {'p99 ms':>9} {'queue':>6} {'':>5}")
+    report = asyncio.run(
+        find_capacity(
+            config, slo,
+            start_eps=args.start,
+            factor=args.factor,
+            max_eps=args.max,
+            step_seconds=args.step_seconds,
+            refine=args.refine,
+            on_step=_print_step,
+        )
+    )
+
+    if report.max_sustainable_eps is None:
+        print("\nNo sustainable rate found; lower --start.")
+    else:
+        print(f"\nMax sustainable rate: {report.max_sustainable_eps:,.0f} events/sec")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(asdict(report), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+Benchmark suite with regression thresholds.
+
+    python -m benchmarks.run [--n 20000] [--repeat 5] [--only bus,e2e]
+                             [--output results.json]
+                             [--baseline benchmarks/baseline.json] [--tolerance 0.2]
+                             [--save-baseline]
+
+Every case runs on deterministic synthetic data and reports the best of
+``--repeat`` runs as operations per second. With a baseline, the run exits
+with status 1 if any case is slower than ``baseline * (1 - tolerance)``.
+The baseline file may carry per-case overrides under "tolerances".
+Baselines are machine-specific: record one with --save-baseline on the
+machine that will run the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.bench_codec import synthetic_events
+from core.bus import EventBus
+from core.codec import decode_events, encode_events
+from core.models import Event, EventSource
+from metrics.collector import MetricsCollector, RateMeter
+from pipeline.windowing import tumbling_window
+from runtime.async_processor import (
+    AsyncTumblingWindowProcessor,
+    WindowBatch,
+    agg_feed_actions,
+    agg_log_levels,
+    agg_sensor_avg,
+    aggregate_batch,
+    run_live_aggregation,
+)
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+WINDOW = timedelta(seconds=5)
+
+# a case builds its input once and returns a callable that does the work and
+# returns how many operations it performed
+CaseFactory = Callable[[int], Callable[[], int]]
+
+
+@dataclass
+class Case:
+    name: str
+    build: CaseFactory
+
+
+# -------------------------
+# DATA
+# -------------------------
+
+def events_per_window(n: int, per_window: int) -> List[Event]:
+    """Deterministic events spaced so each 5s window holds ``per_window`` of them."""
+    base = synthetic_events(min(n, 3000))
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    step = WINDOW / per_window
+    out = []
+    for i in range(n):
+        e = base[i % len(base)]
+        out.append(Event(id=e.id, source=e.source, event_type=e.event_type, timestamp=t0 + step * i, payload=e.payload, tags=e.tags))
+    return out
+
+
+def by_source(events: List[Event], source: EventSource) -> List[Event]:
+    return [e for e in events if e.source == source]
+
+
+SOURCES = ("sensor", "log", "feed")
+
+
+def _latency(i: int) -> float:
+    return 0.5 + (i % 997) * 0.37
+
+
+# -------------------------
+# CASES
+# -------------------------
+
+def bus_publish_get(n: int) -> Callable[[], int]:
+    events = synthetic_events(n)
+
+    async def roundtrip() -> None:
+        bus = EventBus(merged_queue_size=n + 1, enable_per_source_queues=False, metrics=MetricsCollector())
+        for e in events:
+            await bus.publish(e)
+        q = bus.get_merged_queue()
+        while not q.empty():
+            q.get_nowait()
+
+    def run() -> int:
+        asyncio.run(roundtrip())
+        return n
+
+    return run
+
+
+def processor_push(per_window: int) -> CaseFactory:
+    def build(n: int) -> Callable[[], int]:
+        events = events_per_window(n, per_window)
+
+        def run() -> int:
+            proc = AsyncTumblingWindowProcessor(window_size=WINDOW)
+            for e in events:
+                proc.push(e)
+            proc.flush()
+            return n
+
+        return run
+
+    return build
+
+
+def aggregator(fn: Callable[[List[Event]], dict], source: EventSource) -> CaseFactory:
+    def build(n: int) -> Callable[[], int]:
+        events = by_source(synthetic_events(n), source)
+        chunks = [events[i: i + 1000] for i in range(0, len(events), 1000)]
+
+        def run() -> int:
+            for chunk in chunks:
+                fn(chunk)
+            return len(events)
+
+        return run
+
+    return build
+
+
+def registry_aggregate(n: int) -> Callable[[], int]:
+    events = events_per_window(n, 1000)
+    batches = [
+        WindowBatch(start=chunk[0].timestamp, end=chunk[0].timestamp + WINDOW, events=chunk)
+        for chunk in (events[i: i + 1000] for i in range(0, n, 1000))
+    ]
+
+    def run() -> int:
+        for b in batches:
+            aggregate_batch(b)
+        return n
+
+    return run
+
+
+def collector_hook(call: Callable[[MetricsCollector, int], None]) -> CaseFactory:
+    def build(n: int) -> Callable[[], int]:
+        def run() -> int:
+            m = MetricsCollector()
+            for i in range(n):
+                call(m, i)
+            return n
+
+        return run
+
+    return build
+
+
+def collector_snapshot(n: int) -> Callable[[], int]:
+    m = MetricsCollector()
+    for i in range(n):
+        m.record_ingest(SOURCES[i % 3], dropped=False)
+        m.record_processed(SOURCES[i % 3], _latency(i))
+    calls = max(n // 1000, 10)
+
+    def run() -> int:
+        for _ in range(calls):
+            m.snapshot()
+        return calls
+
+    return run
+
+
+def rate_meter_mark(n: int) -> Callable[[], int]:
+    def run() -> int:
+        meter = RateMeter()
+        for _ in range(n):
+            meter.mark()
+        return n
+
+    return run
+
+
+def windowing_tumbling(n: int) -> Callable[[], int]:
+    events = events_per_window(n, 1000)
+
+    def run() -> int:
+        for _ in tumbling_window(events, WINDOW):
+            pass
+        return n
+
+    return run
+
+
+def live_aggregation(n: int) -> Callable[[], int]:
+    events = events_per_window(n, 1000)
+
+    async def drive() -> None:
+        in_q: asyncio.Queue = asyncio.Queue()
+        out_q: asyncio.Queue = asyncio.Queue()
+        for e in events:
+            in_q.put_nowait(e)
+        task = asyncio.create_task(
+            run_live_aggregation(in_q, out_q, WINDOW, asyncio.Event(), metrics=MetricsCollector())
+        )
+        while not in_q.empty():
+            await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def run() -> int:
+        asyncio.run(drive())
+        return n
+
+    return run
+
+
+def fleet_step(n: int) -> Callable[[], int]:
+    from sources.fleet_source import FleetSource
+
+    fleet = FleetSource(None, asyncio.Event(), n_sensors=10000, seed=0)
+
+    def run() -> int:
+        fleet.step(n, 0.0, 1.0)
+        return n
+
+    return run
+
+
+def fleet_to_events(n: int) -> Callable[[], int]:
+    from sources.fleet_source import FleetSource
+
+    fleet = FleetSource(None, asyncio.Event(), n_sensors=10000, seed=0)
+    readings = fleet.step(n, 0.0, 1.0)
+
+    def run() -> int:
+        fleet.to_events(readings)
+        return n
+
+    return run
+
+
+def codec_encode(n: int) -> Callable[[], int]:
+    events = synthetic_events(n)
+
+    def run() -> int:
+        encode_events(events)
+        return n
+
+    return run
+
+
+def codec_decode(n: int) -> Callable[[], int]:
+    blob = encode_events(synthetic_events(n))
+
+    def run() -> int:
+        decode_events(memoryview(blob))
+        return n
+
+    return run
+
+
+CASES: List[Case] = [
+    Case("bus.publish_get", bus_publish_get),
+    Case("processor.push[w=100]", processor_push(100)),
+    Case("processor.push[w=1000]", processor_push(1000)),
+    Case("processor.push[w=10000]", processor_push(10000)),
+    Case("aggregate.sensor_avg", aggregator(agg_sensor_avg, EventSource.SENSOR)),
+    Case("aggregate.log_levels", aggregator(agg_log_levels, EventSource.LOG)),
+    Case("aggregate.feed_actions", aggregator(agg_feed_actions, EventSource.FEED)),
+    Case("aggregate.registry", registry_aggregate),
+    Case("metrics.record_ingest", collector_hook(lambda m, i: m.record_ingest(SOURCES[i % 3], dropped=False))),
+    Case("metrics.record_processed", collector_hook(lambda m, i: m.record_processed(SOURCES[i % 3], _latency(i)))),
+    Case("metrics.record_stage", collector_hook(lambda m, i: m.record_stage("queue_wait", _latency(i)))),
+    Case("metrics.snapshot", collector_snapshot),
+    Case("metrics.rate_meter_mark", rate_meter_mark),
+    Case("windowing.tumbling_window", windowing_tumbling),
+    Case("e2e.run_live_aggregation", live_aggregation),
+    Case("fleet.step", fleet_step),
+    Case("fleet.to_events", fleet_to_events),
+    Case("codec.encode", codec_encode),
+    Case("codec.decode", codec_decode),
+]
+
+
+# -------------------------
+# RUNNER
+# -------------------------
+
+def run_case(case: Case, n: int, repeat: int) -> Dict[str, float]:
+    fn = case.build(n)
+    best = float("inf")
+    ops = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ops = fn()
+        best = min(best, time.perf_counter() - t0)
+    return {"ops": ops, "seconds": best, "ops_per_sec": ops / best, "ns_per_op": best * 1e9 / ops}
+
+
+def run_suite(n: int, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case in CASES:
+        if only and not any(o in case.name for o in only):
+            continue
+        results[case.name] = run_case(case, n, repeat)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "n": n,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[Dict[str, Any]]:
+    """Per-case comparison rows; ``regressed`` is True when throughput fell beyond tolerance."""
+    overrides = baseline.get("tolerances", {})
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        tol = overrides.get(name, tolerance)
+        ratio = cur["ops_per_sec"] / base["ops_per_sec"]
+        rows.append({"name": name, "ratio": ratio, "tolerance": tol, "regressed": ratio < 1.0 - tol})
+    return rows
+
+
+def _print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'case':<28} {'ops/sec':>14} {'ns/op':>10}")
+    for name, r in results.items():
+        print(f"{name:<28} {r['ops_per_sec']:>14,.0f} {r['ns_per_op']:>10,.0f}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'case':<28} {'vs baseline':>12} {'tolerance':>10}")
+    for r in rows:
+        flag = "  REGRESSED" if r["regressed"] else ""
+        print(f"{r['name']:<28} {r['ratio']:>11.2f}x {r['tolerance']:>9.0%}{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000, help="events / operations per case")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", type=str, default="", help="comma-separated substrings of case names")
+    parser.add_argument("--output", type=Path, default=None, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    only = [s for s in args.only.split(",") if s]
+    current = run_suite(args.n, args.repeat, only)
+    _print_results(current["results"])
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(current, indent=2))
+
+    if args.save_baseline:
+        previous = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        if "tolerances" in previous:
+            current = {**current, "tolerances": previous["tolerances"]}
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        return 0
+
+    rows = compare(current, json.loads(args.baseline.read_text()), args.tolerance)
+    _print_comparison(rows)
+    regressed = [r["name"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} case(s) regressed: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
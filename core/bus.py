@@ -1,9 +1,13 @@
 import asyncio
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
+from core.event_log import EventLog
 from core.models import Event, EventSource
 from metrics.collector import MetricsCollector
 
+if TYPE_CHECKING:
+    from metrics.tracing import StageTracer
+
 
 class EventBus:
     def __init__(
@@ -13,10 +17,14 @@ class EventBus:
         drop_on_full: bool = True,
         metrics: Optional[MetricsCollector] = None,
         enable_per_source_queues: bool = True,
+        event_log: Optional[EventLog] = None,
+        tracer: Optional["StageTracer"] = None,
     ):
         self.drop_on_full = drop_on_full
         self.metrics = metrics
         self.enable_per_source_queues = enable_per_source_queues
+        self.event_log = event_log
+        self.tracer = tracer
 
         self._source_queues: Dict[EventSource, asyncio.Queue[Event]] = {
             source: asyncio.Queue(maxsize=per_source_queue_size)
@@ -35,6 +43,9 @@ class EventBus:
         dropped_merged = False
         dropped_source = False
 
+        if self.event_log is not None:
+            self.event_log.append(event)
+
         if self.enable_per_source_queues:
             try:
                 self._source_queues[event.source].put_nowait(event)
@@ -52,17 +63,64 @@ class EventBus:
             else:
                 await self._merged_queue.put(event)
 
+        if self.tracer is not None and not dropped_merged:
+            self.tracer.on_enqueue(event)
+
         dropped = dropped_merged or dropped_source
 
         if self.metrics is not None:
-            self.metrics.record_ingest(
-                source=event.source.value,
-                dropped=dropped,
-                queue_sizes=self.queue_sizes(),
-            )
+            self.metrics.record_ingest(source=event.source.value, dropped=dropped)
 
         return not dropped_merged
 
+    async def publish_batch(self, events: Iterable[Event]) -> int:
+        """
+        Publishes ``events`` in one pass and returns how many reached the
+        merged queue. With ``drop_on_full`` nothing awaits: events go in with
+        put_nowait, are appended to the event log together, and ingest/drop
+        counts are recorded once per batch. Without it, each event may block,
+        so the batch falls back to publish() per event.
+        """
+        events = events if isinstance(events, list) else list(events)
+        if not self.drop_on_full:
+            accepted = 0
+            for event in events:
+                if await self.publish(event):
+                    accepted += 1
+            return accepted
+
+        if self.event_log is not None:
+            self.event_log.extend(events)
+
+        merged = self._merged_queue
+        source_queues = self._source_queues if self.enable_per_source_queues else None
+        ingested: Dict[str, int] = {}
+        dropped: Dict[str, int] = {}
+        enqueued: List[Event] = []
+
+        for event in events:
+            src = event.source.value
+            ingested[src] = ingested.get(src, 0) + 1
+            lost = False
+            if source_queues is not None:
+                try:
+                    source_queues[event.source].put_nowait(event)
+                except asyncio.QueueFull:
+                    lost = True
+            try:
+                merged.put_nowait(event)
+                enqueued.append(event)
+            except asyncio.QueueFull:
+                lost = True
+            if lost:
+                dropped[src] = dropped.get(src, 0) + 1
+
+        if self.tracer is not None:
+            self.tracer.on_enqueue_batch(enqueued)
+        if self.metrics is not None:
+            self.metrics.record_ingest_batch(ingested, dropped)
+        return len(enqueued)
+
     # -------------------------
     # CONSUMPTION
     # -------------------------
@@ -85,3 +143,25 @@ class EventBus:
                 for source, queue in self._source_queues.items()
             }
         return sizes
+
+    async def sample_queue_depths(
+        self,
+        stop_event: asyncio.Event,
+        interval_seconds: float = 0.05,
+        report_seconds: float = 1.0,
+    ) -> None:
+        """
+        Samples queue depths every ``interval_seconds`` and rolls the
+        per-queue min/max/mean every ``report_seconds``, keeping queue
+        observation off the publish path.
+        """
+        if self.metrics is None:
+            return
+        loop = asyncio.get_running_loop()
+        next_roll = loop.time() + report_seconds
+        while not stop_event.is_set():
+            self.metrics.record_queue_sample(self.queue_sizes())
+            if loop.time() >= next_roll:
+                self.metrics.roll_queue_depths()
+                next_roll += report_seconds
+            await asyncio.sleep(interval_seconds)
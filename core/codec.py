@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+import struct
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.models import Event, EventSource, EventType
+
+# Frame layout
+#   u8 version | varint event count | events...
+#
+# Event layout
+#   u8 flags | id | [varint zigzag ts delta] | u8 payload schema + payload | tags | [correlation id]
+#
+# Strings are dictionary-encoded per frame: the first occurrence is written
+# inline as varint((len << 1) | 1) + utf-8 bytes, later ones as varint(index << 1).
+# Timestamps are microseconds since epoch, delta-encoded against the previous
+# event of the frame. Decoded timestamps are always UTC-aware.
+
+VERSION = 1
+
+_SOURCES: List[EventSource] = list(EventSource)
+_SOURCE_INDEX = {s: i for i, s in enumerate(_SOURCES)}
+_TYPES: List[EventType] = list(EventType)
+_TYPE_INDEX = {t: i for i, t in enumerate(_TYPES)}
+
+FLAG_UUID_ID = 1 << 4
+FLAG_HAS_CORRELATION = 1 << 5
+FLAG_HAS_TIMESTAMP = 1 << 6
+
+SCHEMA_GENERIC = 0
+SCHEMA_SENSOR = 1
+SCHEMA_LOG = 2
+SCHEMA_FEED = 3
+SCHEMA_AGGREGATED = 4
+SCHEMA_AGGREGATED_TIMED = 5  # aggregated + window.event_time min/max/mean
+
+_SENSOR_KEYS = ("sensor_id", "metric", "value", "unit", "location")
+_LOG_KEYS = ("level", "message", "service", "host")
+_EVENT_TIME_KEYS = ("min", "max", "mean")
+
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_DICT = range(8)
+
+_F64 = struct.Struct("<d")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_us(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    delta = ts - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def _iso_roundtrips(s: Any) -> Optional[int]:
+    """Return the timestamp in us if ``s`` is an ISO UTC string we can rebuild exactly."""
+    if not isinstance(s, str):
+        return None
+    try:
+        ts = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    if ts.tzinfo is None or ts.utcoffset() != timedelta(0) or ts.isoformat() != s:
+        return None
+    return _to_us(ts)
+
+
+def _event_time_us(event_time: Any) -> Optional[List[int]]:
+    if not isinstance(event_time, dict) or list(event_time) != list(_EVENT_TIME_KEYS):
+        return None
+    out = [_iso_roundtrips(event_time[k]) for k in _EVENT_TIME_KEYS]
+    return None if None in out else out
+
+
+# -------------------------
+# ENCODER
+# -------------------------
+
+class _Writer:
+    __slots__ = ("buf", "strings", "last_ts")
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.last_ts = 0
+
+    def varint(self, n: int) -> None:
+        buf = self.buf
+        while n >= 0x80:
+            buf.append((n & 0x7F) | 0x80)
+            n >>= 7
+        buf.append(n)
+
+    def zigzag(self, n: int) -> None:
+        self.varint((n << 1) if n >= 0 else ((-n << 1) - 1))
+
+    def string(self, s: str) -> None:
+        idx = self.strings.get(s)
+        if idx is not None:
+            self.varint(idx << 1)
+            return
+        self.strings[s] = len(self.strings)
+        data = s.encode("utf-8")
+        self.varint((len(data) << 1) | 1)
+        self.buf += data
+
+    def f64(self, x: float) -> None:
+        self.buf += _F64.pack(x)
+
+    def value(self, v: Any) -> None:
+        buf = self.buf
+        if v is None:
+            buf.append(T_NONE)
+        elif v is True:
+            buf.append(T_TRUE)
+        elif v is False:
+            buf.append(T_FALSE)
+        elif isinstance(v, str):
+            buf.append(T_STR)
+            self.string(v)
+        elif isinstance(v, int):
+            buf.append(T_INT)
+            self.zigzag(v)
+        elif isinstance(v, float):
+            buf.append(T_FLOAT)
+            self.f64(v)
+        elif isinstance(v, dict):
+            buf.append(T_DICT)
+            self.varint(len(v))
+            for k, item in v.items():
+                self.string(str(k))
+                self.value(item)
+        elif isinstance(v, (list, tuple)):
+            buf.append(T_LIST)
+            self.varint(len(v))
+            for item in v:
+                self.value(item)
+        else:
+            raise TypeError(f"Cannot encode value of type {type(v).__name__}")
+
+    def timestamp(self, us: int) -> None:
+        self.zigzag(us - self.last_ts)
+        self.last_ts = us
+
+    # -------- payload schemas --------
+
+    def payload(self, p: Any) -> None:
+        if isinstance(p, dict):
+            n = len(p)
+            if n == 5 and type(p.get("value")) is float and all(k in p for k in _SENSOR_KEYS):
+                loc = p["location"]
+                if (loc is None or isinstance(loc, str)) and all(
+                    isinstance(p[k], str) for k in ("sensor_id", "metric", "unit")
+                ):
+                    self.buf.append(SCHEMA_SENSOR)
+                    self.string(p["sensor_id"])
+                    self.string(p["metric"])
+                    self.f64(p["value"])
+                    self.string(p["unit"])
+                    self.value(loc)
+                    return
+            if n == 4 and all(isinstance(p.get(k), str) for k in _LOG_KEYS):
+                self.buf.append(SCHEMA_LOG)
+                for k in _LOG_KEYS:
+                    self.string(p[k])
+                return
+            if n == 5 and type(p.get("success")) is bool and all(
+                isinstance(p.get(k), str) for k in ("user_id", "action", "resource")
+            ):
+                ts = _iso_roundtrips(p.get("timestamp"))
+                if ts is not None:
+                    self.buf.append(SCHEMA_FEED)
+                    self.string(p["user_id"])
+                    self.string(p["action"])
+                    self.string(p["resource"])
+                    self.buf.append(T_TRUE if p["success"] else T_FALSE)
+                    self.timestamp(ts)
+                    return
+            window = p.get("window")
+            if isinstance(window, dict) and len(window) in (3, 4) and type(window.get("count")) is int:
+                start = _iso_roundtrips(window.get("start"))
+                end = _iso_roundtrips(window.get("end"))
+                event_time = _event_time_us(window.get("event_time")) if len(window) == 4 else None
+                if start is not None and end is not None and (len(window) == 3 or event_time is not None):
+                    self.buf.append(SCHEMA_AGGREGATED if event_time is None else SCHEMA_AGGREGATED_TIMED)
+                    self.timestamp(start)
+                    self.zigzag(end - start)
+                    self.varint(window["count"])
+                    if event_time is not None:
+                        for us in event_time:
+                            self.zigzag(us - start)
+                    self.varint(n - 1)
+                    for k, item in p.items():
+                        if k != "window":
+                            self.string(str(k))
+                            self.value(item)
+                    return
+        self.buf.append(SCHEMA_GENERIC)
+        self.value(p)
+
+    def event(self, e: Event) -> None:
+        buf = self.buf
+        flags = _SOURCE_INDEX[e.source] | (_TYPE_INDEX[e.event_type] << 2)
+
+        uid: Optional[bytes] = None
+        if len(e.id) == 36:
+            try:
+                parsed = uuid.UUID(e.id)
+                if str(parsed) == e.id:
+                    uid = parsed.bytes
+            except ValueError:
+                pass
+        if uid is not None:
+            flags |= FLAG_UUID_ID
+        if e.correlation_id is not None:
+            flags |= FLAG_HAS_CORRELATION
+        if e.timestamp is not None:
+            flags |= FLAG_HAS_TIMESTAMP
+
+        buf.append(flags)
+        if uid is not None:
+            buf += uid
+        else:
+            self.string(e.id)
+        if e.timestamp is not None:
+            self.timestamp(_to_us(e.timestamp))
+
+        self.payload(e.payload)
+
+        tags = e.tags
+        self.varint(len(tags))
+        for k, v in tags.items():
+            self.string(k)
+            self.string(v)
+
+        if e.correlation_id is not None:
+            self.string(e.correlation_id)
+
+
+# -------------------------
+# DECODER
+# -------------------------
+
+class _Reader:
+    __slots__ = ("view", "pos", "strings", "last_ts")
+
+    def __init__(self, buf: bytes | bytearray | memoryview, pos: int = 0):
+        self.view = buf if isinstance(buf, memoryview) else memoryview(buf)
+        self.pos = pos
+        self.strings: List[str] = []
+        self.last_ts = 0
+
+    def u8(self) -> int:
+        b = self.view[self.pos]
+        self.pos += 1
+        return b
+
+    def varint(self) -> int:
+        view = self.view
+        pos = self.pos
+        b = view[pos]
+        pos += 1
+        if b < 0x80:
+            self.pos = pos
+            return b
+        n = b & 0x7F
+        shift = 7
+        while True:
+            b = view[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return n
+            shift += 7
+
+    def zigzag(self) -> int:
+        n = self.varint()
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+    def string(self) -> str:
+        n = self.varint()
+        if not n & 1:
+            return self.strings[n >> 1]
+        length = n >> 1
+        start = self.pos
+        self.pos = start + length
+        s = str(self.view[start:self.pos], "utf-8")
+        self.strings.append(s)
+        return s
+
+    def f64(self) -> float:
+        x = _F64.unpack_from(self.view, self.pos)[0]
+        self.pos += 8
+        return x
+
+    def value(self) -> Any:
+        tag = self.u8()
+        if tag == T_STR:
+            return self.string()
+        if tag == T_INT:
+            return self.zigzag()
+        if tag == T_FLOAT:
+            return self.f64()
+        if tag == T_NONE:
+            return None
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_DICT:
+            n = self.varint()
+            out = {}
+            for _ in range(n):
+                k = self.string()
+                out[k] = self.value()
+            return out
+        if tag == T_LIST:
+            return [self.value() for _ in range(self.varint())]
+        raise ValueError(f"Unknown value tag {tag}")
+
+    def timestamp(self) -> int:
+        self.last_ts += self.zigzag()
+        return self.last_ts
+
+    def payload(self) -> Any:
+        schema = self.u8()
+        if schema == SCHEMA_SENSOR:
+            sensor_id = self.string()
+            metric = self.string()
+            value = self.f64()
+            unit = self.string()
+            return {"sensor_id": sensor_id, "metric": metric, "value": value, "unit": unit, "location": self.value()}
+        if schema == SCHEMA_LOG:
+            return {k: self.string() for k in _LOG_KEYS}
+        if schema == SCHEMA_FEED:
+            user_id = self.string()
+            action = self.string()
+            resource = self.string()
+            success = self.u8() == T_TRUE
+            ts = _from_us(self.timestamp()).isoformat()
+            return {"user_id": user_id, "action": action, "resource": resource, "success": success, "timestamp": ts}
+        if schema == SCHEMA_AGGREGATED or schema == SCHEMA_AGGREGATED_TIMED:
+            start = self.timestamp()
+            end = start + self.zigzag()
+            count = self.varint()
+            event_time = None
+            if schema == SCHEMA_AGGREGATED_TIMED:
+                event_time = {k: _from_us(start + self.zigzag()).isoformat() for k in _EVENT_TIME_KEYS}
+            out: Dict[str, Any] = {}
+            for _ in range(self.varint()):
+                k = self.string()
+                out[k] = self.value()
+            out["window"] = {
+                "start": _from_us(start).isoformat(),
+                "end": _from_us(end).isoformat(),
+                "count": count,
+            }
+            if event_time is not None:
+                out["window"]["event_time"] = event_time
+            return out
+        if schema == SCHEMA_GENERIC:
+            return self.value()
+        raise ValueError(f"Unknown payload schema {schema}")
+
+    def event(self) -> Event:
+        flags = self.u8()
+
+        if flags & FLAG_UUID_ID:
+            start = self.pos
+            self.pos += 16
+            event_id = str(uuid.UUID(bytes=bytes(self.view[start:self.pos])))
+        else:
+            event_id = self.string()
+
+        ts = _from_us(self.timestamp()) if flags & FLAG_HAS_TIMESTAMP else None
+        payload = self.payload()
+
+        tags = {}
+        for _ in range(self.varint()):
+            k = self.string()
+            tags[k] = self.string()
+
+        correlation_id = self.string() if flags & FLAG_HAS_CORRELATION else None
+
+        return Event(
+            id=event_id,
+            source=_SOURCES[flags & 0x03],
+            event_type=_TYPES[(flags >> 2) & 0x03],
+            timestamp=ts,
+            payload=payload,
+            tags=tags,
+            correlation_id=correlation_id,
+        )
+
+
+# -------------------------
+# PUBLIC API
+# -------------------------
+
+def encode_events(events: Iterable[Event]) -> bytes:
+    events = events if isinstance(events, list) else list(events)
+    w = _Writer()
+    w.buf.append(VERSION)
+    w.varint(len(events))
+    for e in events:
+        w.event(e)
+    return bytes(w.buf)
+
+
+def decode_events(buf: bytes | bytearray | memoryview) -> List[Event]:
+    r = _Reader(buf)
+    version = r.u8()
+    if version != VERSION:
+        raise ValueError(f"Unsupported codec version {version}")
+    return [r.event() for _ in range(r.varint())]
+
+
+def encode_event(event: Event) -> bytes:
+    return encode_events([event])
+
+
+def decode_event(buf: bytes | bytearray | memoryview) -> Event:
+    return decode_events(buf)[0]
+
+
+def encode_value(obj: Any) -> bytes:
+    w = _Writer()
+    w.buf.append(VERSION)
+    w.value(obj)
+    return bytes(w.buf)
+
+
+def to_encodable(obj: Any) -> Any:
+    """``obj`` with every value encode_value cannot represent replaced by ``str(value)``."""
+    if obj is None or isinstance(obj, (bool, str, int, float)):
+        return obj
+    if isinstance(obj, dict):
+        return {str(k): to_encodable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_encodable(v) for v in obj]
+    return str(obj)
+
+
+def encodable_event(event: Event) -> Event:
+    """Copy of ``event`` whose payload and tags always encode (lossy for unknown types)."""
+    return replace(
+        event,
+        payload=to_encodable(event.payload),
+        tags={str(k): str(v) for k, v in event.tags.items()},
+    )
+
+
+def decode_value(buf: bytes | bytearray | memoryview) -> Any:
+    r = _Reader(buf)
+    version = r.u8()
+    if version != VERSION:
+        raise ValueError(f"Unsupported codec version {version}")
+    return r.value()
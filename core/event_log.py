@@ -0,0 +1,351 @@
+import asyncio
+import bisect
+import mmap
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+
+from core.codec import decode_events, encodable_event, encode_events
+from core.models import Event
+
+# frame header: payload length, first event timestamp (us), event count
+FRAME_HEADER = struct.Struct("<IqI")
+# sparse index entry: first event timestamp (us), frame offset in segment
+INDEX_ENTRY = struct.Struct("<qI")
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+
+def to_epoch_us(ts: Optional[datetime]) -> int:
+    if ts is None:
+        return 0
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() * 1_000_000)
+
+
+def encode_frame(events: List[Event]) -> bytes:
+    return encode_events(events)
+
+
+def decode_frame(view: memoryview) -> List[Event]:
+    return decode_events(view)
+
+
+# -------------------------
+# WRITER
+# -------------------------
+
+class EventLog:
+    """
+    Append-only event log made of size-rotated, memory-mapped segments.
+
+    Appends are buffered and committed as one frame per group (by count or
+    age), so the mmap copy and the msync are paid once per group rather than
+    once per event. ``append`` only buffers: commits run in a worker thread
+    driven by ``run_flusher``, so segment rotation and msync never block the
+    publish path. Each segment has a sparse ``.idx`` of
+    (first timestamp, offset) pairs used by EventLogReader to seek.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        group_commit_events: int = 256,
+        group_commit_seconds: float = 0.05,
+        index_interval_bytes: int = 64 * 1024,
+        sync: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.group_commit_events = group_commit_events
+        self.group_commit_seconds = group_commit_seconds
+        self.index_interval_bytes = index_interval_bytes
+        self.sync = sync
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._buffer: List[Event] = []
+        self._buffer_since = 0.0
+        # short: guards the buffer swap; long: serializes commits (flusher thread vs close)
+        self._buffer_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._wake = asyncio.Event()
+
+        self._segment_id = self._next_segment_id()
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._index_file = None
+        self._pos = 0
+        self._last_index_pos = -1
+
+        self.appended_total = 0
+        self.commits_total = 0
+
+    # -------------------------
+    # SEGMENTS
+    # -------------------------
+
+    def _next_segment_id(self) -> int:
+        ids = [int(p.stem) for p in self.directory.glob(f"*{SEGMENT_SUFFIX}") if p.stem.isdigit()]
+        return max(ids) + 1 if ids else 0
+
+    def _open_segment(self, min_bytes: int) -> None:
+        size = max(self.segment_bytes, min_bytes)
+        path = self.directory / f"{self._segment_id:08d}{SEGMENT_SUFFIX}"
+
+        self._file = open(path, "w+b")
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._index_file = open(path.with_suffix(INDEX_SUFFIX), "ab")
+        self._pos = 0
+        self._last_index_pos = -1
+
+    def _close_segment(self) -> None:
+        if self._mm is None:
+            return
+
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(self._pos)
+        self._file.close()
+        self._index_file.close()
+
+        self._mm = None
+        self._file = None
+        self._index_file = None
+        self._segment_id += 1
+
+    # -------------------------
+    # APPEND / COMMIT
+    # -------------------------
+
+    def append(self, event: Event) -> None:
+        with self._buffer_lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.append(event)
+            n = len(self._buffer)
+        self.appended_total += 1
+
+        if n >= self.group_commit_events:
+            self._wake.set()
+
+    def extend(self, events: List[Event]) -> None:
+        if not events:
+            return
+        with self._buffer_lock:
+            if not self._buffer:
+                self._buffer_since = time.monotonic()
+            self._buffer.extend(events)
+            n = len(self._buffer)
+        self.appended_total += len(events)
+
+        if n >= self.group_commit_events:
+            self._wake.set()
+
+    def _commit_due(self) -> bool:
+        buffered = len(self._buffer)
+        return buffered > 0 and (
+            buffered >= self.group_commit_events
+            or time.monotonic() - self._buffer_since >= self.group_commit_seconds
+        )
+
+    def commit_if_due(self) -> None:
+        if self._commit_due():
+            self.commit()
+
+    def commit(self) -> None:
+        with self._commit_lock:
+            with self._buffer_lock:
+                events = self._buffer
+                self._buffer = []
+            if events:
+                self._write_frame(events)
+
+    def _write_frame(self, events: List[Event]) -> None:
+        try:
+            frame = encode_frame(events)
+        except (TypeError, AttributeError) as exc:
+            # keep the group: log unknown payload/tag values as their str()
+            print(f"[EventLog] Encoding failed ({exc}); storing unencodable values as strings")
+            frame = encode_frame([encodable_event(e) for e in events])
+        first_ts = to_epoch_us(events[0].timestamp)
+        needed = FRAME_HEADER.size + len(frame)
+
+        # keep one zeroed header free as the end-of-segment marker
+        if self._mm is not None and self._pos + needed + FRAME_HEADER.size > len(self._mm):
+            self._close_segment()
+        if self._mm is None:
+            self._open_segment(needed + FRAME_HEADER.size)
+
+        offset = self._pos
+        FRAME_HEADER.pack_into(self._mm, offset, len(frame), first_ts, len(events))
+        self._mm[offset + FRAME_HEADER.size: offset + needed] = frame
+        self._pos += needed
+
+        if self._last_index_pos < 0 or offset - self._last_index_pos >= self.index_interval_bytes:
+            self._index_file.write(INDEX_ENTRY.pack(first_ts, offset))
+            self._index_file.flush()
+            self._last_index_pos = offset
+
+        if self.sync:
+            self._mm.flush()
+        self.commits_total += 1
+
+    async def run_flusher(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                # a full group wakes the flusher early
+                await asyncio.wait_for(self._wake.wait(), timeout=self.group_commit_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._commit_due():
+                await asyncio.to_thread(self.commit)
+
+    def close(self) -> None:
+        self.commit()
+        self._close_segment()
+
+
+# -------------------------
+# READER / REPLAY
+# -------------------------
+
+@dataclass(frozen=True)
+class _Segment:
+    path: Path
+    index: List[Tuple[int, int]]
+
+    @property
+    def first_ts(self) -> Optional[int]:
+        return self.index[0][0] if self.index else None
+
+
+class EventLogReader:
+    """
+    Reads events back in log (publish) order.
+
+    The log is only roughly ordered by timestamp: batched sources publish
+    overlapping time ranges. ``read(start, end)`` therefore filters every
+    event by its own timestamp, and only trusts the frame headers within
+    ``order_slack``: it seeks to ``start - order_slack`` and stops at the
+    first frame whose first timestamp is past ``end + order_slack``. Events
+    logged further out of order than that can be missed by a ranged read.
+    """
+
+    def __init__(self, directory: str | Path, order_slack: timedelta = timedelta(seconds=5)):
+        self.directory = Path(directory)
+        self.order_slack_us = int(order_slack.total_seconds() * 1_000_000)
+
+    def _segments(self) -> List[_Segment]:
+        out = []
+        for path in sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}")):
+            idx_path = path.with_suffix(INDEX_SUFFIX)
+            index: List[Tuple[int, int]] = []
+            if idx_path.exists():
+                data = idx_path.read_bytes()
+                usable = len(data) - len(data) % INDEX_ENTRY.size
+                index = [e for e in INDEX_ENTRY.iter_unpack(data[:usable])]
+            out.append(_Segment(path=path, index=index))
+        return out
+
+    def seek(self, start: Optional[datetime]) -> Tuple[int, int]:
+        """Return (segment position, byte offset) of the first frame that may hold ``start``."""
+        segments = self._segments()
+        if start is None or not segments:
+            return 0, 0
+
+        target = to_epoch_us(start)
+        firsts = [s.first_ts if s.first_ts is not None else -1 for s in segments]
+        seg_pos = max(bisect.bisect_right(firsts, target) - 1, 0)
+
+        index = segments[seg_pos].index
+        keys = [ts for ts, _ in index]
+        i = bisect.bisect_right(keys, target) - 1
+        return seg_pos, index[i][1] if i >= 0 else 0
+
+    def _frames(self, seg_pos: int, offset: int) -> Iterator[Tuple[int, List[Event]]]:
+        segments = self._segments()
+        for pos in range(seg_pos, len(segments)):
+            path = segments[pos].path
+            if path.stat().st_size == 0:
+                continue
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    cur = offset if pos == seg_pos else 0
+                    while cur + FRAME_HEADER.size <= len(mm):
+                        length, first_ts, count = FRAME_HEADER.unpack_from(mm, cur)
+                        if length == 0:
+                            break
+                        body = cur + FRAME_HEADER.size
+                        yield first_ts, decode_frame(view[body: body + length])
+                        cur = body + length
+                finally:
+                    view.release()
+
+    def read(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Event]:
+        start_us = to_epoch_us(start) if start is not None else None
+        end_us = to_epoch_us(end) if end is not None else None
+
+        slack = timedelta(microseconds=self.order_slack_us)
+        seg_pos, offset = self.seek(start - slack if start is not None else None)
+        for first_ts, events in self._frames(seg_pos, offset):
+            if end_us is not None and first_ts >= end_us + self.order_slack_us:
+                return
+            for ev in events:
+                ts = to_epoch_us(ev.timestamp)
+                if start_us is not None and ts < start_us:
+                    continue
+                if end_us is not None and ts >= end_us:
+                    continue
+                yield ev
+
+    async def replay(
+        self,
+        publish: Callable[[Event], Awaitable[object]],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        speed: Optional[float] = None,
+        stop_event: Optional[asyncio.Event] = None,
+        yield_every: int = 256,
+    ) -> int:
+        """
+        Stream logged events into ``publish``. ``speed=None`` replays as fast
+        as possible; otherwise recorded gaps are compressed by ``speed``.
+        """
+        sent = 0
+        first_ts: Optional[int] = None
+        wall_start = time.monotonic()
+
+        for ev in self.read(start, end):
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            if speed is not None:
+                ts = to_epoch_us(ev.timestamp)
+                if first_ts is None:
+                    first_ts = ts
+                due = (ts - first_ts) / 1_000_000 / speed
+                delay = due - (time.monotonic() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await publish(ev)
+            sent += 1
+            if sent % yield_every == 0:
+                await asyncio.sleep(0)
+
+        return sent
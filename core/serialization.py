@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from core.models import Event, EventSource, EventType
+
+
+# -------------------------
+# EVENT <-> JSON-READY DICT
+# -------------------------
+
+def event_to_dict(event: Event) -> Dict[str, Any]:
+    ts = event.timestamp
+    return {
+        "id": event.id,
+        "source": event.source.value,
+        "event_type": event.event_type.value,
+        "timestamp": ts.isoformat() if ts is not None else None,
+        "payload": event.payload,
+        "tags": event.tags,
+        "correlation_id": event.correlation_id,
+    }
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    ts = data.get("timestamp")
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    elif isinstance(ts, (int, float)):
+        ts = datetime.fromtimestamp(ts, tz=timezone.utc)
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+
+    kwargs: Dict[str, Any] = {
+        "source": EventSource(data.get("source", EventSource.FEED.value)),
+        "event_type": EventType(data.get("event_type", EventType.RAW.value)),
+        "timestamp": ts,
+        "payload": data.get("payload") or {},
+        "tags": data.get("tags") or {},
+        "correlation_id": data.get("correlation_id"),
+    }
+    if data.get("id"):
+        kwargs["id"] = data["id"]
+    return Event(**kwargs)
@@ -4,7 +4,9 @@ import time
 import math
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from metrics.histogram import LogHistogram, WindowedHistogram, summarize
 
 
 def _now_s() -> float:
@@ -13,45 +15,67 @@ def _now_s() -> float:
 
 @dataclass
 class RateMeter:
+    """
+    Events/sec over a sliding window, kept as a fixed ring of per-bucket
+    counters. mark(n) is O(1) and memory is constant regardless of rate; the
+    window edge is accurate to one bucket.
+    """
+
     window_seconds: float = 10.0
-    _timestamps: Deque[float] = field(default_factory=deque)
+    bucket_seconds: float = 0.1
+    _counts: List[int] = field(init=False, repr=False)
+    _bucket_ids: List[int] = field(init=False, repr=False)
 
-    def mark(self, n: int = 1) -> None:
-        t = _now_s()
-        for _ in range(n):
-            self._timestamps.append(t)
-        self._trim(t)
+    def __post_init__(self) -> None:
+        self._n = max(1, int(round(self.window_seconds / self.bucket_seconds)))
+        self._counts = [0] * self._n
+        self._bucket_ids = [-1] * self._n
 
-    def _trim(self, now: float) -> None:
-        cutoff = now - self.window_seconds
-        while self._timestamps and self._timestamps[0] < cutoff:
-            self._timestamps.popleft()
+    def mark(self, n: int = 1) -> None:
+        b = int(_now_s() / self.bucket_seconds)
+        i = b % self._n
+        if self._bucket_ids[i] != b:
+            self._bucket_ids[i] = b
+            self._counts[i] = n
+        else:
+            self._counts[i] += n
+
+    def count(self) -> int:
+        oldest = int(_now_s() / self.bucket_seconds) - self._n
+        return sum(c for c, b in zip(self._counts, self._bucket_ids) if b > oldest)
 
     def rate_per_sec(self) -> float:
-        now = _now_s()
-        self._trim(now)
-        return len(self._timestamps) / self.window_seconds
+        return self.count() / self.window_seconds
 
 
-@dataclass
 class LatencyMeter:
-    max_samples: int = 2000
-    _samples_ms: Deque[float] = field(default_factory=deque)
+    """
+    Latency distribution backed by a log-bucketed histogram: O(1) add and
+    bounded relative error, over a sliding window plus a cumulative view.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, slices: int = 6, relative_error: float = 0.01):
+        self._hist = WindowedHistogram(window_seconds=window_seconds, slices=slices, relative_error=relative_error)
 
     def add(self, latency_ms: float) -> None:
-        self._samples_ms.append(latency_ms)
-        while len(self._samples_ms) > self.max_samples:
-            self._samples_ms.popleft()
+        self._hist.record(latency_ms)
 
-    def snapshot(self) -> Dict[str, Optional[float]]:
-        if not self._samples_ms:
-            return {"avg_ms": None, "p50_ms": None, "p95_ms": None}
-        xs = sorted(self._samples_ms)
-        n = len(xs)
-        avg = sum(xs) / n
-        p50 = xs[int(0.50 * (n - 1))]
-        p95 = xs[int(0.95 * (n - 1))]
-        return {"avg_ms": avg, "p50_ms": p50, "p95_ms": p95}
+    def merge(self, other: "LatencyMeter") -> "LatencyMeter":
+        self._hist.merge(other._hist)
+        return self
+
+    @classmethod
+    def merged(cls, meters: Iterable["LatencyMeter"]) -> "LatencyMeter":
+        out = cls()
+        for m in meters:
+            out.merge(m)
+        return out
+
+    def histogram(self, cumulative: bool = False) -> LogHistogram:
+        return self._hist.cumulative if cumulative else self._hist.recent()
+
+    def snapshot(self, cumulative: bool = False) -> Dict[str, Optional[float]]:
+        return summarize(self.histogram(cumulative))
 
 
 @dataclass
@@ -64,6 +88,70 @@ class WindowMetric:
     aggregation_time_ms: float
 
 
+@dataclass
+class SinkStats:
+    rows_total: int = 0
+    flushes_total: int = 0
+    errors_total: int = 0
+    rows_rate: RateMeter = field(default_factory=lambda: RateMeter(window_seconds=10.0))
+    flush_latency: LatencyMeter = field(default_factory=lambda: LatencyMeter())
+
+
+@dataclass
+class FreshnessStats:
+    # emit time minus the oldest / newest contributing event of each aggregate
+    oldest: LatencyMeter = field(default_factory=lambda: LatencyMeter())
+    newest: LatencyMeter = field(default_factory=lambda: LatencyMeter())
+
+
+@dataclass
+class LoopStats:
+    lag: LatencyMeter = field(default_factory=lambda: LatencyMeter())
+    tasks: Dict[str, int] = field(default_factory=dict)
+    slow_callbacks_total: int = 0
+    slow_callbacks: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=20))
+
+
+@dataclass
+class QueueDepthGauge:
+    """
+    Sampled depth of one queue. Samples fold into the open interval and
+    roll() publishes its min/max/mean; high_water never decreases.
+    """
+
+    last: int = 0
+    high_water: int = 0
+    interval_min: Optional[int] = None
+    interval_max: Optional[int] = None
+    interval_mean: Optional[float] = None
+    _min: int = field(default=0, repr=False)
+    _max: int = field(default=0, repr=False)
+    _sum: int = field(default=0, repr=False)
+    _n: int = field(default=0, repr=False)
+
+    def sample(self, depth: int) -> None:
+        self.last = depth
+        if depth > self.high_water:
+            self.high_water = depth
+        if self._n == 0:
+            self._min = self._max = depth
+        elif depth < self._min:
+            self._min = depth
+        elif depth > self._max:
+            self._max = depth
+        self._sum += depth
+        self._n += 1
+
+    def roll(self) -> None:
+        if self._n == 0:
+            return
+        self.interval_min = self._min
+        self.interval_max = self._max
+        self.interval_mean = self._sum / self._n
+        self._sum = 0
+        self._n = 0
+
+
 @dataclass
 class MetricsCollector:
     # ingestion
@@ -86,27 +174,36 @@ class MetricsCollector:
     process_rate: RateMeter = field(default_factory=lambda: RateMeter(window_seconds=10.0))
     aggregate_rate: RateMeter = field(default_factory=lambda: RateMeter(window_seconds=10.0))
 
-    # latency (global)
-    event_processing_latency: LatencyMeter = field(default_factory=lambda: LatencyMeter(max_samples=2000))
+    # per-stage latency (sampled spans, see metrics.tracing)
+    stage_latency: Dict[str, LatencyMeter] = field(default_factory=dict)
 
-    # queue sizes (last observed)
-    last_queue_sizes: Dict[str, int] = field(default_factory=dict)
+    # result freshness (per aggregate source)
+    freshness_by_source: Dict[str, FreshnessStats] = field(default_factory=dict)
+
+    # event-loop health (see runtime.loop_monitor)
+    loop: LoopStats = field(default_factory=LoopStats)
+
+    # queue depths (sampled periodically, not per event)
+    queue_depths: Dict[str, QueueDepthGauge] = field(default_factory=dict)
 
     # window metrics (rolling)
     window_max_samples: int = 200
     windows: Deque[WindowMetric] = field(default_factory=deque)
 
+    # sinks (per sink name)
+    sinks: Dict[str, SinkStats] = field(default_factory=dict)
+
     # -------- internal helpers --------
 
     def _ensure_source(self, source: str) -> None:
         if source not in self.process_rate_by_source:
             self.process_rate_by_source[source] = RateMeter(window_seconds=10.0)
         if source not in self.latency_by_source:
-            self.latency_by_source[source] = LatencyMeter(max_samples=2000)
+            self.latency_by_source[source] = LatencyMeter()
 
     # -------- hooks --------
 
-    def record_ingest(self, source: str, dropped: bool, queue_sizes: Dict[str, int]) -> None:
+    def record_ingest(self, source: str, dropped: bool) -> None:
         self.ingested_total += 1
         self.ingested_by_source[source] = self.ingested_by_source.get(source, 0) + 1
         self.ingest_rate.mark()
@@ -115,18 +212,65 @@ class MetricsCollector:
             self.dropped_total += 1
             self.dropped_by_source[source] = self.dropped_by_source.get(source, 0) + 1
 
-        self.last_queue_sizes = dict(queue_sizes)
+    def record_ingest_batch(self, ingested: Dict[str, int], dropped: Dict[str, int]) -> None:
+        """record_ingest for a whole batch, given per-source counts."""
+        total = 0
+        for source, n in ingested.items():
+            total += n
+            self.ingested_by_source[source] = self.ingested_by_source.get(source, 0) + n
+        self.ingested_total += total
+        if total:
+            self.ingest_rate.mark(total)
+
+        for source, n in dropped.items():
+            self.dropped_total += n
+            self.dropped_by_source[source] = self.dropped_by_source.get(source, 0) + n
+
+    def record_queue_sample(self, sizes: Dict[str, int]) -> None:
+        for name, depth in sizes.items():
+            gauge = self.queue_depths.get(name)
+            if gauge is None:
+                gauge = self.queue_depths[name] = QueueDepthGauge()
+            gauge.sample(depth)
+
+    def roll_queue_depths(self) -> None:
+        for gauge in self.queue_depths.values():
+            gauge.roll()
 
     def record_processed(self, source: str, latency_ms: float) -> None:
         self.processed_total += 1
         self.process_rate.mark()
-        self.event_processing_latency.add(latency_ms)
 
         self._ensure_source(source)
         self.processed_by_source[source] = self.processed_by_source.get(source, 0) + 1
         self.process_rate_by_source[source].mark()
         self.latency_by_source[source].add(latency_ms)
 
+    def record_stage(self, stage: str, latency_ms: float) -> None:
+        meter = self.stage_latency.get(stage)
+        if meter is None:
+            meter = self.stage_latency[stage] = LatencyMeter()
+        meter.add(latency_ms)
+
+    def record_freshness(self, source: str, oldest_ms: float, newest_ms: float) -> None:
+        stats = self.freshness_by_source.get(source)
+        if stats is None:
+            stats = self.freshness_by_source[source] = FreshnessStats()
+        stats.oldest.add(oldest_ms)
+        stats.newest.add(newest_ms)
+
+    def record_loop_lag(self, lag_ms: float) -> None:
+        self.loop.lag.add(lag_ms)
+
+    def record_task_counts(self, counts: Dict[str, int]) -> None:
+        self.loop.tasks = counts
+
+    def record_slow_callback(self, task: str, where: str, blocked_ms: float) -> None:
+        self.loop.slow_callbacks_total += 1
+        self.loop.slow_callbacks.append(
+            {"at": _now_s(), "task": task, "where": where, "blocked_ms": blocked_ms}
+        )
+
     def record_aggregated(self) -> None:
         self.aggregated_total += 1
         self.aggregate_rate.mark()
@@ -155,6 +299,40 @@ class MetricsCollector:
         while len(self.windows) > self.window_max_samples:
             self.windows.popleft()
 
+    def record_sink_flush(self, sink: str, rows: int, latency_ms: float, error: bool = False) -> None:
+        stats = self.sinks.get(sink)
+        if stats is None:
+            stats = self.sinks[sink] = SinkStats()
+        stats.flushes_total += 1
+        if error:
+            stats.errors_total += 1
+            return
+        stats.rows_total += rows
+        stats.rows_rate.mark(rows)
+        stats.flush_latency.add(latency_ms)
+
+    # -------- checkpointing --------
+
+    def counters(self) -> Dict[str, Any]:
+        return {
+            "ingested_total": self.ingested_total,
+            "ingested_by_source": dict(self.ingested_by_source),
+            "dropped_total": self.dropped_total,
+            "dropped_by_source": dict(self.dropped_by_source),
+            "processed_total": self.processed_total,
+            "processed_by_source": dict(self.processed_by_source),
+            "aggregated_total": self.aggregated_total,
+        }
+
+    def restore_counters(self, counters: Dict[str, Any]) -> None:
+        self.ingested_total = counters.get("ingested_total", 0)
+        self.ingested_by_source = dict(counters.get("ingested_by_source", {}))
+        self.dropped_total = counters.get("dropped_total", 0)
+        self.dropped_by_source = dict(counters.get("dropped_by_source", {}))
+        self.processed_total = counters.get("processed_total", 0)
+        self.processed_by_source = dict(counters.get("processed_by_source", {}))
+        self.aggregated_total = counters.get("aggregated_total", 0)
+
     # -------- reporting --------
 
     def _window_summary(self) -> Dict[str, Any]:
@@ -200,11 +378,17 @@ class MetricsCollector:
             "aggregates_emitted_avg": sum(w.aggregates_emitted for w in self.windows) / n,
         }
 
+    def global_latency(self) -> LatencyMeter:
+        # per-source histograms merge exactly, so the global view is derived
+        # instead of recording every event twice
+        return LatencyMeter.merged(self.latency_by_source.values())
+
     def snapshot(self) -> Dict:
+        global_latency = self.global_latency()
         per_source = {}
         for src in sorted(set(self.ingested_by_source.keys()) | set(self.processed_by_source.keys())):
             rate = self.process_rate_by_source[src].rate_per_sec() if src in self.process_rate_by_source else 0.0
-            lat = self.latency_by_source[src].snapshot() if src in self.latency_by_source else {"avg_ms": None, "p50_ms": None, "p95_ms": None}
+            lat = self.latency_by_source[src].snapshot() if src in self.latency_by_source else LatencyMeter().snapshot()
             per_source[src] = {
                 "processed_total": self.processed_by_source.get(src, 0),
                 "process_eps": rate,
@@ -223,9 +407,41 @@ class MetricsCollector:
                 "process": self.process_rate.rate_per_sec(),
                 "aggregate": self.aggregate_rate.rate_per_sec(),
             },
-            "event_processing_latency_ms": self.event_processing_latency.snapshot(),
+            "event_processing_latency_ms": global_latency.snapshot(),
+            "event_processing_latency_cumulative_ms": global_latency.snapshot(cumulative=True),
             "per_source_processing": per_source,
-            "queue_sizes": dict(self.last_queue_sizes),
+            "stage_latency_ms": {stage: m.snapshot() for stage, m in self.stage_latency.items()},
+            "result_freshness_ms": {
+                src: {"oldest": f.oldest.snapshot(), "newest": f.newest.snapshot()}
+                for src, f in sorted(self.freshness_by_source.items())
+            },
+            "loop": {
+                "lag_ms": self.loop.lag.snapshot(),
+                "tasks": dict(self.loop.tasks),
+                "tasks_total": sum(self.loop.tasks.values()),
+                "slow_callbacks_total": self.loop.slow_callbacks_total,
+                "slow_callbacks": list(self.loop.slow_callbacks),
+            },
+            "queue_sizes": {name: g.last for name, g in self.queue_depths.items()},
+            "queue_depth": {
+                name: {
+                    "min": g.interval_min,
+                    "max": g.interval_max,
+                    "mean": g.interval_mean,
+                    "high_water": g.high_water,
+                }
+                for name, g in self.queue_depths.items()
+            },
             "drop_ratio": (self.dropped_total / self.ingested_total) if self.ingested_total else 0.0,
             "window_metrics": self._window_summary(),
+            "sinks": {
+                name: {
+                    "rows_total": st.rows_total,
+                    "flushes_total": st.flushes_total,
+                    "errors_total": st.errors_total,
+                    "rows_per_sec": st.rows_rate.rate_per_sec(),
+                    "flush_latency_ms": st.flush_latency.snapshot(),
+                }
+                for name, st in self.sinks.items()
+            },
         }
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from metrics.collector import LatencyMeter, MetricsCollector
+from metrics.histogram import DEFAULT_QUANTILES
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "pipeline"
+
+Labels = Dict[str, str]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _num(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str, unit: str = ""):
+        self.name = f"{PREFIX}_{name}"
+        self.kind = kind
+        self.help_text = help_text
+        self.unit = unit
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+    def add(self, value: float, labels: Optional[Labels] = None, suffix: str = "") -> None:
+        self.samples.append((suffix, labels or {}, value))
+
+    def render(self, out: List[str]) -> None:
+        if not self.samples:
+            return
+        out.append(f"# TYPE {self.name} {self.kind}")
+        if self.unit:
+            out.append(f"# UNIT {self.name} {self.unit}")
+        out.append(f"# HELP {self.name} {_escape(self.help_text)}")
+        for suffix, labels, value in self.samples:
+            out.append(f"{self.name}{suffix}{_labels(labels)} {_num(value)}")
+
+
+def _counter(name: str, help_text: str) -> _Family:
+    return _Family(name, "counter", help_text)
+
+
+def _gauge(name: str, help_text: str) -> _Family:
+    return _Family(name, "gauge", help_text)
+
+
+def _summary(name: str, help_text: str) -> _Family:
+    return _Family(name, "summary", help_text, unit="seconds")
+
+
+def _add_latency(family: _Family, meter: LatencyMeter, labels: Labels) -> None:
+    # quantiles over the recent window, count/sum cumulative (must be monotonic)
+    recent = meter.histogram()
+    for q, v in zip(DEFAULT_QUANTILES, recent.quantiles(DEFAULT_QUANTILES)):
+        if v is not None:
+            family.add(v / 1000.0, {**labels, "quantile": str(q)})
+    cumulative = meter.histogram(cumulative=True)
+    family.add(cumulative.count, labels, "_count")
+    family.add(cumulative.total / 1000.0, labels, "_sum")
+
+
+def render_openmetrics(metrics: MetricsCollector) -> str:
+    """
+    Renders the collector in OpenMetrics text format. Everything is read from
+    counters, rate buckets and histogram buckets, so the cost of a scrape
+    does not depend on traffic.
+    """
+    ingested = _counter("events_ingested", "Events published to the bus.")
+    for src, n in sorted(metrics.ingested_by_source.items()):
+        ingested.add(n, {"source": src}, "_total")
+
+    dropped = _counter("events_dropped", "Events dropped because a bus queue was full.")
+    for src, n in sorted(metrics.dropped_by_source.items()):
+        dropped.add(n, {"source": src}, "_total")
+
+    processed = _counter("events_processed", "Events consumed by the window processor.")
+    for src, n in sorted(metrics.processed_by_source.items()):
+        processed.add(n, {"source": src}, "_total")
+
+    aggregated = _counter("aggregates_emitted", "Aggregated events emitted.")
+    aggregated.add(metrics.aggregated_total, suffix="_total")
+
+    rates = _gauge("rate_events_per_second", "Events per second over the last 10 seconds.")
+    rates.add(metrics.ingest_rate.rate_per_sec(), {"stage": "ingest"})
+    rates.add(metrics.process_rate.rate_per_sec(), {"stage": "process"})
+    rates.add(metrics.aggregate_rate.rate_per_sec(), {"stage": "aggregate"})
+    for src, meter in sorted(metrics.process_rate_by_source.items()):
+        rates.add(meter.rate_per_sec(), {"stage": "process", "source": src})
+
+    latency = _summary("event_processing_latency_seconds", "Event timestamp to dequeue by the processor.")
+    for src, meter in sorted(metrics.latency_by_source.items()):
+        _add_latency(latency, meter, {"source": src})
+
+    stages = _summary("stage_latency_seconds", "Sampled per-stage pipeline latency.")
+    for stage, meter in metrics.stage_latency.items():
+        _add_latency(stages, meter, {"stage": stage})
+
+    freshness = _summary("result_freshness_seconds", "Aggregate emit time minus contributing event time.")
+    for src, f in sorted(metrics.freshness_by_source.items()):
+        _add_latency(freshness, f.oldest, {"source": src, "edge": "oldest"})
+        _add_latency(freshness, f.newest, {"source": src, "edge": "newest"})
+
+    loop_lag = _summary("loop_lag_seconds", "Event-loop scheduling lag from the drift probe.")
+    _add_latency(loop_lag, metrics.loop.lag, {})
+    tasks = _gauge("loop_tasks", "Live asyncio tasks by coroutine name.")
+    for name, n in sorted(metrics.loop.tasks.items()):
+        tasks.add(n, {"coroutine": name})
+    slow = _counter("loop_slow_callbacks", "Loop stalls longer than the slow-callback threshold.")
+    slow.add(metrics.loop.slow_callbacks_total, suffix="_total")
+
+    depth = _gauge("queue_depth", "Sampled queue depth.")
+    depth_hw = _gauge("queue_depth_high_water", "Largest sampled queue depth since start.")
+    for name, g in sorted(metrics.queue_depths.items()):
+        depth.add(g.last, {"queue": name, "stat": "last"})
+        for stat, v in (("min", g.interval_min), ("max", g.interval_max), ("mean", g.interval_mean)):
+            if v is not None:
+                depth.add(v, {"queue": name, "stat": stat})
+        depth_hw.add(g.high_water, {"queue": name})
+
+    sink_rows = _counter("sink_rows", "Rows written by a sink.")
+    sink_flushes = _counter("sink_flushes", "Sink flushes, including failed ones.")
+    sink_errors = _counter("sink_errors", "Failed sink flushes.")
+    sink_latency = _summary("sink_flush_latency_seconds", "Sink flush latency.")
+    for name, st in sorted(metrics.sinks.items()):
+        sink_rows.add(st.rows_total, {"sink": name}, "_total")
+        sink_flushes.add(st.flushes_total, {"sink": name}, "_total")
+        sink_errors.add(st.errors_total, {"sink": name}, "_total")
+        _add_latency(sink_latency, st.flush_latency, {"sink": name})
+
+    out: List[str] = []
+    for family in (
+        ingested, dropped, processed, aggregated, rates,
+        latency, stages, freshness, loop_lag, tasks, slow, depth, depth_hw,
+        sink_rows, sink_flushes, sink_errors, sink_latency,
+    ):
+        family.render(out)
+    out.append("# EOF")
+    return "\n".join(out) + "\n"
+
+
+# -------------------------
+# HTTP ENDPOINT
+# -------------------------
+
+class MetricsServer:
+    """
+    Minimal HTTP/1.1 endpoint on the engine's event loop serving
+    ``GET /metrics``. Requests are handled inline (rendering is cheap), one
+    response per connection.
+    """
+
+    def __init__(self, metrics: MetricsCollector, host: str = "127.0.0.1", port: int = 9464):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        await self.start()
+        try:
+            await stop_event.wait()
+        finally:
+            await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            method, path = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+
+            if method not in ("GET", "HEAD"):
+                status, ctype, body = "405 Method Not Allowed", "text/plain", b"method not allowed\n"
+            elif path.split("?", 1)[0] != "/metrics":
+                status, ctype, body = "404 Not Found", "text/plain", b"not found\n"
+            else:
+                status, ctype, body = "200 OK", CONTENT_TYPE, render_openmetrics(self.metrics).encode()
+
+            head = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {ctype}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            writer.write(head if method == "HEAD" else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
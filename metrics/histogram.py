@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def _now_s() -> float:
+    return time.time()
+
+
+DEFAULT_QUANTILES = (0.50, 0.95, 0.99, 0.999)
+
+
+# -------------------------
+# LOG-BUCKETED HISTOGRAM
+# -------------------------
+
+class LogHistogram:
+    """
+    Fixed-size histogram with logarithmic buckets (DDSketch-style).
+
+    Bucket i covers (min_value * g^(i-1), min_value * g^i] with
+    g = (1 + e) / (1 - e), so any reported quantile is within relative error
+    ``e`` of the true value. record() is O(1); quantile queries walk only the
+    occupied bucket range. Histograms with the same parameters merge by
+    adding counts.
+    """
+
+    __slots__ = (
+        "relative_error", "min_value", "max_value",
+        "_gamma", "_log_gamma", "_counts",
+        "count", "total", "min", "max", "_lo", "_hi",
+    )
+
+    def __init__(self, relative_error: float = 0.01, min_value: float = 1e-3, max_value: float = 1e7):
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        n = int(math.ceil(math.log(max_value / min_value) / self._log_gamma)) + 2
+        self._counts = array("q", bytes(8 * n))
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._lo = n
+        self._hi = -1
+
+    # -------- recording --------
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        i = int(math.ceil(math.log(value / self.min_value) / self._log_gamma))
+        return min(i, len(self._counts) - 1)
+
+    def record(self, value: float, n: int = 1) -> None:
+        self._add(self._index(value), value, n)
+
+    def _add(self, i: int, value: float, n: int) -> None:
+        self._counts[i] += n
+        if i < self._lo:
+            self._lo = i
+        if i > self._hi:
+            self._hi = i
+        self.count += n
+        self.total += value * n
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _compatible(self, other: "LogHistogram") -> bool:
+        return (
+            self.relative_error == other.relative_error
+            and self.min_value == other.min_value
+            and self.max_value == other.max_value
+        )
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        if not self._compatible(other):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if other.count == 0:
+            return self
+        counts, theirs = self._counts, other._counts
+        for i in range(other._lo, other._hi + 1):
+            c = theirs[i]
+            if c:
+                counts[i] += c
+        self._lo = min(self._lo, other._lo)
+        self._hi = max(self._hi, other._hi)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def empty_like(self) -> "LogHistogram":
+        return LogHistogram(self.relative_error, self.min_value, self.max_value)
+
+    def reset(self) -> None:
+        self._counts = array("q", bytes(8 * len(self._counts)))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._lo = len(self._counts)
+        self._hi = -1
+
+    # -------- queries --------
+
+    def _bucket_value(self, i: int) -> float:
+        if i == 0:
+            return self.min_value
+        # midpoint (in relative terms) of (min * g^(i-1), min * g^i]
+        return self.min_value * 2 * self._gamma ** i / (self._gamma + 1)
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> List[Optional[float]]:
+        if self.count == 0:
+            return [None for _ in qs]
+
+        order = sorted(range(len(qs)), key=lambda k: qs[k])
+        ranks = [max(1, int(math.ceil(qs[k] * self.count))) for k in order]
+        out: List[Optional[float]] = [None] * len(qs)
+
+        counts = self._counts
+        seen = 0
+        j = 0
+        for i in range(self._lo, self._hi + 1):
+            seen += counts[i]
+            while j < len(ranks) and seen >= ranks[j]:
+                v = self._bucket_value(i)
+                out[order[j]] = min(max(v, self.min), self.max)
+                j += 1
+            if j == len(ranks):
+                break
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles((q,))[0]
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def buckets(self) -> Iterable[tuple[float, int]]:
+        """(upper bound, count) for each occupied bucket, for exposition."""
+        for i in range(self._lo, self._hi + 1):
+            c = self._counts[i]
+            if c:
+                yield self.min_value * self._gamma ** i, c
+
+
+# -------------------------
+# TIME-WINDOWED VIEW
+# -------------------------
+
+class WindowedHistogram:
+    """
+    Ring of ``slices`` LogHistograms, each covering window_seconds / slices.
+    recent() merges the live slices (a sliding, step-decayed view);
+    cumulative holds everything since creation.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        slices: int = 6,
+        relative_error: float = 0.01,
+    ):
+        self.window_seconds = window_seconds
+        self.slice_seconds = window_seconds / slices
+        self.cumulative = LogHistogram(relative_error=relative_error)
+        self._slices = [self.cumulative.empty_like() for _ in range(slices)]
+        self._slice_ids = [-1] * slices
+
+    def _current(self) -> LogHistogram:
+        sid = int(_now_s() / self.slice_seconds)
+        i = sid % len(self._slices)
+        if self._slice_ids[i] != sid:
+            self._slice_ids[i] = sid
+            self._slices[i].reset()
+        return self._slices[i]
+
+    def record(self, value: float) -> None:
+        # slices share the cumulative layout, so the bucket index is computed once
+        i = self.cumulative._index(value)
+        self._current()._add(i, value, 1)
+        self.cumulative._add(i, value, 1)
+
+    def recent(self) -> LogHistogram:
+        oldest = int(_now_s() / self.slice_seconds) - len(self._slices)
+        out = self.cumulative.empty_like()
+        for h, sid in zip(self._slices, self._slice_ids):
+            if sid > oldest:
+                out.merge(h)
+        return out
+
+    def merge(self, other: "WindowedHistogram") -> "WindowedHistogram":
+        if other.slice_seconds != self.slice_seconds or len(other._slices) != len(self._slices):
+            raise ValueError("Cannot merge windowed histograms with different slicing")
+        self.cumulative.merge(other.cumulative)
+        for i, (h, sid) in enumerate(zip(other._slices, other._slice_ids)):
+            if sid < 0:
+                continue
+            if self._slice_ids[i] < sid:
+                self._slice_ids[i] = sid
+                self._slices[i].reset()
+            if self._slice_ids[i] == sid:
+                self._slices[i].merge(h)
+        return self
+
+
+def summarize(hist: LogHistogram, prefix: str = "", suffix: str = "_ms") -> Dict[str, Optional[float]]:
+    p50, p95, p99, p999 = hist.quantiles(DEFAULT_QUANTILES)
+    return {
+        f"{prefix}avg{suffix}": hist.mean(),
+        f"{prefix}p50{suffix}": p50,
+        f"{prefix}p95{suffix}": p95,
+        f"{prefix}p99{suffix}": p99,
+        f"{prefix}p999{suffix}": p999,
+        f"{prefix}count": hist.count,
+    }
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from datetime import timezone
+from typing import Dict, List, Optional
+
+from core.models import Event
+from metrics.collector import MetricsCollector
+
+STAGES = (
+    "source_to_bus",
+    "queue_wait",
+    "predicates",
+    "mappers",
+    "window_push",
+    "aggregate",
+    "sink",
+)
+
+
+class StageTracer:
+    """
+    Sampled per-stage pipeline timing.
+
+    One in ``sample_every`` events accepted by the bus is stamped at enqueue.
+    Event is frozen, so the stamp is kept in a table keyed by event id. When
+    the consumer dequeues a stamped event it pops the stamp and times that
+    event's stages. At most ``max_in_flight`` stamps are held, so events that
+    never reach the consumer cannot grow the table.
+    """
+
+    def __init__(
+        self,
+        metrics: MetricsCollector,
+        sample_every: int = 16,
+        max_in_flight: int = 4096,
+    ):
+        self.metrics = metrics
+        self.sample_every = max(1, sample_every)
+        self.max_in_flight = max_in_flight
+
+        self._seen = 0
+        self._stamps: Dict[str, int] = {}
+
+    # -------- bus side --------
+
+    def on_enqueue(self, event: Event) -> None:
+        self._seen += 1
+        if self._seen % self.sample_every:
+            return
+        self._stamp(event)
+
+    def on_enqueue_batch(self, events: List[Event]) -> None:
+        """on_enqueue for a whole batch, touching only the events that get sampled."""
+        k = self.sample_every
+        first = k - 1 - self._seen % k
+        self._seen += len(events)
+        for i in range(first, len(events), k):
+            self._stamp(events[i])
+
+    def _stamp(self, event: Event) -> None:
+        if len(self._stamps) >= self.max_in_flight:
+            return
+        self._stamps[event.id] = time.perf_counter_ns()
+
+        ts = event.timestamp
+        if ts is not None:
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            self.metrics.record_stage("source_to_bus", (time.time() - ts.timestamp()) * 1000.0)
+
+    # -------- consumer side --------
+
+    def on_dequeue(self, event: Event) -> bool:
+        """Records queue wait and returns True if the event is being traced."""
+        stamp = self._stamps.pop(event.id, None)
+        if stamp is None:
+            return False
+        self.metrics.record_stage("queue_wait", (time.perf_counter_ns() - stamp) / 1e6)
+        return True
+
+    def record(self, stage: str, start_ns: int, end_ns: Optional[int] = None) -> int:
+        """Records ``stage`` as ending now (or at ``end_ns``) and returns that end stamp."""
+        end_ns = time.perf_counter_ns() if end_ns is None else end_ns
+        self.metrics.record_stage(stage, (end_ns - start_ns) / 1e6)
+        return end_ns
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._stamps)
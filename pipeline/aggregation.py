@@ -1,10 +1,41 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Callable, Dict, List, Optional
 
 from core.models import Event, EventType, EventSource
 
 Aggregator = Callable[[List[Event]], Dict]
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def event_time_stats(events: List[Event]) -> Optional[Dict[str, str]]:
+    """Min/max/mean source timestamps of ``events`` as ISO strings (UTC)."""
+    # integer microseconds keep the mean exact for large windows
+    lo = hi = None
+    total = 0
+    n = 0
+    for e in events:
+        ts = e.timestamp
+        if ts is None:
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        d = ts - _EPOCH
+        us = (d.days * 86400 + d.seconds) * 1_000_000 + d.microseconds
+        if lo is None or us < lo:
+            lo = us
+        if hi is None or us > hi:
+            hi = us
+        total += us
+        n += 1
+    if not n:
+        return None
+    return {
+        "min": (_EPOCH + timedelta(microseconds=lo)).isoformat(),
+        "max": (_EPOCH + timedelta(microseconds=hi)).isoformat(),
+        "mean": (_EPOCH + timedelta(microseconds=total // n)).isoformat(),
+    }
+
 
 def aggregate_window(
     events: List[Event],
@@ -28,6 +59,9 @@ def aggregate_window(
         "end": window_end.isoformat(),
         "count": len(events),
     }
+    event_time = event_time_stats(events)
+    if event_time is not None:
+        payload["window"]["event_time"] = event_time
 
     return Event(
         source=source,
@@ -2,11 +2,15 @@ import asyncio
 import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, List, Optional, Awaitable
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Awaitable, Tuple
 
 from core.models import Event, EventSource
 from metrics.collector import MetricsCollector
-from pipeline.aggregation import aggregate_window
+from pipeline.aggregation import Aggregator, aggregate_window
+
+if TYPE_CHECKING:
+    from metrics.tracing import StageTracer
+    from runtime.checkpoint import Checkpointer
 
 Predicate = Callable[[Event], bool]
 Mapper = Callable[[Event], Event]
@@ -43,19 +47,30 @@ class AsyncTumblingWindowProcessor:
         self._current_start: Optional[datetime] = None
         self._current_events: List[Event] = []
 
-    def _apply_pipeline(self, event: Event) -> Optional[Event]:
+    def accepts(self, event: Event) -> bool:
         for p in self.predicates:
             if not p(event):
-                return None
+                return False
+        return True
+
+    def transform(self, event: Event) -> Event:
         for m in self.mappers:
             event = m(event)
         return event
 
+    def _apply_pipeline(self, event: Event) -> Optional[Event]:
+        if not self.accepts(event):
+            return None
+        return self.transform(event)
+
     def push(self, event: Event) -> Optional[WindowBatch]:
         event = self._apply_pipeline(event)
         if event is None:
             return None
+        return self.assign(event)
 
+    def assign(self, event: Event) -> Optional[WindowBatch]:
+        """Adds an already filtered and mapped event to its window."""
         ws = floor_time_to_window(event.timestamp, self.window_size)
 
         if self._current_start is None:
@@ -91,6 +106,22 @@ class AsyncTumblingWindowProcessor:
         self._current_events = []
         return batch
 
+    # -------------------------
+    # STATE (for checkpoints)
+    # -------------------------
+
+    @property
+    def current_start(self) -> Optional[datetime]:
+        return self._current_start
+
+    @property
+    def current_events(self) -> List[Event]:
+        return self._current_events
+
+    def restore_state(self, current_start: Optional[datetime], events: List[Event]) -> None:
+        self._current_start = current_start
+        self._current_events = list(events) if current_start is not None else []
+
 
 # -------------------------
 # Aggregators
@@ -132,53 +163,227 @@ def agg_feed_actions(events: List[Event]) -> dict:
     }
 
 
-def aggregate_batch(batch: WindowBatch) -> List[Event]:
-    out: List[Event] = []
+# -------------------------
+# Aggregator registry
+# -------------------------
 
-    sensors = [e for e in batch.events if e.source == EventSource.SENSOR]
-    logs = [e for e in batch.events if e.source == EventSource.LOG]
-    feeds = [e for e in batch.events if e.source == EventSource.FEED]
+KeyFn = Callable[[Event], Hashable]
 
-    if sensors:
-        out.append(
-            aggregate_window(
-                sensors,
-                agg_sensor_avg,
-                source=EventSource.SENSOR,
-                window_start=batch.start,
-                window_end=batch.end,
-            )
-        )
 
-    if logs:
-        out.append(
-            aggregate_window(
-                logs,
-                agg_log_levels,
-                source=EventSource.LOG,
-                window_start=batch.start,
-                window_end=batch.end,
-            )
-        )
+def source_key(event: Event) -> Hashable:
+    return event.source
+
+
+@dataclass
+class AggregationResult:
+    aggregates: List[Event]
+    count_by_source: Dict[str, int]
+
+
+class AggregatorRegistry:
+    """
+    Maps partition keys to aggregators. By default events are keyed by their
+    EventSource; pass a custom key_fn to partition on anything else (tags,
+    payload fields, composite keys). Aggregates of custom keys carry the key
+    as ``payload["partition"]``, since several keys may share an output source.
+
+    Keys without an entry are skipped unless ``register_default`` is set, in
+    which case each such key becomes its own partition; that is how keys not
+    known up front (one per sensor id, say) are aggregated.
+    """
 
-    if feeds:
-        out.append(
-            aggregate_window(
-                feeds,
-                agg_feed_actions,
-                source=EventSource.FEED,
+    def __init__(self, key_fn: KeyFn = source_key):
+        self.key_fn = key_fn
+        self._entries: Dict[Hashable, Tuple[Aggregator, EventSource]] = {}
+        self._default: Optional[Tuple[Aggregator, EventSource]] = None
+
+    def register(
+        self,
+        key: Hashable,
+        aggregator: Aggregator,
+        source: Optional[EventSource] = None,
+    ) -> None:
+        if source is None:
+            if not isinstance(key, EventSource):
+                raise ValueError(f"Custom key {key!r} needs an explicit output source")
+            source = key
+        self._entries[key] = (aggregator, source)
+
+    def register_default(self, aggregator: Aggregator, source: EventSource) -> None:
+        self._default = (aggregator, source)
+
+    def unregister(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+
+    def partition(self, events: List[Event]) -> Tuple[Dict[Hashable, List[Event]], Dict[str, int]]:
+        parts: Dict[Hashable, List[Event]] = {key: [] for key in self._entries}
+        count_by_source = {source.value: 0 for source in EventSource}
+        key_fn = self.key_fn
+        dynamic = self._default is not None
+
+        for e in events:
+            src = e.source.value
+            count_by_source[src] = count_by_source.get(src, 0) + 1
+            key = key_fn(e)
+            part = parts.get(key)
+            if part is None:
+                if not dynamic:
+                    continue
+                part = parts[key] = []
+            part.append(e)
+
+        return parts, count_by_source
+
+    def aggregate(self, batch: WindowBatch) -> AggregationResult:
+        parts, count_by_source = self.partition(batch.events)
+        out: List[Event] = []
+
+        for key, events in parts.items():
+            if not events:
+                continue
+            aggregator, source = self._entries.get(key) or self._default
+            agg = aggregate_window(
+                events,
+                aggregator,
+                source=source,
                 window_start=batch.start,
                 window_end=batch.end,
             )
-        )
+            if not isinstance(key, EventSource):
+                agg.payload["partition"] = key
+            out.append(agg)
+
+        return AggregationResult(aggregates=out, count_by_source=count_by_source)
+
+
+def default_registry() -> AggregatorRegistry:
+    registry = AggregatorRegistry()
+    registry.register(EventSource.SENSOR, agg_sensor_avg)
+    registry.register(EventSource.LOG, agg_log_levels)
+    registry.register(EventSource.FEED, agg_feed_actions)
+    return registry
+
 
-    return out
+def sensor_field_registry(field: str) -> AggregatorRegistry:
+    """
+    Like default_registry, but sensor events are partitioned by
+    ``payload[field]`` (e.g. ``sensor_id`` or ``location``): one ``sensor.value``
+    average per distinct value. Sensor events without the field stay in the
+    per-source partition.
+    """
+    def key_fn(event: Event) -> Hashable:
+        if event.source is EventSource.SENSOR and isinstance(event.payload, dict):
+            return event.payload.get(field, EventSource.SENSOR)
+        return event.source
+
+    registry = AggregatorRegistry(key_fn)
+    registry.register(EventSource.SENSOR, agg_sensor_avg)
+    registry.register(EventSource.LOG, agg_log_levels)
+    registry.register(EventSource.FEED, agg_feed_actions)
+    registry.register_default(agg_sensor_avg, EventSource.SENSOR)
+    return registry
+
+
+DEFAULT_REGISTRY = default_registry()
+
+
+def register_aggregator(
+    key: EventSource,
+    aggregator: Aggregator,
+    source: Optional[EventSource] = None,
+) -> None:
+    # DEFAULT_REGISTRY partitions by EventSource, so any other key would never match
+    if not isinstance(key, EventSource):
+        raise ValueError(f"DEFAULT_REGISTRY is keyed by EventSource, got {key!r}; use an AggregatorRegistry with a key_fn")
+    DEFAULT_REGISTRY.register(key, aggregator, source=source)
+
+
+def aggregate_batch(
+    batch: WindowBatch,
+    registry: Optional[AggregatorRegistry] = None,
+) -> List[Event]:
+    return (registry or DEFAULT_REGISTRY).aggregate(batch).aggregates
 
 
 # -------------------------
 # Live runner
 # -------------------------
 
+def _record_freshness(agg: Event, metrics: MetricsCollector) -> None:
+    window = agg.payload.get("window") if isinstance(agg.payload, dict) else None
+    event_time = window.get("event_time") if isinstance(window, dict) else None
+    if not event_time:
+        return
+    emitted_at = time.time()
+    oldest = datetime.fromisoformat(event_time["min"]).timestamp()
+    newest = datetime.fromisoformat(event_time["max"]).timestamp()
+    metrics.record_freshness(
+        agg.source.value,
+        (emitted_at - oldest) * 1000.0,
+        (emitted_at - newest) * 1000.0,
+    )
+
+
+async def _emit_batch(
+    batch: WindowBatch,
+    registry: AggregatorRegistry,
+    output_queue: "asyncio.Queue[Event]",
+    metrics: MetricsCollector | None,
+    on_after_batch: Optional[Callable[[], Awaitable[None]]],
+    tracer: Optional["StageTracer"] = None,
+) -> None:
+    t0 = time.perf_counter_ns()
+    result = registry.aggregate(batch)
+    t1 = time.perf_counter_ns()
+
+    if on_after_batch is not None:
+        try:
+            await on_after_batch()
+        except Exception:
+            pass
+
+    t_sink = time.perf_counter_ns()
+    for agg in result.aggregates:
+        await output_queue.put(agg)
+        if metrics is not None:
+            metrics.record_aggregated()
+            _record_freshness(agg, metrics)
+
+    if tracer is not None:
+        # windows are rare compared to events, so these two stages are not sampled
+        tracer.record("aggregate", t0, t1)
+        tracer.record("sink", t_sink)
+
+    if metrics is not None:
+        metrics.record_window(
+            start=batch.start.isoformat(),
+            end=batch.end.isoformat(),
+            count_by_source=result.count_by_source,
+            aggregates_emitted=len(result.aggregates),
+            aggregation_time_ms=(t1 - t0) / 1e6,
+        )
+
+
+def _traced_push(
+    processor: AsyncTumblingWindowProcessor,
+    event: Event,
+    tracer: "StageTracer",
+) -> Optional[WindowBatch]:
+    t = time.perf_counter_ns()
+    accepted = processor.accepts(event)
+    t = tracer.record("predicates", t)
+    if not accepted:
+        return None
+    event = processor.transform(event)
+    t = tracer.record("mappers", t)
+    batch = processor.assign(event)
+    tracer.record("window_push", t)
+    return batch
+
+
 async def run_live_aggregation(
     input_queue: "asyncio.Queue[Event]",
     output_queue: "asyncio.Queue[Event]",
@@ -187,12 +392,20 @@ async def run_live_aggregation(
     metrics: MetricsCollector | None = None,
     on_event: Optional[Callable[[Any], None]] = None,
     on_after_batch: Optional[Callable[[], Awaitable[None]]] = None,
+    registry: Optional[AggregatorRegistry] = None,
+    checkpointer: Optional["Checkpointer"] = None,
+    tracer: Optional["StageTracer"] = None,
 ) -> None:
     processor = AsyncTumblingWindowProcessor(window_size=window_size)
+    registry = registry or DEFAULT_REGISTRY
+
+    if checkpointer is not None:
+        checkpointer.restore(processor, metrics)
 
     try:
         while not stop_event.is_set():
             event = await input_queue.get()
+            traced = tracer is not None and tracer.on_dequeue(event)
 
             if on_event is not None:
                 try:
@@ -208,64 +421,24 @@ async def run_live_aggregation(
                 latency_ms = (now - ts).total_seconds() * 1000.0
                 metrics.record_processed(event.source.value, latency_ms)
 
-            batch = processor.push(event)
-            if batch is None:
-                continue
-
-            count_by_source = {"sensor": 0, "log": 0, "feed": 0}
-            for e in batch.events:
-                count_by_source[e.source.value] = count_by_source.get(e.source.value, 0) + 1
+            batch = _traced_push(processor, event, tracer) if traced else processor.push(event)
 
-            t0 = time.perf_counter()
-            aggs = aggregate_batch(batch)
-            t1 = time.perf_counter()
+            if checkpointer is not None:
+                checkpointer.maybe_checkpoint(processor, metrics)
 
-            if on_after_batch is not None:
-                try:
-                    await on_after_batch()
-                except Exception:
-                    pass
-
-            for agg in aggs:
-                await output_queue.put(agg)
-                if metrics is not None:
-                    metrics.record_aggregated()
+            if batch is None:
+                continue
 
-            if metrics is not None:
-                metrics.record_window(
-                    start=batch.start.isoformat(),
-                    end=batch.end.isoformat(),
-                    count_by_source=count_by_source,
-                    aggregates_emitted=len(aggs),
-                    aggregation_time_ms=(t1 - t0) * 1000.0,
-                )
+            await _emit_batch(batch, registry, output_queue, metrics, on_after_batch, tracer)
+            if checkpointer is not None:
+                # the last checkpoint still holds the window just emitted;
+                # replace it now so a restart does not emit that window again
+                await checkpointer.checkpoint(processor, metrics)
     finally:
-        last = processor.flush()
-        if last:
-            count_by_source = {"sensor": 0, "log": 0, "feed": 0}
-            for e in last.events:
-                count_by_source[e.source.value] = count_by_source.get(e.source.value, 0) + 1
-
-            t0 = time.perf_counter()
-            aggs = aggregate_batch(last)
-            t1 = time.perf_counter()
-
-            if on_after_batch is not None:
-                try:
-                    await on_after_batch()
-                except Exception:
-                    pass
-
-            for agg in aggs:
-                await output_queue.put(agg)
-                if metrics is not None:
-                    metrics.record_aggregated()
-
-            if metrics is not None:
-                metrics.record_window(
-                    start=last.start.isoformat(),
-                    end=last.end.isoformat(),
-                    count_by_source=count_by_source,
-                    aggregates_emitted=len(aggs),
-                    aggregation_time_ms=(t1 - t0) * 1000.0,
-                )
+        if checkpointer is not None:
+            # keep the open window for the next run instead of flushing it
+            await checkpointer.close(processor, metrics)
+        else:
+            last = processor.flush()
+            if last:
+                await _emit_batch(last, registry, output_queue, metrics, on_after_batch, tracer)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import pickle
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.models import Event
+from metrics.collector import MetricsCollector
+from runtime.async_processor import AsyncTumblingWindowProcessor
+
+BASE_SUFFIX = ".base"
+DELTA_SUFFIX = ".delta"
+
+
+@dataclass
+class CheckpointState:
+    window_start: Optional[datetime]
+    events: List[Event] = field(default_factory=list)
+    counters: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = 0.0
+
+
+@dataclass
+class _Record:
+    seq: int
+    kind: str
+    window_start: Optional[datetime]
+    events: List[Event]
+    counters: Dict[str, Any]
+    created_at: float
+
+
+class Checkpointer:
+    """
+    Periodic, incremental checkpoints of the live window state, plus one
+    right after every emitted window.
+
+    A ``.base`` file holds the full open window; while the same window stays
+    open, later checkpoints only write a ``.delta`` with the events appended
+    since the previous one. Every file is written to a temp name and renamed,
+    so readers never observe a partial checkpoint. Serialization and disk I/O
+    run in a worker thread.
+    """
+
+    def __init__(self, directory: str | Path, interval_seconds: float = 1.0):
+        self.directory = Path(directory)
+        self.interval_seconds = interval_seconds
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._seq = self._last_seq_on_disk()
+        self._base_start: Optional[datetime] = None
+        self._has_base = False
+        self._written = 0
+        self._last_counters: Optional[Dict[str, Any]] = None
+        self._last_at = time.monotonic()
+        self._pending: Optional[asyncio.Task] = None
+
+    # -------------------------
+    # CAPTURE (event loop, cheap)
+    # -------------------------
+
+    def capture(
+        self,
+        processor: AsyncTumblingWindowProcessor,
+        metrics: Optional[MetricsCollector] = None,
+    ) -> Optional[_Record]:
+        start = processor.current_start
+        events = processor.current_events
+        counters = metrics.counters() if metrics is not None else {}
+        n = len(events)
+
+        if not self._has_base or start != self._base_start or n < self._written:
+            kind = BASE_SUFFIX
+            new_events = list(events)
+            self._base_start = start
+            self._has_base = True
+        elif n > self._written or counters != self._last_counters:
+            kind = DELTA_SUFFIX
+            new_events = events[self._written:n]
+        else:
+            return None
+
+        self._written = n
+        self._last_counters = counters
+        self._seq += 1
+        return _Record(
+            seq=self._seq,
+            kind=kind,
+            window_start=start,
+            events=new_events,
+            counters=counters,
+            created_at=time.time(),
+        )
+
+    def maybe_checkpoint(
+        self,
+        processor: AsyncTumblingWindowProcessor,
+        metrics: Optional[MetricsCollector] = None,
+    ) -> None:
+        now = time.monotonic()
+        if now - self._last_at < self.interval_seconds:
+            return
+        if self._pending is not None and not self._pending.done():
+            return
+
+        self._last_at = now
+        record = self.capture(processor, metrics)
+        if record is not None:
+            self._pending = asyncio.create_task(self._write_async(record))
+
+    async def checkpoint(
+        self,
+        processor: AsyncTumblingWindowProcessor,
+        metrics: Optional[MetricsCollector] = None,
+    ) -> None:
+        """Writes the current state now, off the interval."""
+        if self._pending is not None:
+            await asyncio.gather(self._pending, return_exceptions=True)
+        self._last_at = time.monotonic()
+        record = self.capture(processor, metrics)
+        if record is not None:
+            await self._write_async(record)
+
+    async def close(
+        self,
+        processor: AsyncTumblingWindowProcessor,
+        metrics: Optional[MetricsCollector] = None,
+    ) -> None:
+        await self.checkpoint(processor, metrics)
+
+    # -------------------------
+    # WRITE (worker thread)
+    # -------------------------
+
+    async def _write_async(self, record: _Record) -> None:
+        try:
+            await asyncio.to_thread(self.write, record)
+        except Exception as exc:
+            # next capture must start from a fresh base
+            self._has_base = False
+            print(f"[Checkpointer] Write failed: {exc}")
+
+    def write(self, record: _Record) -> None:
+        path = self.directory / f"{record.seq:012d}{record.kind}"
+        tmp = path.with_suffix(path.suffix + ".tmp")
+
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        if record.kind == BASE_SUFFIX:
+            for seq, _, old in self._files():
+                if seq < record.seq:
+                    old.unlink(missing_ok=True)
+
+    # -------------------------
+    # RESTORE
+    # -------------------------
+
+    def _files(self) -> List[Tuple[int, str, Path]]:
+        out = []
+        for p in self.directory.iterdir():
+            if p.suffix not in (BASE_SUFFIX, DELTA_SUFFIX):
+                continue
+            try:
+                out.append((int(p.stem), p.suffix, p))
+            except ValueError:
+                continue
+        out.sort()
+        return out
+
+    def _last_seq_on_disk(self) -> int:
+        files = self._files()
+        return files[-1][0] if files else 0
+
+    def load(self) -> Optional[CheckpointState]:
+        files = self._files()
+        bases = [i for i, (_, kind, _) in enumerate(files) if kind == BASE_SUFFIX]
+        if not bases:
+            return None
+
+        state: Optional[CheckpointState] = None
+        for _, kind, path in files[bases[-1]:]:
+            with open(path, "rb") as f:
+                record: _Record = pickle.load(f)
+            if state is None:
+                state = CheckpointState(
+                    window_start=record.window_start,
+                    events=list(record.events),
+                    counters=record.counters,
+                    created_at=record.created_at,
+                )
+                continue
+            if record.window_start != state.window_start:
+                break
+            state.events.extend(record.events)
+            state.counters = record.counters
+            state.created_at = record.created_at
+
+        return state
+
+    def restore(
+        self,
+        processor: AsyncTumblingWindowProcessor,
+        metrics: Optional[MetricsCollector] = None,
+    ) -> Optional[CheckpointState]:
+        state = self.load()
+        if state is None:
+            return None
+
+        processor.restore_state(state.window_start, state.events)
+        if metrics is not None and state.counters:
+            metrics.restore_counters(state.counters)
+
+        # the restored window is already on disk; continue incrementally
+        self._base_start = state.window_start
+        self._has_base = True
+        self._written = len(processor.current_events)
+        self._last_counters = state.counters
+        return state
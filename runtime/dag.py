@@ -0,0 +1,153 @@
+import asyncio
+from datetime import timedelta
+from typing import Callable, List, Optional
+
+from core.models import Event
+from runtime.async_processor import (
+    AsyncTumblingWindowProcessor,
+    Mapper,
+    Predicate,
+    WindowBatch,
+    aggregate_batch,
+)
+
+Sink = Callable[[Event], None]
+BatchAggregator = Callable[[WindowBatch], List[Event]]
+
+
+# -------------------------
+# DAG NODE
+# -------------------------
+
+class DagNode:
+    """
+    One stage of a fan-out pipeline.
+
+    A node applies its own predicates and mappers, then hands the event (by
+    reference) to its sinks, its window and every child branch. Stages shared
+    by several branches live on a common ancestor and therefore run once per
+    event, no matter how many branches consume the result.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.predicates: List[Predicate] = []
+        self.mappers: List[Mapper] = []
+        self.sinks: List[Sink] = []
+        self.children: List["DagNode"] = []
+
+        self._window: Optional[AsyncTumblingWindowProcessor] = None
+        self._aggregate: BatchAggregator = aggregate_batch
+
+    # -------------------------
+    # BUILDER
+    # -------------------------
+
+    def filter(self, predicate: Predicate) -> "DagNode":
+        self.predicates.append(predicate)
+        return self
+
+    def map(self, mapper: Mapper) -> "DagNode":
+        self.mappers.append(mapper)
+        return self
+
+    def sink(self, sink: Sink) -> "DagNode":
+        self.sinks.append(sink)
+        return self
+
+    def window(
+        self,
+        window_size: timedelta,
+        aggregate: BatchAggregator = aggregate_batch,
+    ) -> "DagNode":
+        if self.children:
+            raise ValueError(f"Node '{self.name}' already has branches; windows must be leaves")
+        self._window = AsyncTumblingWindowProcessor(window_size=window_size)
+        self._aggregate = aggregate
+        return self
+
+    def branch(self, name: str) -> "DagNode":
+        if self._window is not None:
+            raise ValueError(f"Node '{self.name}' is windowed; cannot branch after a window")
+        child = DagNode(name)
+        self.children.append(child)
+        return child
+
+    def tee(self, *names: str) -> List["DagNode"]:
+        return [self.branch(name) for name in names]
+
+    # -------------------------
+    # EXECUTION
+    # -------------------------
+
+    def push(self, event: Event) -> None:
+        for p in self.predicates:
+            if not p(event):
+                return
+        for m in self.mappers:
+            event = m(event)
+
+        if self._window is not None:
+            batch = self._window.push(event)
+            if batch is not None:
+                self._emit(batch)
+        else:
+            for s in self.sinks:
+                s(event)
+
+        for child in self.children:
+            child.push(event)
+
+    def flush(self) -> None:
+        if self._window is not None:
+            batch = self._window.flush()
+            if batch is not None:
+                self._emit(batch)
+
+        for child in self.children:
+            child.flush()
+
+    def _emit(self, batch: WindowBatch) -> None:
+        for agg in self._aggregate(batch):
+            for s in self.sinks:
+                s(agg)
+
+
+# -------------------------
+# DAG ROOT
+# -------------------------
+
+class PipelineDAG(DagNode):
+    """
+    Root of a fan-out pipeline. Stages added directly on the root form the
+    shared prefix; use branch()/tee() to split the stream.
+    """
+
+    def __init__(self, name: str = "root"):
+        super().__init__(name)
+
+    def nodes(self) -> List[DagNode]:
+        out: List[DagNode] = []
+        stack: List[DagNode] = [self]
+        while stack:
+            node = stack.pop()
+            out.append(node)
+            stack.extend(reversed(node.children))
+        return out
+
+
+# -------------------------
+# Live runner
+# -------------------------
+
+async def run_dag(
+    input_queue: "asyncio.Queue[Event]",
+    dag: PipelineDAG,
+    stop_event: asyncio.Event,
+) -> None:
+    try:
+        while not stop_event.is_set():
+            event = await input_queue.get()
+            dag.push(event)
+    finally:
+        dag.flush()
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, fields
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from core.bus import EventBus
+from core.event_log import EventLog
+from core.models import Event
+from metrics.collector import MetricsCollector
+from metrics.exposition import MetricsServer
+from metrics.tracing import StageTracer
+from runtime.async_processor import run_live_aggregation, sensor_field_registry
+from runtime.checkpoint import Checkpointer
+from runtime.loop_monitor import LoopMonitor
+from runtime.supervisor import Supervisor
+from sources.feed_source import FeedSource
+from sources.log_source import LogSource
+from sources.sensor_source import SensorSource
+
+if TYPE_CHECKING:
+    from storage.timeseries import TimeSeriesStore
+
+SOURCE_NAMES = ("sensor", "log", "feed", "ramp", "replay", "fleet")
+SENSOR_KEYS = ("sensor_id", "location")
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    stress_mode: bool = False
+
+    per_source_queue_size: int = 10
+    merged_queue_size: int = 30
+
+    artificial_delay_ms: float = 0.0
+    log_base_interval: float = 0.2
+    log_burst_interval: float = 0.05
+    log_burst_probability: float = 0.6
+
+    window_seconds: float = 5.0
+    metrics_interval_seconds: float = 2.0
+    # None: one sensor aggregate per window; any of SENSOR_KEYS: one per sensor_id / location
+    aggregate_sensors_by: Optional[str] = None
+
+    # any of SOURCE_NAMES; "ramp" needs ramp_rate_eps, "replay" needs replay_path
+    sources: Tuple[str, ...] = ("sensor", "log", "feed")
+    ramp_rate_eps: float = 1000.0
+    # "fleet": each of fleet_sensors reports once per fleet_interval_seconds;
+    # outside stress mode the merged queue is grown to hold one full interval
+    fleet_sensors: int = 1000
+    fleet_interval_seconds: float = 1.0
+    # sensor/log/feed: None keeps their own timers, a rate switches them to
+    # token-bucket batches of that many events/sec each
+    source_rate_eps: Optional[float] = None
+    seed: Optional[int] = None
+    replay_path: Optional[str] = None
+    replay_speed: Optional[float] = None
+
+    checkpoint_dir: Optional[str] = None
+    checkpoint_interval_seconds: float = 1.0
+
+    event_log_dir: Optional[str] = None
+
+    parquet_dir: Optional[str] = None
+    sqlite_path: Optional[str] = None
+    sink_queue_size: int = 1000
+
+    # 1 in N events gets per-stage timing; 0 disables tracing
+    trace_sample_every: int = 16
+
+    # OpenMetrics endpoint (GET /metrics); None disables it
+    metrics_port: Optional[int] = None
+    metrics_host: str = "127.0.0.1"
+
+    # event-loop lag probe + slow-callback watchdog
+    loop_monitor: bool = True
+    slow_callback_ms: float = 50.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EngineConfig":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown engine config keys: {', '.join(sorted(unknown))}")
+        if "sources" in data:
+            data = {**data, "sources": tuple(data["sources"])}
+        return cls(**data)
+
+
+class Engine:
+    """
+    Sources -> EventBus -> live aggregation -> sinks, plus the metrics side
+    tasks, built from an EngineConfig. Front ends observe it through
+    callbacks and stop it with stop(); run() returns once everything has
+    shut down.
+
+    ``on_event`` sees every raw event as it is dequeued, ``on_aggregate``
+    every emitted aggregate, ``on_metrics`` a snapshot every
+    ``metrics_interval_seconds``. Callbacks run on the loop and must not
+    block.
+    """
+
+    def __init__(
+        self,
+        config: Optional[EngineConfig] = None,
+        store: Optional["TimeSeriesStore"] = None,
+        on_event: Optional[Callable[[Event], None]] = None,
+        on_aggregate: Optional[Callable[[Event], None]] = None,
+        on_metrics: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.config = config or EngineConfig()
+        self.store = store
+        self.on_event = on_event
+        self.on_aggregate = on_aggregate
+        self.on_metrics = on_metrics
+
+        unknown = set(self.config.sources) - set(SOURCE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+        # windows are aligned on whole epoch seconds
+        if self.config.window_seconds < 1:
+            raise ValueError("window_seconds must be at least 1")
+        if self.config.aggregate_sensors_by not in (None,) + SENSOR_KEYS:
+            raise ValueError(f"aggregate_sensors_by must be one of {', '.join(SENSOR_KEYS)}")
+
+        self.metrics = MetricsCollector()
+        self.supervisor = Supervisor()
+
+    @property
+    def stop_event(self) -> asyncio.Event:
+        return self.supervisor.stop_event
+
+    def stop(self) -> None:
+        self.supervisor.stop_event.set()
+
+    # -------------------------
+    # BUILDING
+    # -------------------------
+
+    def _register_sources(self, log_base: float, log_burst: float, log_prob: float) -> None:
+        config = self.config
+        bus = self.supervisor.bus
+        stop = self.supervisor.stop_event
+        paced = {"rate_eps": config.source_rate_eps}
+
+        def seed(offset: int) -> Optional[int]:
+            return config.seed + offset if config.seed is not None else None
+
+        if "sensor" in config.sources:
+            self.supervisor.register(SensorSource(
+                bus=bus,
+                stop_event=stop,
+                sensor_id="sensor-1",
+                interval_seconds=1.0,
+                location="lab-1",
+                seed=seed(1),
+                **paced,
+            ))
+
+        if "log" in config.sources:
+            self.supervisor.register(LogSource(
+                bus=bus,
+                stop_event=stop,
+                service_name="auth-service",
+                host="node-1",
+                base_interval=log_base,
+                burst_interval=log_burst,
+                burst_probability=log_prob,
+                seed=seed(2),
+                **paced,
+            ))
+
+        if "feed" in config.sources:
+            self.supervisor.register(FeedSource(
+                bus=bus,
+                stop_event=stop,
+                users=["user-1", "user-2", "user-3"],
+                actions=["login", "logout", "click", "purchase"],
+                resources=["/home", "/dashboard", "/checkout"],
+                interval_range=(1.5, 3.0),
+                seed=seed(3),
+                **paced,
+            ))
+
+        if "ramp" in config.sources:
+            from sources.ramp_source import RampSource
+
+            self.supervisor.register(RampSource(bus, stop, rate_eps=config.ramp_rate_eps, seed=seed(4)))
+
+        if "fleet" in config.sources:
+            from sources.fleet_source import FleetSource
+
+            self.supervisor.register(FleetSource(
+                bus,
+                stop,
+                n_sensors=config.fleet_sensors,
+                interval_seconds=config.fleet_interval_seconds,
+                seed=seed(5),
+            ))
+
+        if "replay" in config.sources:
+            if not config.replay_path:
+                raise ValueError("The replay source needs replay_path")
+            from sources.replay_source import ReplaySource
+
+            self.supervisor.register(ReplaySource(bus, stop, config.replay_path, speed=config.replay_speed))
+
+    def _build_sinks(self, stop: asyncio.Event) -> Tuple[List["asyncio.Queue[Any]"], List[Any]]:
+        # one bounded input queue + run() coroutine per sink; imported lazily
+        # so a run without sinks does not pay for pyarrow
+        config = self.config
+        sink_queues: List[asyncio.Queue[Any]] = []
+        sink_runs = []
+
+        if config.parquet_dir:
+            from sinks.parquet_sink import ParquetSink
+
+            parquet_q: asyncio.Queue[Any] = asyncio.Queue(maxsize=config.sink_queue_size)
+            sink_queues.append(parquet_q)
+            sink_runs.append(ParquetSink(config.parquet_dir, metrics=self.metrics).run(parquet_q, stop))
+
+        if config.sqlite_path:
+            from sinks.sqlite_sink import SQLiteSink
+
+            sqlite_q: asyncio.Queue[Any] = asyncio.Queue(maxsize=config.sink_queue_size)
+            sink_queues.append(sqlite_q)
+            sink_runs.append(SQLiteSink(config.sqlite_path, metrics=self.metrics).run(sqlite_q, stop))
+
+        return sink_queues, sink_runs
+
+    # -------------------------
+    # RUNNING
+    # -------------------------
+
+    async def run(self) -> None:
+        config = self.config
+        metrics = self.metrics
+        supervisor = self.supervisor
+        store = self.store
+
+        if config.stress_mode:
+            per_src = min(config.per_source_queue_size, 2)
+            merged = min(config.merged_queue_size, 5)
+            delay_ms = max(config.artificial_delay_ms, 30.0)
+            log_base = min(config.log_base_interval, 0.06)
+            log_burst = min(config.log_burst_interval, 0.01)
+            log_prob = max(config.log_burst_probability, 0.9)
+        else:
+            per_src = config.per_source_queue_size
+            merged = config.merged_queue_size
+            delay_ms = config.artificial_delay_ms
+            log_base = config.log_base_interval
+            log_burst = config.log_burst_interval
+            log_prob = config.log_burst_probability
+            if "fleet" in config.sources:
+                # a fleet tick is published as one burst; a queue sized for the
+                # single-event sources would drop most of it
+                merged = max(merged, config.fleet_sensors)
+
+        event_log = EventLog(config.event_log_dir) if config.event_log_dir else None
+        tracer = StageTracer(metrics, sample_every=config.trace_sample_every) if config.trace_sample_every > 0 else None
+
+        supervisor.bus = EventBus(
+            per_source_queue_size=per_src,
+            merged_queue_size=merged,
+            drop_on_full=True,
+            metrics=metrics,
+            enable_per_source_queues=False,
+            event_log=event_log,
+            tracer=tracer,
+        )
+        self._register_sources(log_base, log_burst, log_prob)
+        supervisor.start()
+
+        aggregated_queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=config.sink_queue_size)
+        # sinks outlive the sources so they still receive the window flushed at shutdown
+        sink_stop = asyncio.Event()
+        sink_queues, sink_runs = self._build_sinks(sink_stop)
+
+        async def on_batch_delay():
+            if delay_ms > 0:
+                await asyncio.sleep(delay_ms / 1000.0)
+
+        checkpointer = None
+        if config.checkpoint_dir:
+            checkpointer = Checkpointer(config.checkpoint_dir, interval_seconds=config.checkpoint_interval_seconds)
+
+        pipeline_task = asyncio.create_task(
+            run_live_aggregation(
+                input_queue=supervisor.bus.get_merged_queue(),
+                output_queue=aggregated_queue,
+                window_size=timedelta(seconds=config.window_seconds),
+                stop_event=supervisor.stop_event,
+                metrics=metrics,
+                on_event=self.on_event,
+                on_after_batch=on_batch_delay,
+                registry=sensor_field_registry(config.aggregate_sensors_by) if config.aggregate_sensors_by else None,
+                checkpointer=checkpointer,
+                tracer=tracer,
+            )
+        )
+
+        async def metrics_publisher():
+            while not supervisor.stop_event.is_set():
+                await asyncio.sleep(config.metrics_interval_seconds)
+                snap = metrics.snapshot()
+                if store is not None:
+                    store.add_metrics_snapshot(snap)
+                if self.on_metrics is not None:
+                    self.on_metrics(snap)
+
+        async def deliver(agg: Any) -> None:
+            if store is not None:
+                store.add_aggregate(agg)
+            if self.on_aggregate is not None:
+                self.on_aggregate(agg)
+            # a slow sink blocks here, which fills aggregated_queue and stalls the pipeline
+            for q in sink_queues:
+                await q.put(agg)
+
+        async def agg_forwarder():
+            # outlives stop_event: keeps draining until the pipeline has put its last window
+            while not (pipeline_task.done() and aggregated_queue.empty()):
+                try:
+                    agg = await asyncio.wait_for(aggregated_queue.get(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    continue
+                await deliver(agg)
+
+        forward_task = asyncio.create_task(agg_forwarder())
+        sink_tasks = [asyncio.create_task(run) for run in sink_runs]
+        background = [
+            asyncio.create_task(metrics_publisher()),
+            asyncio.create_task(supervisor.bus.sample_queue_depths(supervisor.stop_event)),
+        ]
+
+        if event_log is not None:
+            background.append(asyncio.create_task(event_log.run_flusher(supervisor.stop_event)))
+
+        if config.loop_monitor:
+            monitor = LoopMonitor(metrics, slow_callback_ms=config.slow_callback_ms)
+            background.append(asyncio.create_task(monitor.run(supervisor.stop_event)))
+
+        if config.metrics_port is not None:
+            server = MetricsServer(metrics, host=config.metrics_host, port=config.metrics_port)
+            background.append(asyncio.create_task(server.run(supervisor.stop_event)))
+
+        try:
+            await supervisor.stop_event.wait()
+        finally:
+            await supervisor.stop()
+            # cancelling the pipeline flushes its open window into aggregated_queue,
+            # which may be full; the forwarder keeps draining it until the pipeline is done
+            try:
+                await _cancel(pipeline_task)
+            finally:
+                await forward_task
+            sink_stop.set()
+            await asyncio.gather(*sink_tasks, return_exceptions=True)
+
+            for t in background:
+                await _cancel(t)
+            if event_log is not None:
+                event_log.close()
+
+
+async def _cancel(task: "asyncio.Task[Any]") -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,217 @@
+"""
+Headless engine runner: the same engine as the dashboard, without Streamlit.
+
+    python -m runtime.headless [--config engine.toml] [--duration 60] [--max-events 100000]
+                               [--sources sensor,log,feed] [--ramp-rate 5000]
+                               [--source-rate 2000] [--seed 7] [--fleet-sensors 10000]
+                               [--replay events.jsonl] [--replay-speed 10]
+                               [--stress] [--window-seconds 5] [--merged-queue-size 10000]
+                               [--aggregate-sensors-by sensor_id|location]
+                               [--jsonl aggregates.jsonl | --jsonl -]
+                               [--parquet-dir out/] [--sqlite out.db]
+                               [--metrics-port 9464] [--report-json report.json]
+
+The config file is JSON or TOML with EngineConfig field names as keys;
+flags override it. The run stops after ``--duration`` seconds, after
+``--max-events`` processed events, or on Ctrl+C, whichever comes first.
+Aggregates go to every configured sink; a final metrics report is printed
+at the end (to stderr when aggregates are streamed to stdout).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from core.models import Event
+from core.serialization import event_to_dict
+from runtime.engine import SENSOR_KEYS, Engine, EngineConfig
+
+
+def load_config_file(path: Path) -> Dict[str, Any]:
+    if path.suffix == ".toml":
+        import tomllib
+
+        with path.open("rb") as f:
+            return tomllib.load(f)
+    return json.loads(path.read_text())
+
+
+def build_config(args: argparse.Namespace) -> EngineConfig:
+    data: Dict[str, Any] = load_config_file(args.config) if args.config is not None else {}
+
+    overrides = {
+        "sources": tuple(s for s in args.sources.split(",") if s) if args.sources else None,
+        "ramp_rate_eps": args.ramp_rate,
+        "source_rate_eps": args.source_rate,
+        "seed": args.seed,
+        "fleet_sensors": args.fleet_sensors,
+        "replay_path": str(args.replay) if args.replay is not None else None,
+        "replay_speed": args.replay_speed,
+        "stress_mode": True if args.stress else None,
+        "window_seconds": args.window_seconds,
+        "aggregate_sensors_by": args.aggregate_sensors_by,
+        "merged_queue_size": args.merged_queue,
+        "parquet_dir": str(args.parquet_dir) if args.parquet_dir is not None else None,
+        "sqlite_path": str(args.sqlite) if args.sqlite is not None else None,
+        "checkpoint_dir": str(args.checkpoint_dir) if args.checkpoint_dir is not None else None,
+        "event_log_dir": str(args.event_log_dir) if args.event_log_dir is not None else None,
+        "metrics_port": args.metrics_port,
+    }
+    data.update({k: v for k, v in overrides.items() if v is not None})
+    return EngineConfig.from_dict(data)
+
+
+class JsonlWriter:
+    """Writes each aggregate as one JSON line; ``-`` means stdout."""
+
+    def __init__(self, target: str):
+        self._own = target != "-"
+        self._f: TextIO = open(target, "w", encoding="utf-8") if self._own else sys.stdout
+        self.rows = 0
+
+    def __call__(self, agg: Event) -> None:
+        self._f.write(json.dumps(event_to_dict(agg), default=str))
+        self._f.write("\n")
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._own:
+            self._f.close()
+        else:
+            self._f.flush()
+
+
+async def run_headless(
+    config: EngineConfig,
+    duration: Optional[float] = None,
+    max_events: Optional[int] = None,
+    on_aggregate=None,
+    poll_seconds: float = 0.05,
+) -> Dict[str, Any]:
+    """Runs the engine until a stop condition and returns the final metrics snapshot."""
+    engine = Engine(config, on_aggregate=on_aggregate)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def stop_condition() -> None:
+        while not engine.stop_event.is_set():
+            await asyncio.sleep(poll_seconds)
+            if duration is not None and loop.time() - started >= duration:
+                break
+            if max_events is not None and engine.metrics.processed_total >= max_events:
+                break
+        engine.stop()
+
+    # Ctrl+C stops the engine cleanly so the report still covers the run
+    try:
+        loop.add_signal_handler(signal.SIGINT, engine.stop)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    watcher = asyncio.create_task(stop_condition())
+    try:
+        await engine.run()
+    finally:
+        watcher.cancel()
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    report = engine.metrics.snapshot()
+    report["elapsed_seconds"] = loop.time() - started
+    return report
+
+
+# -------------------------
+# REPORTING
+# -------------------------
+
+def _ms(v: Optional[float]) -> str:
+    return f"{v:.2f}" if v is not None else "-"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    elapsed = report["elapsed_seconds"]
+    lat = report["event_processing_latency_cumulative_ms"]
+    lines = [
+        f"elapsed            {elapsed:.2f}s",
+        f"ingested           {report['ingested_total']:,}",
+        f"dropped            {report['dropped_total']:,} ({report['drop_ratio']:.2%})",
+        f"processed          {report['processed_total']:,} ({report['processed_total'] / elapsed if elapsed else 0.0:,.0f}/s)",
+        f"aggregates         {report['aggregated_total']:,}",
+        f"latency ms         avg {_ms(lat['avg_ms'])}  p50 {_ms(lat['p50_ms'])}  p95 {_ms(lat['p95_ms'])}  p99 {_ms(lat['p99_ms'])}",
+    ]
+    for stage, s in report["stage_latency_ms"].items():
+        lines.append(f"  {stage:<17}avg {_ms(s['avg_ms'])}  p99 {_ms(s['p99_ms'])}")
+    for name, d in report["queue_depth"].items():
+        lines.append(f"queue {name:<13}high water {d['high_water']}")
+    lines.append(f"loop lag p99 ms    {_ms(report['loop']['lag_ms']['p99_ms'])}")
+    lines.append(f"slow callbacks     {report['loop']['slow_callbacks_total']}")
+    for name, s in report["sinks"].items():
+        lines.append(f"sink {name:<14}rows {s['rows_total']:,}  flushes {s['flushes_total']}  errors {s['errors_total']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", type=Path, default=None, help="JSON or TOML file with EngineConfig fields")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--max-events", type=int, default=None, help="stop after this many processed events")
+    parser.add_argument("--sources", type=str, default="", help="comma-separated: sensor,log,feed,ramp,replay,fleet")
+    parser.add_argument("--ramp-rate", type=float, default=None, help="events/sec for the ramp source")
+    parser.add_argument("--source-rate", type=float, default=None, help="batched events/sec per sensor/log/feed source")
+    parser.add_argument("--fleet-sensors", type=int, default=None, help="sensors simulated by the fleet source")
+    parser.add_argument("--seed", type=int, default=None, help="seed the synthetic sources")
+    parser.add_argument("--replay", type=Path, default=None, help="event log or JSONL file for the replay source")
+    parser.add_argument("--replay-speed", type=float, default=None)
+    parser.add_argument("--stress", action="store_true")
+    parser.add_argument("--window-seconds", type=float, default=None)
+    parser.add_argument(
+        "--merged-queue-size", "--merged-queue", dest="merged_queue", type=int, default=None,
+        help="bus queue between sources and the pipeline (grown to --fleet-sensors for the fleet source)",
+    )
+    parser.add_argument(
+        "--aggregate-sensors-by", choices=SENSOR_KEYS, default=None,
+        help="one sensor aggregate per sensor_id or location instead of one per window",
+    )
+    parser.add_argument("--jsonl", type=str, default=None, help="write aggregates as JSON lines ('-' for stdout)")
+    parser.add_argument("--parquet-dir", type=Path, default=None)
+    parser.add_argument("--sqlite", type=Path, default=None)
+    parser.add_argument("--checkpoint-dir", type=Path, default=None)
+    parser.add_argument("--event-log-dir", type=Path, default=None)
+    parser.add_argument("--metrics-port", type=int, default=None)
+    parser.add_argument("--report-json", type=Path, default=None, help="also write the final report as JSON")
+    args = parser.parse_args(argv)
+
+    config = build_config(args)
+    if args.replay is not None and "replay" not in config.sources:
+        config = EngineConfig.from_dict({**asdict(config), "sources": config.sources + ("replay",)})
+
+    writer = JsonlWriter(args.jsonl) if args.jsonl else None
+    t0 = time.perf_counter()
+    try:
+        report = asyncio.run(run_headless(config, args.duration, args.max_events, on_aggregate=writer))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if writer is not None:
+            writer.close()
+
+    out = sys.stderr if args.jsonl == "-" else sys.stdout
+    print(format_report(report), file=out)
+    print(f"wall               {time.perf_counter() - t0:.2f}s", file=out)
+    if args.report_json is not None:
+        args.report_json.write_text(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
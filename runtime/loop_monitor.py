@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from metrics.collector import MetricsCollector
+
+
+def coro_name(task: "asyncio.Task") -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+def task_counts(loop: asyncio.AbstractEventLoop) -> Dict[str, int]:
+    return dict(Counter(coro_name(t) for t in asyncio.all_tasks(loop)))
+
+
+class LoopMonitor:
+    """
+    Event-loop health probe.
+
+    - lag: a task sleeps ``probe_interval`` and records how late it woke up.
+    - tasks: live tasks counted by coroutine name every ``task_count_interval``.
+    - slow callbacks: a watchdog thread notices when the probe heartbeat
+      stalls for more than ``slow_callback_ms``, captures the task and frame
+      running on the loop at that moment, and reports the stall once the
+      loop comes back.
+
+    All results are written to the MetricsCollector on the loop thread.
+    """
+
+    def __init__(
+        self,
+        metrics: MetricsCollector,
+        probe_interval: float = 0.05,
+        slow_callback_ms: float = 50.0,
+        task_count_interval: float = 1.0,
+    ):
+        self.metrics = metrics
+        self.probe_interval = probe_interval
+        self.slow_callback_ms = slow_callback_ms
+        self.task_count_interval = task_count_interval
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._stopping = threading.Event()
+
+    # -------------------------
+    # LOOP SIDE
+    # -------------------------
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+
+        watchdog = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        watchdog.start()
+
+        next_count = loop.time()
+        try:
+            while not stop_event.is_set():
+                expected = loop.time() + self.probe_interval
+                await asyncio.sleep(self.probe_interval)
+                now = loop.time()
+                self._beat = time.monotonic()
+                self.metrics.record_loop_lag(max(0.0, now - expected) * 1000.0)
+
+                if now >= next_count:
+                    self.metrics.record_task_counts(task_counts(loop))
+                    next_count = now + self.task_count_interval
+        finally:
+            self._stopping.set()
+            await asyncio.to_thread(watchdog.join, 1.0)
+
+    # -------------------------
+    # WATCHDOG THREAD
+    # -------------------------
+
+    def _culprit(self) -> tuple[str, str]:
+        task = asyncio.current_task(self._loop)
+        name = coro_name(task) if task is not None else "<callback>"
+
+        where = "?"
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            code = frame.f_code
+            where = f"{code.co_filename}:{frame.f_lineno} {code.co_name}"
+        return name, where
+
+    def _watchdog(self) -> None:
+        limit = self.probe_interval + self.slow_callback_ms / 1000.0
+        poll = max(self.slow_callback_ms / 4000.0, 0.005)
+
+        stalled_beat: Optional[float] = None
+        culprit = ("", "")
+
+        while not self._stopping.wait(poll):
+            beat = self._beat
+
+            if stalled_beat is not None and beat != stalled_beat:
+                # the loop is back: the probe overslept by roughly the blocking time
+                blocked_ms = (beat - stalled_beat - self.probe_interval) * 1000.0
+                self._report(culprit[0], culprit[1], blocked_ms)
+                stalled_beat = None
+
+            if stalled_beat is None and time.monotonic() - beat > limit:
+                stalled_beat = beat
+                culprit = self._culprit()
+
+    def _report(self, task: str, where: str, blocked_ms: float) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self.metrics.record_slow_callback, task, where, blocked_ms)
+        except RuntimeError:
+            pass  # loop closed between the check and the call
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from core.models import Event, EventSource, EventType, LogLevel
+
+_ERROR_LEVELS = frozenset((LogLevel.ERROR.value, LogLevel.CRITICAL.value))
+
+
+def is_error(event: Event) -> bool:
+    if event.event_type is EventType.ALERT:
+        return True
+    return event.source is EventSource.LOG and event.payload.get("level") in _ERROR_LEVELS
+
+
+class EventSampler(ABC):
+    """
+    Picks the raw events a viewer gets to see.
+
+    ``offer`` runs on the pipeline hot path for every event; ``drain`` hands
+    out the picks once per UI tick. ``sampled_total`` / ``skipped_total``
+    count every offered event, so ``fraction`` is what share of the stream
+    the viewer is looking at. With ``errors_always`` ERROR/CRITICAL logs and
+    alerts bypass the sampling rule (they still count as sampled).
+    """
+
+    def __init__(self, errors_always: bool = True):
+        self.errors_always = errors_always
+        self.sampled_total = 0
+        self.skipped_total = 0
+        self._picked: List[Event] = []
+
+    def offer(self, event: Event) -> None:
+        if self.errors_always and is_error(event):
+            self._picked.append(event)
+            self.sampled_total += 1
+        elif self._select(event):
+            self.sampled_total += 1
+        else:
+            self.skipped_total += 1
+
+    @abstractmethod
+    def _select(self, event: Event) -> bool:
+        """Keeps ``event`` if the sampling rule picks it; returns whether it did."""
+
+    def drain(self) -> List[Event]:
+        picked, self._picked = self._picked, []
+        return picked
+
+    @property
+    def fraction(self) -> float:
+        seen = self.sampled_total + self.skipped_total
+        return self.sampled_total / seen if seen else 1.0
+
+    def stats(self) -> Dict[str, float]:
+        return {"sampled_total": self.sampled_total, "skipped_total": self.skipped_total, "fraction": self.fraction}
+
+
+class RateLimitedSampler(EventSampler):
+    """At most one event per source every ``interval_seconds``."""
+
+    def __init__(self, interval_seconds: float = 0.1, errors_always: bool = True):
+        super().__init__(errors_always)
+        self.interval_seconds = interval_seconds
+        self._next_at: Dict[EventSource, float] = {}
+
+    def _select(self, event: Event) -> bool:
+        now = time.monotonic()
+        if now < self._next_at.get(event.source, 0.0):
+            return False
+        self._next_at[event.source] = now + self.interval_seconds
+        self._picked.append(event)
+        return True
+
+
+class ReservoirSampler(EventSampler):
+    """
+    Uniform sample of ``k`` events per drain interval (Algorithm R). Every
+    event of the interval has the same chance to be shown, so bursts are
+    represented in proportion instead of being cut off at a rate limit.
+    Events past the first ``k`` that replace an earlier pick count as
+    sampled and the evicted one as skipped.
+    """
+
+    def __init__(self, k: int = 25, errors_always: bool = True, seed: Optional[int] = None):
+        super().__init__(errors_always)
+        self.k = k
+        self._rng = random.Random(seed)
+        self._reservoir: List[Event] = []
+        self._seen = 0
+
+    def _select(self, event: Event) -> bool:
+        self._seen += 1
+        if len(self._reservoir) < self.k:
+            self._reservoir.append(event)
+            return True
+        j = self._rng.randrange(self._seen)
+        if j < self.k:
+            self._reservoir[j] = event
+            self.skipped_total += 1
+            self.sampled_total -= 1
+            return True
+        return False
+
+    def drain(self) -> List[Event]:
+        picked = super().drain()
+        picked.extend(self._reservoir)
+        picked.sort(key=lambda e: e.timestamp)
+        self._reservoir = []
+        self._seen = 0
+        return picked
+
+
+SAMPLERS = {"rate": RateLimitedSampler, "reservoir": ReservoirSampler}
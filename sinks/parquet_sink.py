@@ -0,0 +1,188 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.models import Event, EventType
+from metrics.collector import MetricsCollector
+
+AGGREGATE_SCHEMA = pa.schema(
+    [
+        ("event_id", pa.string()),
+        ("source", pa.string()),
+        ("window_start", pa.timestamp("us", tz="UTC")),
+        ("window_end", pa.timestamp("us", tz="UTC")),
+        ("event_count", pa.int64()),
+        ("aggregation", pa.string()),
+        ("metric", pa.string()),
+        ("value", pa.float64()),
+        ("emitted_at", pa.timestamp("us", tz="UTC")),
+        ("payload_json", pa.string()),
+    ]
+)
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return None
+
+
+def aggregate_to_row(event: Event) -> Dict[str, Any]:
+    payload = event.payload if isinstance(event.payload, dict) else {}
+    window = payload.get("window") or {}
+    value = payload.get("value")
+
+    return {
+        "event_id": event.id,
+        "source": event.source.value,
+        "window_start": _parse_ts(window.get("start")),
+        "window_end": _parse_ts(window.get("end")),
+        "event_count": window.get("count"),
+        "aggregation": payload.get("aggregation"),
+        "metric": payload.get("metric"),
+        "value": float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None,
+        "emitted_at": event.timestamp,
+        "payload_json": json.dumps({k: v for k, v in payload.items() if k != "window"}, default=str),
+    }
+
+
+class ParquetSink:
+    """
+    Buffers AGGREGATED events into Arrow record batches and writes them as
+    Parquet files partitioned by ``source=<src>/date=<YYYY-MM-DD>``.
+
+    A flush happens when ``max_rows`` rows are buffered or ``max_interval_seconds``
+    elapsed. Writes run in worker threads; at most ``max_pending_writes`` may
+    be in flight, after which the sink stops draining its input queue so a
+    bounded upstream queue fills up and producers block.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        max_rows: int = 5000,
+        max_interval_seconds: float = 5.0,
+        max_pending_writes: int = 2,
+        compression: str = "zstd",
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.root_dir = Path(root_dir)
+        self.max_rows = max_rows
+        self.max_interval_seconds = max_interval_seconds
+        self.compression = compression
+        self.metrics = metrics
+
+        self._rows: List[Dict[str, Any]] = []
+        self._first_row_at = 0.0
+        self._seq = 0
+        self._slots = asyncio.Semaphore(max_pending_writes)
+        self._pending: Set[asyncio.Task] = set()
+
+        self.rows_written = 0
+        self.files_written = 0
+
+    # -------------------------
+    # BUFFERING
+    # -------------------------
+
+    def add(self, event: Event) -> None:
+        if event.event_type != EventType.AGGREGATED:
+            return
+        if not self._rows:
+            self._first_row_at = time.monotonic()
+        self._rows.append(aggregate_to_row(event))
+
+    def _flush_due(self) -> bool:
+        if not self._rows:
+            return False
+        if len(self._rows) >= self.max_rows:
+            return True
+        return time.monotonic() - self._first_row_at >= self.max_interval_seconds
+
+    # -------------------------
+    # WRITING
+    # -------------------------
+
+    def _partition(self, rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        parts: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            ts = row["window_start"] or row["emitted_at"] or datetime.now(timezone.utc)
+            parts[(row["source"], ts.strftime("%Y-%m-%d"))].append(row)
+        return parts
+
+    def write_rows(self, rows: List[Dict[str, Any]], seq: int) -> int:
+        written = 0
+        stamp = int(time.time() * 1000)
+        for (source, date), part_rows in self._partition(rows).items():
+            batch = pa.RecordBatch.from_pylist(part_rows, schema=AGGREGATE_SCHEMA)
+            out_dir = self.root_dir / f"source={source}" / f"date={date}"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            path = out_dir / f"part-{stamp}-{seq:06d}.parquet"
+            tmp = path.with_suffix(".parquet.tmp")
+            pq.write_table(pa.Table.from_batches([batch]), tmp, compression=self.compression)
+            tmp.replace(path)
+            written += 1
+        return written
+
+    async def _write(self, rows: List[Dict[str, Any]], seq: int) -> None:
+        t0 = time.perf_counter()
+        try:
+            files = await asyncio.to_thread(self.write_rows, rows, seq)
+            self.rows_written += len(rows)
+            self.files_written += files
+            if self.metrics is not None:
+                self.metrics.record_sink_flush("parquet", len(rows), (time.perf_counter() - t0) * 1000.0)
+        except Exception as exc:
+            print(f"[ParquetSink] Write failed: {exc}")
+            if self.metrics is not None:
+                self.metrics.record_sink_flush("parquet", 0, 0.0, error=True)
+        finally:
+            self._slots.release()
+
+    async def flush(self) -> None:
+        if not self._rows:
+            return
+        rows = self._rows
+        self._rows = []
+        self._seq += 1
+
+        # blocks here while max_pending_writes are in flight -> backpressure
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write(rows, self._seq))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    # -------------------------
+    # MAIN LOOP
+    # -------------------------
+
+    async def run(self, input_queue: "asyncio.Queue[Event]", stop_event: asyncio.Event) -> None:
+        try:
+            while not stop_event.is_set():
+                try:
+                    event = await asyncio.wait_for(input_queue.get(), timeout=self.max_interval_seconds / 4)
+                except asyncio.TimeoutError:
+                    event = None
+
+                if event is not None:
+                    self.add(event)
+                if self._flush_due():
+                    await self.flush()
+        finally:
+            while not input_queue.empty():
+                self.add(input_queue.get_nowait())
+            await self.close()
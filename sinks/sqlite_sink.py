@@ -0,0 +1,266 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+from core.models import Event, EventType
+from metrics.collector import MetricsCollector
+from sinks.parquet_sink import aggregate_to_row
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS aggregates (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    window_start REAL,
+    window_end REAL,
+    event_count INTEGER,
+    aggregation TEXT,
+    metric TEXT,
+    value REAL,
+    emitted_at REAL,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_aggregates_source_start ON aggregates (source, window_start);
+
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    ts REAL,
+    payload TEXT,
+    tags TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts (ts);
+"""
+
+# fixed SQL text so sqlite3's statement cache reuses the compiled statements
+INSERT_AGGREGATE = (
+    "INSERT OR REPLACE INTO aggregates "
+    "(id, source, window_start, window_end, event_count, aggregation, metric, value, emitted_at, payload) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_ALERT = "INSERT OR REPLACE INTO alerts (id, source, ts, payload, tags) VALUES (?, ?, ?, ?, ?)"
+
+_STOP = object()
+
+
+def _epoch(ts: Optional[datetime]) -> Optional[float]:
+    return ts.timestamp() if ts is not None else None
+
+
+def aggregate_params(event: Event) -> Tuple[Any, ...]:
+    row = aggregate_to_row(event)
+    return (
+        row["event_id"],
+        row["source"],
+        _epoch(row["window_start"]),
+        _epoch(row["window_end"]),
+        row["event_count"],
+        row["aggregation"],
+        row["metric"],
+        row["value"],
+        _epoch(row["emitted_at"]),
+        row["payload_json"],
+    )
+
+
+def alert_params(event: Event) -> Tuple[Any, ...]:
+    return (
+        event.id,
+        event.source.value,
+        _epoch(event.timestamp),
+        json.dumps(event.payload, default=str),
+        json.dumps(event.tags),
+    )
+
+
+class SQLiteSink:
+    """
+    Writes AGGREGATED and ALERT events to a local SQLite database.
+
+    A dedicated writer thread owns the only write connection and commits
+    ``executemany`` batches of up to ``batch_size`` rows (or whatever arrived
+    within ``flush_interval_seconds``). The database runs in WAL mode so the
+    small pool of read connections never blocks the writer.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 1.0,
+        read_pool_size: int = 2,
+        queue_size: int = 10000,
+        metrics: Optional[MetricsCollector] = None,
+    ):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.metrics = metrics
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._write_conn = conn
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(read_pool_size):
+            self._readers.put(self._connect(read_only=True))
+
+        self._thread = threading.Thread(target=self._writer_loop, name="sqlite-sink-writer", daemon=True)
+        self._thread.start()
+
+        self.rows_written = 0
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    # -------------------------
+    # WRITER THREAD
+    # -------------------------
+
+    def _report(self, rows: int, latency_ms: float, error: bool = False) -> None:
+        if self.metrics is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.metrics.record_sink_flush, "sqlite", rows, latency_ms, error)
+        else:
+            self.metrics.record_sink_flush("sqlite", rows, latency_ms, error)
+
+    def _write_batch(self, events: List[Event]) -> None:
+        aggs = [aggregate_params(e) for e in events if e.event_type == EventType.AGGREGATED]
+        alerts = [alert_params(e) for e in events if e.event_type == EventType.ALERT]
+        if not aggs and not alerts:
+            return
+
+        t0 = time.perf_counter()
+        try:
+            with self._write_conn:
+                if aggs:
+                    self._write_conn.executemany(INSERT_AGGREGATE, aggs)
+                if alerts:
+                    self._write_conn.executemany(INSERT_ALERT, alerts)
+        except sqlite3.Error as exc:
+            print(f"[SQLiteSink] Write failed: {exc}")
+            self._report(0, 0.0, error=True)
+            return
+
+        rows = len(aggs) + len(alerts)
+        self.rows_written += rows
+        self._report(rows, (time.perf_counter() - t0) * 1000.0)
+
+    def _writer_loop(self) -> None:
+        pending: List[Event] = []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        stopping = False
+
+        while not stopping:
+            timeout = max(deadline - time.monotonic(), 0.0)
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    pending.append(item)
+                    # drain whatever is already queued without waiting
+                    while len(pending) < self.batch_size:
+                        item = self._queue.get_nowait()
+                        if item is _STOP:
+                            stopping = True
+                            break
+                        pending.append(item)
+            except queue.Empty:
+                pass
+
+            if pending and (stopping or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._write_batch(pending)
+                pending = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval_seconds
+
+        self._write_conn.close()
+
+    # -------------------------
+    # PRODUCER SIDE
+    # -------------------------
+
+    def submit(self, event: Event) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    async def run(self, input_queue: "asyncio.Queue[Event]", stop_event: asyncio.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        try:
+            while not stop_event.is_set():
+                try:
+                    event = await asyncio.wait_for(input_queue.get(), timeout=self.flush_interval_seconds / 4)
+                except asyncio.TimeoutError:
+                    continue
+                # writer thread is behind: hold this event (and the bounded input queue)
+                while not self.submit(event):
+                    await asyncio.sleep(0.01)
+        finally:
+            # shutdown: block until the writer takes each one rather than drop it
+            while not input_queue.empty():
+                self._queue.put(input_queue.get_nowait())
+            await asyncio.to_thread(self.close)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    # -------------------------
+    # READERS
+    # -------------------------
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def query_aggregates(
+        self,
+        source: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: int = 1000,
+    ) -> List[sqlite3.Row]:
+        sql = "SELECT * FROM aggregates WHERE 1=1"
+        params: List[Any] = []
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        if start is not None:
+            sql += " AND window_start >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND window_start < ?"
+            params.append(end)
+        sql += " ORDER BY window_start LIMIT ?"
+        params.append(limit)
+
+        with self.reader() as conn:
+            conn.row_factory = sqlite3.Row
+            return conn.execute(sql, params).fetchall()
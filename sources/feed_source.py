@@ -1,6 +1,7 @@
 import asyncio
 import random
 from datetime import datetime, timezone
+from typing import Optional
 
 from core.models import (
     Event,
@@ -8,6 +9,7 @@ from core.models import (
     EventType,
 )
 from sources.base import BaseSource
+from sources.pacing import PacedEmitter, seeded_id
 
 
 class FeedSource(BaseSource):
@@ -19,6 +21,9 @@ class FeedSource(BaseSource):
         actions: list[str],
         resources: list[str],
         interval_range: tuple[float, float] = (2.0, 4.0),
+        rate_eps: Optional[float] = None,
+        tick_seconds: float = 0.01,
+        seed: Optional[int] = None,
     ):
         super().__init__(bus, stop_event)
 
@@ -27,39 +32,57 @@ class FeedSource(BaseSource):
         self.resources = resources
         self.interval_range = interval_range
 
+        self._rng = random.Random(seed)
+
+        # batched mode: rate_eps events/sec in one publish per tick
+        self.pacer = (
+            PacedEmitter(bus, stop_event, self._make_event, rate_eps, tick_seconds)
+            if rate_eps is not None
+            else None
+        )
+
     # -------------------------
     # INTERNAL BEHAVIOR
     # -------------------------
 
-    def _generate_payload(self) -> dict:
+    def _generate_payload(self, ts: datetime) -> dict:
+        rng = self._rng
         return {
-            "user_id": random.choice(self.users),
-            "action": random.choice(self.actions),
-            "resource": random.choice(self.resources),
-            "success": random.random() > 0.1,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "user_id": rng.choice(self.users),
+            "action": rng.choice(self.actions),
+            "resource": rng.choice(self.resources),
+            "success": rng.random() > 0.1,
+            "timestamp": ts.isoformat(),
         }
 
     def _next_interval(self) -> float:
-        return random.uniform(*self.interval_range)
+        return self._rng.uniform(*self.interval_range)
+
+    def _make_event(self, ts: datetime) -> Event:
+        payload = self._generate_payload(ts)
+
+        return Event(
+            id=seeded_id(self._rng),
+            source=EventSource.FEED,
+            event_type=EventType.RAW,
+            timestamp=ts,
+            payload=payload,
+            tags={
+                "action": payload["action"],
+                "success": str(payload["success"]),
+            },
+        )
 
     # -------------------------
     # MAIN LOOP
     # -------------------------
 
     async def run(self) -> None:
-        while not self.stop_event.is_set():
-            payload = self._generate_payload()
-
-            event = Event(
-                source=EventSource.FEED,
-                event_type=EventType.RAW,
-                payload=payload,
-                tags={
-                    "action": payload["action"],
-                    "success": str(payload["success"]),
-                },
-            )
+        if self.pacer is not None:
+            await self.pacer.run()
+            return
 
+        while not self.stop_event.is_set():
+            event = self._make_event(datetime.now(timezone.utc))
             await self.bus.publish(event)
             await asyncio.sleep(self._next_interval())
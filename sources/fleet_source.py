@@ -0,0 +1,174 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from core.models import Event, EventSource, EventType
+from sources.base import BaseSource
+from sources.pacing import TokenBucket
+
+
+@dataclass
+class FleetReadings:
+    """One tick of readings, column-oriented: row i is sensor ``sensor[i]`` at ``ts[i]``."""
+
+    ts: np.ndarray        # float64 epoch seconds
+    sensor: np.ndarray    # int64 sensor index
+    value: np.ndarray     # float64
+    anomaly: np.ndarray   # bool
+
+    def __len__(self) -> int:
+        return len(self.sensor)
+
+
+class FleetSource(BaseSource):
+    """
+    ``n_sensors`` simulated sensors in one task.
+
+    Per-sensor state (base level, drift rate, accumulated drift, remaining
+    anomaly ticks and offset, last report time) lives in NumPy arrays. Each
+    sensor reports once per ``interval_seconds``; reports are staggered
+    round-robin, so every ``tick_seconds`` the sensors that are due are
+    computed in one vectorized step:
+    - drift grows by its per-sensor rate times the time since that sensor's last reading
+    - Gaussian noise is added
+    - anomalies start with ``anomaly_probability`` and hold a ±``anomaly_magnitude``
+      offset for ``anomaly_ticks`` readings
+
+    The batch is published as sensor events with one publish_batch, or, when
+    ``on_columns`` is given, handed over as FleetReadings without building
+    Event objects at all. Seeded runs produce the same values.
+    """
+
+    def __init__(
+        self,
+        bus,
+        stop_event: asyncio.Event,
+        n_sensors: int = 1000,
+        interval_seconds: float = 1.0,
+        tick_seconds: float = 0.05,
+        metric: str = "temperature",
+        unit: str = "°C",
+        base_value: float = 20.0,
+        base_spread: float = 2.0,
+        noise_std: float = 0.3,
+        drift_per_minute: float = 0.01,
+        anomaly_probability: float = 0.001,
+        anomaly_magnitude: float = 10.0,
+        anomaly_ticks: int = 3,
+        n_locations: int = 10,
+        seed: Optional[int] = None,
+        on_columns: Optional[Callable[[FleetReadings], None]] = None,
+    ):
+        super().__init__(bus, stop_event)
+
+        self.n_sensors = n_sensors
+        self.interval_seconds = interval_seconds
+        self.tick_seconds = tick_seconds
+        self.metric = metric
+        self.unit = unit
+        self.noise_std = noise_std
+        self.anomaly_probability = anomaly_probability
+        self.anomaly_magnitude = anomaly_magnitude
+        self.anomaly_ticks = anomaly_ticks
+        self.on_columns = on_columns
+
+        rng = self._rng = np.random.default_rng(seed)
+        self.base = base_value + rng.normal(0.0, base_spread, n_sensors)
+        self.drift_rate = drift_per_minute * rng.normal(1.0, 0.5, n_sensors) / 60.0  # per second
+        self.drift = np.zeros(n_sensors)
+        self.anomaly_left = np.zeros(n_sensors, dtype=np.int32)
+        self.anomaly_offset = np.zeros(n_sensors)
+        self.last_ts = np.full(n_sensors, np.nan)
+
+        self.sensor_ids = [f"sensor-{i}" for i in range(n_sensors)]
+        self.locations = [f"site-{i % n_locations}" for i in range(n_sensors)]
+
+        self._bucket = TokenBucket(n_sensors / interval_seconds, capacity=n_sensors)
+        self._cursor = 0
+        self._seq = 0
+        self.published_total = 0
+        self.accepted_total = 0
+
+    # -------------------------
+    # VECTORIZED STEP
+    # -------------------------
+
+    def step(self, n: int, t0: float, t1: float) -> FleetReadings:
+        """Readings for the next ``n`` sensors in rotation, stamped evenly over (t0, t1]."""
+        rng = self._rng
+        idx = (self._cursor + np.arange(n)) % self.n_sensors
+        self._cursor = (self._cursor + n) % self.n_sensors
+        ts = t0 + (t1 - t0) * np.arange(1, n + 1) / n
+
+        last = self.last_ts[idx]
+        elapsed = np.where(np.isnan(last), 0.0, ts - last)
+        self.last_ts[idx] = ts
+        self.drift[idx] += self.drift_rate[idx] * elapsed
+
+        left = self.anomaly_left[idx]
+        start = (left == 0) & (rng.random(n) < self.anomaly_probability)
+        if start.any():
+            k = int(start.sum())
+            self.anomaly_offset[idx[start]] = rng.choice((-1.0, 1.0), k) * self.anomaly_magnitude
+            left = np.where(start, self.anomaly_ticks, left)
+        anomalous = left > 0
+        self.anomaly_left[idx] = np.maximum(left - 1, 0)
+
+        value = self.base[idx] + self.drift[idx] + rng.normal(0.0, self.noise_std, n)
+        value += np.where(anomalous, self.anomaly_offset[idx], 0.0)
+        return FleetReadings(ts=ts, sensor=idx, value=np.round(value, 3), anomaly=anomalous)
+
+    def to_events(self, readings: FleetReadings) -> List[Event]:
+        out = []
+        metric, unit = self.metric, self.unit
+        for ts, i, v in zip(readings.ts.tolist(), readings.sensor.tolist(), readings.value.tolist()):
+            self._seq += 1
+            sensor_id = self.sensor_ids[i]
+            out.append(
+                Event(
+                    id=f"fleet-{self._seq}",
+                    source=EventSource.SENSOR,
+                    event_type=EventType.RAW,
+                    timestamp=datetime.fromtimestamp(ts, tz=timezone.utc),
+                    payload={
+                        "sensor_id": sensor_id,
+                        "metric": metric,
+                        "value": v,
+                        "unit": unit,
+                        "location": self.locations[i],
+                    },
+                    tags={"metric": metric, "sensor_id": sensor_id},
+                )
+            )
+        return out
+
+    # -------------------------
+    # MAIN LOOP
+    # -------------------------
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._bucket.refill(loop.time())
+        prev = datetime.now(timezone.utc).timestamp()
+
+        while not self.stop_event.is_set():
+            await asyncio.sleep(self.tick_seconds)
+            n = self._bucket.take(loop.time())
+            if n <= 0:
+                continue
+
+            now = datetime.now(timezone.utc).timestamp()
+            readings = self.step(n, prev, now)
+            prev = now
+
+            if self.on_columns is not None:
+                self.on_columns(readings)
+                self.published_total += n
+                self.accepted_total += n
+                continue
+
+            self.accepted_total += await self.bus.publish_batch(self.to_events(readings))
+            self.published_total += n
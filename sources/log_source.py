@@ -1,5 +1,7 @@
 import asyncio
 import random
+from datetime import datetime, timezone
+from typing import Optional
 
 from core.models import (
     Event,
@@ -9,6 +11,10 @@ from core.models import (
     LogLevel,
 )
 from sources.base import BaseSource
+from sources.pacing import PacedEmitter, seeded_id
+
+_LEVELS = list(LogLevel)
+_LEVEL_WEIGHTS = [0.4, 0.35, 0.15, 0.08, 0.02]
 
 
 class LogSource(BaseSource):
@@ -21,6 +27,9 @@ class LogSource(BaseSource):
         base_interval: float = 1.5,
         burst_interval: float = 0.2,
         burst_probability: float = 0.1,
+        rate_eps: Optional[float] = None,
+        tick_seconds: float = 0.01,
+        seed: Optional[int] = None,
     ):
         super().__init__(bus, stop_event)
 
@@ -39,46 +48,63 @@ class LogSource(BaseSource):
             LogLevel.CRITICAL: "System failure",
         }
 
+        self._rng = random.Random(seed)
+
+        # batched mode: rate_eps events/sec in one publish per tick
+        self.pacer = (
+            PacedEmitter(bus, stop_event, self._make_event, rate_eps, tick_seconds)
+            if rate_eps is not None
+            else None
+        )
+
     # -------------------------
     # INTERNAL BEHAVIOR
     # -------------------------
 
     def _choose_log_level(self) -> LogLevel:
-        return random.choices(
-            population=list(LogLevel),
-            weights=[0.4, 0.35, 0.15, 0.08, 0.02],
+        return self._rng.choices(
+            population=_LEVELS,
+            weights=_LEVEL_WEIGHTS,
             k=1,
         )[0]
 
     def _choose_interval(self) -> float:
-        if random.random() < self.burst_probability:
+        if self._rng.random() < self.burst_probability:
             return self.burst_interval
         return self.base_interval
 
+    def _make_event(self, ts: datetime) -> Event:
+        level = self._choose_log_level()
+
+        payload = {
+            "level": level.value,
+            "message": self._messages[level],
+            "service": self.service_name,
+            "host": self.host,
+        }
+
+        return Event(
+            id=seeded_id(self._rng),
+            source=EventSource.LOG,
+            event_type=EventType.RAW,
+            timestamp=ts,
+            payload=payload,
+            tags={
+                "service": self.service_name,
+                "level": level.value,
+            },
+        )
+
     # -------------------------
     # MAIN LOOP
     # -------------------------
 
     async def run(self) -> None:
-        while not self.stop_event.is_set():
-            level = self._choose_log_level()
-
-            payload = {
-                "level": level.value,
-                "message": self._messages[level],
-                "service": self.service_name,
-                "host": self.host,
-            }
-
-            event = Event(
-                source=EventSource.LOG,
-                event_type=EventType.RAW,
-                payload=payload,
-                tags={
-                    "service": self.service_name,
-                    "level": level.value,
-                },
-            )
+        if self.pacer is not None:
+            await self.pacer.run()
+            return
 
+        while not self.stop_event.is_set():
+            event = self._make_event(datetime.now(timezone.utc))
             await self.bus.publish(event)
             await asyncio.sleep(self._choose_interval())
@@ -0,0 +1,105 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from core.models import Event, EventSource, EventType
+from sources.base import BaseSource
+from sources.pacing import PacedEmitter
+
+
+class RampSource(BaseSource):
+    """
+    Open-loop synthetic load at a controllable rate.
+
+    Every ``tick_seconds`` the source publishes however many events the
+    current ``rate_eps`` owes since the last tick, as one batch (see
+    PacedEmitter). A slow consumer does not lower the offered load: late
+    ticks simply publish larger batches (capped at ``max_batch``).
+    ``set_rate`` changes the rate while the source is running.
+
+    Payloads mimic the sensor, log and feed sources in round-robin and come
+    from a seeded generator, so runs are repeatable (``seed=None`` does not
+    seed it).
+    """
+
+    def __init__(
+        self,
+        bus,
+        stop_event: asyncio.Event,
+        rate_eps: float = 100.0,
+        tick_seconds: float = 0.01,
+        max_batch: int = 10000,
+        seed: Optional[int] = 0,
+    ):
+        super().__init__(bus, stop_event)
+
+        self._rng = random.Random(seed)
+        self._seq = 0
+        self.pacer = PacedEmitter(bus, stop_event, self._make_event, rate_eps, tick_seconds, max_batch)
+
+    @property
+    def rate_eps(self) -> float:
+        return self.pacer.rate_eps
+
+    @property
+    def published_total(self) -> int:
+        return self.pacer.published_total
+
+    @property
+    def accepted_total(self) -> int:
+        return self.pacer.accepted_total
+
+    def set_rate(self, rate_eps: float) -> None:
+        self.pacer.set_rate(rate_eps)
+
+    # -------------------------
+    # INTERNAL BEHAVIOR
+    # -------------------------
+
+    def _payload(self, kind: int, now: datetime) -> tuple[EventSource, dict]:
+        rng = self._rng
+        if kind == 0:
+            return EventSource.SENSOR, {
+                "sensor_id": f"sensor-{rng.randrange(8)}",
+                "metric": "temperature",
+                "value": round(20.0 + rng.gauss(0, 0.3), 3),
+                "unit": "°C",
+                "location": "lab-1",
+            }
+        if kind == 1:
+            return EventSource.LOG, {
+                "level": rng.choice(("DEBUG", "INFO", "INFO", "WARNING", "ERROR")),
+                "message": "Operation completed successfully",
+                "service": "ramp-service",
+                "host": "node-1",
+            }
+        return EventSource.FEED, {
+            "user_id": f"user-{rng.randrange(100)}",
+            "action": rng.choice(("login", "logout", "click", "purchase")),
+            "resource": rng.choice(("/home", "/dashboard", "/checkout")),
+            "success": rng.random() > 0.1,
+            "timestamp": now.isoformat(),
+        }
+
+    def _make_event(self, ts: datetime) -> Event:
+        self._seq += 1
+        source, payload = self._payload(self._seq % 3, ts)
+        return Event(
+            id=f"ramp-{self._seq}",
+            source=source,
+            event_type=EventType.RAW,
+            timestamp=ts,
+            payload=payload,
+        )
+
+    def make_events(self, n: int) -> List[Event]:
+        now = datetime.now(timezone.utc)
+        return [self._make_event(now) for _ in range(n)]
+
+    # -------------------------
+    # MAIN LOOP
+    # -------------------------
+
+    async def run(self) -> None:
+        await self.pacer.run()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from core.event_log import EventLogReader, to_epoch_us
+from core.models import Event
+from core.serialization import event_from_dict
+from sources.base import BaseSource
+
+
+class ReplaySource(BaseSource):
+    """
+    Replays recorded events from a JSONL file or an EventLog directory.
+
+    ``speed=None`` publishes as fast as the bus accepts them; otherwise
+    events are paced by their recorded timestamps at ``speed``× real time.
+    Events are read ``read_chunk`` at a time off the event loop and handed
+    to the bus ``batch_size`` at a time.
+    """
+
+    def __init__(
+        self,
+        bus,
+        stop_event: asyncio.Event,
+        path: str | Path,
+        speed: Optional[float] = None,
+        batch_size: int = 256,
+        read_chunk: int = 4096,
+        restamp: bool = False,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ):
+        super().__init__(bus, stop_event)
+
+        self.path = Path(path)
+        self.speed = speed
+        self.batch_size = batch_size
+        self.read_chunk = read_chunk
+        self.restamp = restamp
+        self.start = start
+        self.end = end
+
+        self.published_total = 0
+        self.done = False
+
+    # -------------------------
+    # INTERNAL BEHAVIOR
+    # -------------------------
+
+    def _iter_events(self) -> Iterator[Event]:
+        if self.path.is_dir():
+            yield from EventLogReader(self.path).read(self.start, self.end)
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            while True:
+                lines = f.readlines(1 << 20)
+                if not lines:
+                    return
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        yield event_from_dict(json.loads(line))
+
+    def _prepare(self, events: List[Event]) -> List[Event]:
+        if not self.restamp:
+            return events
+        now = datetime.now(timezone.utc)
+        return [replace(e, timestamp=now) for e in events]
+
+    async def _publish(self, events: List[Event]) -> None:
+        if not events:
+            return
+        await self.bus.publish_batch(self._prepare(events))
+        self.published_total += len(events)
+
+    # -------------------------
+    # MAIN LOOP
+    # -------------------------
+
+    async def run(self) -> None:
+        it = self._iter_events()
+        first_ts: Optional[int] = None
+        wall_start = time.monotonic()
+
+        try:
+            while not self.stop_event.is_set():
+                chunk = await asyncio.to_thread(lambda: list(islice(it, self.read_chunk)))
+                if not chunk:
+                    break
+
+                if self.speed is None:
+                    for i in range(0, len(chunk), self.batch_size):
+                        if self.stop_event.is_set():
+                            return
+                        await self._publish(chunk[i: i + self.batch_size])
+                        await asyncio.sleep(0)
+                    continue
+
+                if first_ts is None:
+                    first_ts = to_epoch_us(chunk[0].timestamp)
+
+                i = 0
+                while i < len(chunk) and not self.stop_event.is_set():
+                    elapsed = time.monotonic() - wall_start
+                    j = i
+                    while (
+                        j < len(chunk)
+                        and j - i < self.batch_size
+                        and (to_epoch_us(chunk[j].timestamp) - first_ts) / 1_000_000 / self.speed <= elapsed
+                    ):
+                        j += 1
+
+                    if j == i:
+                        due = (to_epoch_us(chunk[i].timestamp) - first_ts) / 1_000_000 / self.speed
+                        await asyncio.sleep(due - elapsed)
+                        continue
+
+                    await self._publish(chunk[i:j])
+                    i = j
+        finally:
+            self.done = True
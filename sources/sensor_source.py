@@ -1,6 +1,7 @@
 import asyncio
 import random
 from datetime import datetime, timezone
+from typing import Optional
 
 from core.models import (
     Event,
@@ -9,6 +10,7 @@ from core.models import (
     SensorPayload,
 )
 from sources.base import BaseSource
+from sources.pacing import PacedEmitter, seeded_id
 
 
 class SensorSource(BaseSource):
@@ -25,6 +27,9 @@ class SensorSource(BaseSource):
         anomaly_probability: float = 0.01,
         interval_seconds: float = 1.0,
         location: str | None = None,
+        rate_eps: Optional[float] = None,
+        tick_seconds: float = 0.01,
+        seed: Optional[int] = None,
     ):
         super().__init__(bus, stop_event)
 
@@ -39,53 +44,70 @@ class SensorSource(BaseSource):
         self.interval_seconds = interval_seconds
         self.location = location
 
+        self._rng = random.Random(seed)
         self._current_drift = 0.0
         self._last_drift_update = datetime.now(timezone.utc)
 
+        # batched mode: rate_eps events/sec in one publish per tick
+        self.pacer = (
+            PacedEmitter(bus, stop_event, self._make_event, rate_eps, tick_seconds)
+            if rate_eps is not None
+            else None
+        )
+
     # -------------------------
     # INTERNAL BEHAVIOR
     # -------------------------
 
-    def _update_drift(self) -> None:
-        now = datetime.now(timezone.utc)
+    def _update_drift(self, now: datetime) -> None:
         elapsed_minutes = (now - self._last_drift_update).total_seconds() / 60.0
         self._current_drift += elapsed_minutes * self.drift_per_minute
         self._last_drift_update = now
 
     def _generate_value(self) -> float:
-        noise = random.gauss(0, self.noise_std)
+        rng = self._rng
+        noise = rng.gauss(0, self.noise_std)
         value = self.base_value + self._current_drift + noise
 
-        if random.random() < self.anomaly_probability:
-            value += random.choice([-10, 10])
+        if rng.random() < self.anomaly_probability:
+            value += rng.choice([-10, 10])
 
         return round(value, 3)
 
+    def _make_event(self, ts: datetime) -> Event:
+        if ts >= self._last_drift_update:
+            self._update_drift(ts)
+
+        payload = SensorPayload(
+            sensor_id=self.sensor_id,
+            metric=self.metric,
+            value=self._generate_value(),
+            unit=self.unit,
+            location=self.location,
+        )
+
+        return Event(
+            id=seeded_id(self._rng),
+            source=EventSource.SENSOR,
+            event_type=EventType.RAW,
+            timestamp=ts,
+            payload=payload.__dict__,
+            tags={
+                "metric": self.metric,
+                "sensor_id": self.sensor_id,
+            },
+        )
+
     # -------------------------
     # MAIN LOOP
     # -------------------------
 
     async def run(self) -> None:
-        while not self.stop_event.is_set():
-            self._update_drift()
-
-            payload = SensorPayload(
-                sensor_id=self.sensor_id,
-                metric=self.metric,
-                value=self._generate_value(),
-                unit=self.unit,
-                location=self.location,
-            )
-
-            event = Event(
-                source=EventSource.SENSOR,
-                event_type=EventType.RAW,
-                payload=payload.__dict__,
-                tags={
-                    "metric": self.metric,
-                    "sensor_id": self.sensor_id,
-                },
-            )
+        if self.pacer is not None:
+            await self.pacer.run()
+            return
 
+        while not self.stop_event.is_set():
+            event = self._make_event(datetime.now(timezone.utc))
             await self.bus.publish(event)
             await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import bisect
+import pickle
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.models import Event, EventType
+
+SeriesKey = Tuple[str, str]  # (source, metric)
+
+
+def _epoch(ts: datetime | float | str) -> float:
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def numeric_leaves(obj: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(obj, bool):
+        return
+    if isinstance(obj, (int, float)):
+        yield prefix, float(obj)
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from numeric_leaves(v, f"{prefix}.{k}" if prefix else str(k))
+
+
+def aggregate_metrics(payload: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    metric_name = payload.get("metric") if isinstance(payload.get("metric"), str) else None
+    for name, value in numeric_leaves({k: v for k, v in payload.items() if k not in ("window", "partition")}):
+        yield (metric_name if name == "value" and metric_name else name), value
+    window = payload.get("window") or {}
+    if isinstance(window.get("count"), int):
+        yield "window.count", float(window["count"])
+
+
+# -------------------------
+# SERIES
+# -------------------------
+
+@dataclass
+class RangeResult:
+    timestamps: array
+    values: array
+
+    def points(self) -> List[Tuple[float, float]]:
+        return list(zip(self.timestamps, self.values))
+
+
+@dataclass
+class RollupResult:
+    timestamps: array
+    mins: array
+    maxs: array
+    means: List[float]
+    counts: array
+
+
+@dataclass
+class _Raw:
+    starts: array = field(default_factory=lambda: array("d"))
+    values: array = field(default_factory=lambda: array("d"))
+
+    def put(self, start: float, value: float) -> None:
+        starts = self.starts
+        if not starts or start > starts[-1]:
+            starts.append(start)
+            self.values.append(value)
+            return
+        i = bisect.bisect_left(starts, start)
+        if i < len(starts) and starts[i] == start:
+            self.values[i] = value
+        else:
+            starts.insert(i, start)
+            self.values.insert(i, value)
+
+    def range(self, t0: float, t1: float) -> RangeResult:
+        i = bisect.bisect_left(self.starts, t0)
+        j = bisect.bisect_left(self.starts, t1)
+        return RangeResult(self.starts[i:j], self.values[i:j])
+
+
+@dataclass
+class _Rollup:
+    starts: array = field(default_factory=lambda: array("d"))
+    mins: array = field(default_factory=lambda: array("d"))
+    maxs: array = field(default_factory=lambda: array("d"))
+    sums: array = field(default_factory=lambda: array("d"))
+    counts: array = field(default_factory=lambda: array("q"))
+
+    def add(self, bucket: float, value: float) -> None:
+        starts = self.starts
+        i = len(starts) - 1 if starts and starts[-1] == bucket else bisect.bisect_left(starts, bucket)
+        if i < len(starts) and starts[i] == bucket:
+            self.mins[i] = min(self.mins[i], value)
+            self.maxs[i] = max(self.maxs[i], value)
+            self.sums[i] += value
+            self.counts[i] += 1
+            return
+        starts.insert(i, bucket)
+        self.mins.insert(i, value)
+        self.maxs.insert(i, value)
+        self.sums.insert(i, value)
+        self.counts.insert(i, 1)
+
+    def drop_before(self, cutoff: float) -> None:
+        k = bisect.bisect_left(self.starts, cutoff)
+        if k:
+            for col in (self.starts, self.mins, self.maxs, self.sums, self.counts):
+                del col[:k]
+
+    def range(self, t0: float, t1: float) -> RollupResult:
+        i = bisect.bisect_left(self.starts, t0)
+        j = bisect.bisect_left(self.starts, t1)
+        sums, counts = self.sums[i:j], self.counts[i:j]
+        return RollupResult(
+            timestamps=self.starts[i:j],
+            mins=self.mins[i:j],
+            maxs=self.maxs[i:j],
+            means=[s / c for s, c in zip(sums, counts)],
+            counts=counts,
+        )
+
+
+# -------------------------
+# STORE
+# -------------------------
+
+class TimeSeriesStore:
+    """
+    Embedded store for window aggregates and metrics snapshots, keyed by
+    (source, metric) and window start.
+
+    Each series keeps sorted columns, so a range query is two bisects and
+    two array slices. Raw points older than ``raw_retention_seconds`` are
+    folded into ``rollup_seconds`` min/max/mean buckets, which are dropped
+    after ``rollup_retention_seconds``. All methods are thread-safe so the
+    engine thread can write while the UI thread queries.
+    """
+
+    def __init__(
+        self,
+        raw_retention_seconds: float = 3600.0,
+        rollup_seconds: float = 60.0,
+        rollup_retention_seconds: float = 7 * 86400.0,
+    ):
+        self.raw_retention_seconds = raw_retention_seconds
+        self.rollup_seconds = rollup_seconds
+        self.rollup_retention_seconds = rollup_retention_seconds
+
+        self._raw: Dict[SeriesKey, _Raw] = {}
+        self._rollups: Dict[SeriesKey, _Rollup] = {}
+        self._lock = threading.Lock()
+        self._high_water = float("-inf")
+        self._last_retention = float("-inf")
+
+    # -------------------------
+    # WRITES
+    # -------------------------
+
+    def put(self, source: str, metric: str, window_start: datetime | float, value: float) -> None:
+        start = _epoch(window_start)
+        with self._lock:
+            series = self._raw.get((source, metric))
+            if series is None:
+                series = self._raw[(source, metric)] = _Raw()
+            series.put(start, float(value))
+            if start > self._high_water:
+                self._high_water = start
+        self._maybe_apply_retention()
+
+    def add_aggregate(self, event: Event) -> int:
+        """
+        Stores each numeric field of an aggregate under (source, metric) at
+        its window start. Aggregates of a keyed registry go to their own
+        series, ``<source>/<partition>`` (e.g. ``sensor/site-3``).
+        """
+        if event.event_type != EventType.AGGREGATED or not isinstance(event.payload, dict):
+            return 0
+        window = event.payload.get("window") or {}
+        start = window.get("start") or event.timestamp
+        source = event.source.value
+        partition = event.payload.get("partition")
+        if partition is not None:
+            parts = partition if isinstance(partition, (list, tuple)) else (partition,)
+            source = "/".join([source, *map(str, parts)])
+        n = 0
+        for metric, value in aggregate_metrics(event.payload):
+            self.put(source, metric, _epoch(start), value)
+            n += 1
+        return n
+
+    def add_metrics_snapshot(self, snap: Dict[str, Any], ts: Optional[float] = None) -> int:
+        ts = time.time() if ts is None else ts
+        n = 0
+        for metric, value in numeric_leaves(snap):
+            self.put("metrics", metric, ts, value)
+            n += 1
+        return n
+
+    # -------------------------
+    # RETENTION
+    # -------------------------
+
+    # Retention runs on data time: each series is trimmed relative to its own
+    # newest point, so replayed history (old window starts) and live metrics
+    # snapshots (wall-clock timestamps) can share one store.
+
+    def _maybe_apply_retention(self) -> None:
+        if self._high_water - self._last_retention >= min(self.rollup_seconds, self.raw_retention_seconds):
+            self.apply_retention()
+
+    def apply_retention(self, now: Optional[float] = None) -> None:
+        res = self.rollup_seconds
+
+        with self._lock:
+            self._last_retention = self._high_water
+            for key, raw in self._raw.items():
+                if not raw.starts:
+                    continue
+                series_now = raw.starts[-1] if now is None else now
+                k = bisect.bisect_left(raw.starts, series_now - self.raw_retention_seconds)
+                if not k:
+                    continue
+                rollup = self._rollups.get(key)
+                if rollup is None:
+                    rollup = self._rollups[key] = _Rollup()
+                for start, value in zip(raw.starts[:k], raw.values[:k]):
+                    rollup.add((start // res) * res, value)
+                del raw.starts[:k]
+                del raw.values[:k]
+
+            for key, rollup in self._rollups.items():
+                if now is not None:
+                    series_now = now
+                else:
+                    raw = self._raw.get(key)
+                    if raw is not None and raw.starts:
+                        series_now = raw.starts[-1]
+                    elif rollup.starts:
+                        series_now = rollup.starts[-1]
+                    else:
+                        continue
+                rollup.drop_before(series_now - self.rollup_retention_seconds)
+
+    # -------------------------
+    # QUERIES
+    # -------------------------
+
+    def series(self) -> List[SeriesKey]:
+        with self._lock:
+            return sorted(set(self._raw) | set(self._rollups))
+
+    def query(
+        self,
+        source: str,
+        metric: str,
+        start: datetime | float,
+        end: datetime | float,
+    ) -> RangeResult:
+        """Raw points in [start, end); older, downsampled parts of the range return bucket means."""
+        t0, t1 = _epoch(start), _epoch(end)
+        key = (source, metric)
+        with self._lock:
+            raw = self._raw.get(key)
+            rollup = self._rollups.get(key)
+            recent = raw.range(t0, t1) if raw is not None else RangeResult(array("d"), array("d"))
+            if rollup is None:
+                return recent
+
+            raw_first = raw.starts[0] if raw is not None and raw.starts else t1
+            old = rollup.range(t0, min(t1, raw_first))
+
+        return RangeResult(old.timestamps + recent.timestamps, array("d", old.means) + recent.values)
+
+    def query_rollup(
+        self,
+        source: str,
+        metric: str,
+        start: datetime | float,
+        end: datetime | float,
+    ) -> Optional[RollupResult]:
+        with self._lock:
+            rollup = self._rollups.get((source, metric))
+            return rollup.range(_epoch(start), _epoch(end)) if rollup is not None else None
+
+    def latest(self, source: str, metric: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            raw = self._raw.get((source, metric))
+            if raw is None or not raw.starts:
+                return None
+            return raw.starts[-1], raw.values[-1]
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+
+    def dump(self, path: str | Path) -> None:
+        with self._lock:
+            data = pickle.dumps((self._raw, self._rollups), protocol=pickle.HIGHEST_PROTOCOL)
+        tmp = Path(str(path) + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def load(self, path: str | Path) -> None:
+        raw, rollups = pickle.loads(Path(path).read_bytes())
+        with self._lock:
+            self._raw, self._rollups = raw, rollups
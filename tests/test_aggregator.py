@@ -1,12 +1,21 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
+import pytest
+
 from core.models import Event, EventSource, EventType
+from metrics.collector import MetricsCollector
 from runtime.async_processor import (
     WindowBatch,
     agg_sensor_avg,
     agg_log_levels,
     agg_feed_actions,
     aggregate_batch,
+    AggregatorRegistry,
+    default_registry,
+    register_aggregator,
+    sensor_field_registry,
+    run_live_aggregation,
 )
 
 
@@ -74,3 +83,99 @@ def test_aggregate_batch_emits_per_source_aggregates():
 
     sources = {e.source for e in out}
     assert sources == {EventSource.SENSOR, EventSource.LOG, EventSource.FEED}
+
+
+def test_registry_partitions_and_counts_in_one_pass():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        mk_event(start, EventSource.SENSOR, {"value": 10}),
+        mk_event(start, EventSource.SENSOR, {"value": 30}),
+        mk_event(start, EventSource.LOG, {"level": "INFO"}),
+    ]
+    batch = WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)
+
+    result = default_registry().aggregate(batch)
+
+    assert result.count_by_source == {"sensor": 2, "log": 1, "feed": 0}
+    assert [e.source for e in result.aggregates] == [EventSource.SENSOR, EventSource.LOG]
+    assert result.aggregates[0].payload["value"] == 20
+
+
+def test_registry_supports_custom_keys():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        mk_event(start, EventSource.SENSOR, {"sensor_id": "a", "value": 1}),
+        mk_event(start, EventSource.SENSOR, {"sensor_id": "b", "value": 5}),
+        mk_event(start, EventSource.SENSOR, {"sensor_id": "a", "value": 3}),
+    ]
+    batch = WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)
+
+    registry = AggregatorRegistry(key_fn=lambda e: e.payload.get("sensor_id"))
+    registry.register("a", agg_sensor_avg, source=EventSource.SENSOR)
+
+    registry.register("b", agg_sensor_avg, source=EventSource.SENSOR)
+
+    out = aggregate_batch(batch, registry)
+    assert [(e.payload["partition"], e.payload["value"]) for e in out] == [("a", 2), ("b", 5)]
+    assert "partition" not in aggregate_batch(batch)[0].payload
+
+
+def test_sensor_field_registry_partitions_unknown_keys():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        mk_event(start, EventSource.SENSOR, {"sensor_id": "a", "value": 1}),
+        mk_event(start, EventSource.SENSOR, {"sensor_id": "b", "value": 5}),
+        mk_event(start, EventSource.SENSOR, {"value": 7}),
+        mk_event(start, EventSource.LOG, {"level": "INFO"}),
+    ]
+    batch = WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)
+
+    out = aggregate_batch(batch, sensor_field_registry("sensor_id"))
+
+    by_key = {e.payload.get("partition", e.source): e.payload for e in out}
+    assert {k: p.get("value") for k, p in by_key.items()} == {EventSource.SENSOR: 7, EventSource.LOG: None, "a": 1, "b": 5}
+
+
+def test_registry_rejects_custom_key_without_source():
+    with pytest.raises(ValueError):
+        AggregatorRegistry().register("custom", agg_sensor_avg)
+    with pytest.raises(ValueError):
+        register_aggregator("custom", agg_sensor_avg, source=EventSource.SENSOR)
+
+
+def test_window_records_event_time_range():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        mk_event(start + timedelta(seconds=s), EventSource.SENSOR, {"value": 1})
+        for s in (1, 4, 2)
+    ]
+    batch = WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)
+
+    window = aggregate_batch(batch)[0].payload["window"]
+
+    assert window["event_time"] == {
+        "min": (start + timedelta(seconds=1)).isoformat(),
+        "max": (start + timedelta(seconds=4)).isoformat(),
+        "mean": (start + timedelta(microseconds=2333333)).isoformat(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_live_aggregation_records_result_freshness():
+    now = datetime.now(timezone.utc)
+    in_q: asyncio.Queue = asyncio.Queue()
+    out_q: asyncio.Queue = asyncio.Queue()
+    for age in (3.0, 1.0):
+        in_q.put_nowait(mk_event(now - timedelta(seconds=age), EventSource.SENSOR, {"value": 1}))
+    metrics = MetricsCollector()
+
+    task = asyncio.create_task(run_live_aggregation(in_q, out_q, timedelta(seconds=3600), asyncio.Event(), metrics=metrics))
+    while not in_q.empty():
+        await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    fresh = metrics.snapshot()["result_freshness_ms"]["sensor"]
+    assert fresh["oldest"]["count"] == 1
+    assert 3000 <= fresh["oldest"]["p50_ms"] < 4000
+    assert 1000 <= fresh["newest"]["p50_ms"] < 2000
@@ -0,0 +1,36 @@
+import json
+
+from benchmarks.run import compare, main, run_suite
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "results": {"a": {"ops_per_sec": 100.0}, "b": {"ops_per_sec": 100.0}, "c": {"ops_per_sec": 100.0}},
+        "tolerances": {"c": 0.5},
+    }
+    current = {"results": {"a": {"ops_per_sec": 85.0}, "b": {"ops_per_sec": 75.0}, "c": {"ops_per_sec": 60.0}, "new": {"ops_per_sec": 1.0}}}
+
+    rows = {r["name"]: r for r in compare(current, baseline, tolerance=0.2)}
+
+    assert set(rows) == {"a", "b", "c"}
+    assert not rows["a"]["regressed"]
+    assert rows["b"]["regressed"]
+    assert not rows["c"]["regressed"]
+
+
+def test_suite_runs_and_fails_against_inflated_baseline(tmp_path):
+    out = run_suite(n=200, repeat=1, only=["codec"])
+    assert set(out["results"]) == {"codec.encode", "codec.decode"}
+
+    baseline = tmp_path / "baseline.json"
+    assert main(["--n", "200", "--repeat", "1", "--only", "codec", "--baseline", str(baseline), "--save-baseline"]) == 0
+
+    data = json.loads(baseline.read_text())
+    for r in data["results"].values():
+        r["ops_per_sec"] *= 100
+    baseline.write_text(json.dumps(data))
+
+    results = tmp_path / "results.json"
+    rc = main(["--n", "200", "--repeat", "1", "--only", "codec", "--baseline", str(baseline), "--output", str(results)])
+    assert rc == 1
+    assert "codec.encode" in json.loads(results.read_text())["results"]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from benchmarks.capacity import CapacityConfig, Slo, find_capacity
+from core.bus import EventBus
+from sources.ramp_source import RampSource
+
+
+@pytest.mark.asyncio
+async def test_ramp_source_offers_the_configured_rate():
+    bus = EventBus(merged_queue_size=10000, enable_per_source_queues=False)
+    stop = asyncio.Event()
+    src = RampSource(bus, stop, rate_eps=2000, tick_seconds=0.01)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    task = asyncio.create_task(src.run())
+    await asyncio.sleep(0.5)
+    stop.set()
+    await task
+    elapsed = loop.time() - started
+
+    # bound by the measured run time: the bucket only owes what accrued while it ran
+    assert 2000 * (elapsed - 0.15) <= src.published_total <= 2000 * elapsed + 1
+    assert src.accepted_total == src.published_total
+    assert len({e.id for e in src.make_events(3)}) == 3
+
+
+@pytest.mark.asyncio
+async def test_find_capacity_brackets_the_cliff():
+    # 500 eps arrives ~5 events per tick; 50k eps overflows a 50-slot queue every tick
+    report = await find_capacity(
+        CapacityConfig(merged_queue_size=50),
+        Slo(max_drop_ratio=0.0),
+        start_eps=500,
+        factor=100,
+        max_eps=1_000_000,
+        step_seconds=0.3,
+        refine=1,
+    )
+
+    first, second = report.steps[0], report.steps[1]
+    assert first.sustainable and first.drop_ratio == 0.0
+    assert not second.sustainable and second.drop_ratio > 0.0
+    assert len(report.steps) == 3
+    assert 500 <= report.max_sustainable_eps < 50_000
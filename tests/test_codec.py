@@ -0,0 +1,81 @@
+import json
+import pickle
+from datetime import datetime, timedelta, timezone
+
+from core.codec import decode_event, decode_events, decode_value, encode_event, encode_events, encode_value
+from core.models import Event, EventSource
+from core.serialization import event_to_dict
+from runtime.async_processor import WindowBatch, aggregate_batch
+
+
+T0 = datetime(2026, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def sample_events():
+    return [
+        Event(
+            source=EventSource.SENSOR,
+            timestamp=T0,
+            payload={"sensor_id": "sensor-1", "metric": "temperature", "value": 20.125, "unit": "°C", "location": "lab-1"},
+            tags={"metric": "temperature", "sensor_id": "sensor-1"},
+        ),
+        Event(
+            source=EventSource.LOG,
+            timestamp=T0 + timedelta(milliseconds=5),
+            payload={"level": "ERROR", "message": "Error while processing request", "service": "auth", "host": "node-1"},
+            tags={"service": "auth", "level": "ERROR"},
+            correlation_id="req-42",
+        ),
+        Event(
+            source=EventSource.FEED,
+            timestamp=T0 + timedelta(milliseconds=9),
+            payload={"user_id": "user-1", "action": "login", "resource": "/home", "success": True, "timestamp": T0.isoformat()},
+            tags={"action": "login", "success": "True"},
+        ),
+        Event(id="custom-id", source=EventSource.FEED, timestamp=T0, payload={"nested": [1, -2, 3.5, None, {"k": "v"}]}),
+    ]
+
+
+def test_events_roundtrip_exactly():
+    events = sample_events()
+    assert decode_events(encode_events(events)) == events
+
+
+def test_aggregated_payload_roundtrip():
+    batch = WindowBatch(start=T0.replace(microsecond=0), end=T0.replace(microsecond=0) + timedelta(seconds=5), events=sample_events()[:3])
+    aggs = aggregate_batch(batch)
+    assert decode_events(encode_events(aggs)) == aggs
+
+
+def test_decodes_from_memoryview_slice():
+    ev = sample_events()[1]
+    data = b"xx" + encode_event(ev)
+    assert decode_event(memoryview(data)[2:]) == ev
+
+
+def test_value_roundtrip():
+    snap = {"ingested_total": 10, "rates_eps": {"ingest": 1.5}, "last_window": None, "ok": True}
+    assert decode_value(encode_value(snap)) == snap
+
+
+def test_smaller_than_pickle_and_json():
+    events = [e for _ in range(50) for e in sample_events()[:3]]
+    size = len(encode_events(events))
+    assert size < len(pickle.dumps(events))
+    assert size < len(json.dumps([event_to_dict(e) for e in events]).encode())
+
+
+def test_aggregated_event_time_uses_compact_schema():
+    batch = WindowBatch(start=T0.replace(microsecond=0), end=T0.replace(microsecond=0) + timedelta(seconds=5), events=sample_events()[:1])
+    agg = aggregate_batch(batch)[0]
+    assert "event_time" in agg.payload["window"]
+    assert decode_events(encode_events([agg])) == [agg]
+
+    generic = Event(
+        id=agg.id,
+        source=agg.source,
+        event_type=agg.event_type,
+        timestamp=agg.timestamp,
+        payload={**agg.payload, "window": {**agg.payload["window"], "extra": 1}},
+    )
+    assert len(encode_event(agg)) < len(encode_event(generic)) - 40
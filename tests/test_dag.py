@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.models import Event, EventSource, EventType
+from runtime.dag import PipelineDAG
+
+
+def mk_event(ts, source=EventSource.SENSOR, payload=None):
+    return Event(
+        id="e",
+        source=source,
+        event_type=EventType.RAW,
+        timestamp=ts,
+        payload=payload or {"value": 1},
+    )
+
+
+def test_shared_prefix_runs_once_per_event():
+    calls = []
+
+    def counting_pred(ev):
+        calls.append(ev)
+        return True
+
+    dag = PipelineDAG().filter(counting_pred)
+    left_out, right_out = [], []
+    left, right = dag.tee("left", "right")
+    left.sink(left_out.append)
+    right.sink(right_out.append)
+
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    ev = mk_event(t0)
+    dag.push(ev)
+
+    assert len(calls) == 1
+    assert left_out == [ev] and right_out == [ev]
+    assert left_out[0] is right_out[0]
+
+
+def test_branches_have_independent_filters_and_windows():
+    aggs, alerts = [], []
+
+    dag = PipelineDAG()
+    dag.branch("windows").window(timedelta(seconds=5)).sink(aggs.append)
+    dag.branch("alerts").filter(lambda e: e.payload.get("level") == "ERROR").sink(alerts.append)
+
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    dag.push(mk_event(t0, EventSource.LOG, {"level": "INFO"}))
+    dag.push(mk_event(t0, EventSource.LOG, {"level": "ERROR"}))
+    dag.push(mk_event(t0 + timedelta(seconds=5), EventSource.SENSOR, {"value": 3}))
+
+    assert len(alerts) == 1
+    assert len(aggs) == 1
+    assert aggs[0].event_type == EventType.AGGREGATED
+    assert aggs[0].payload["levels"] == {"INFO": 1, "ERROR": 1}
+
+    dag.flush()
+    assert len(aggs) == 2
+    assert aggs[1].source == EventSource.SENSOR
+
+
+def test_cannot_branch_after_window():
+    dag = PipelineDAG()
+    node = dag.branch("w").window(timedelta(seconds=5))
+    with pytest.raises(ValueError):
+        node.branch("x")
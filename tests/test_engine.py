@@ -0,0 +1,126 @@
+import asyncio
+import json
+import queue
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from core.models import Event
+from runtime.engine import Engine, EngineConfig
+from runtime.headless import main, run_headless
+from runtime.sampling import RateLimitedSampler
+from ui.engine_bridge import _json_ready, run_engine_for_ui
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_engine_config_from_dict_rejects_unknown_keys():
+    cfg = EngineConfig.from_dict({"sources": ["ramp"], "ramp_rate_eps": 50})
+    assert cfg.sources == ("ramp",)
+
+    with pytest.raises(ValueError):
+        EngineConfig.from_dict({"merged_queue": 10})
+    with pytest.raises(ValueError):
+        Engine(EngineConfig(sources=("nope",)))
+
+
+@pytest.mark.asyncio
+async def test_run_headless_stops_at_max_events_and_flushes_last_window():
+    aggs = []
+    cfg = EngineConfig(sources=("ramp",), ramp_rate_eps=2000, merged_queue_size=1000, window_seconds=1, loop_monitor=False)
+
+    report = await run_headless(cfg, duration=10, max_events=500, on_aggregate=aggs.append)
+
+    assert report["processed_total"] >= 500
+    assert report["elapsed_seconds"] < 5
+    # the window open at shutdown is flushed and delivered too
+    assert len(aggs) == report["aggregated_total"] > 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_a_full_aggregate_queue():
+    aggs = []
+    # every window partition is flushed at shutdown into a one-slot queue
+    cfg = EngineConfig(
+        sources=("sensor", "log", "feed"), source_rate_eps=200, seed=1,
+        window_seconds=3600, sink_queue_size=1, loop_monitor=False,
+    )
+
+    report = await asyncio.wait_for(run_headless(cfg, duration=0.5, on_aggregate=aggs.append), 10)
+
+    assert len(aggs) == report["aggregated_total"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_sqlite_sink_stops_without_a_pending_aggregate(tmp_path):
+    # with checkpoints the open window is kept, not flushed, so nothing wakes the sink at shutdown
+    cfg = EngineConfig(
+        sources=("ramp",), ramp_rate_eps=500, window_seconds=3600, loop_monitor=False,
+        sqlite_path=str(tmp_path / "aggs.db"), checkpoint_dir=str(tmp_path / "ck"),
+    )
+
+    report = await asyncio.wait_for(run_headless(cfg, duration=0.5), 10)
+
+    assert report["processed_total"] > 0
+    assert report["aggregated_total"] == 0
+
+
+def test_cli_reads_config_file_and_streams_jsonl(tmp_path):
+    config = tmp_path / "engine.toml"
+    config.write_text('sources = ["ramp"]\nramp_rate_eps = 1000\nmerged_queue_size = 500\nloop_monitor = false\n')
+    out = tmp_path / "aggs.jsonl"
+    report = tmp_path / "report.json"
+
+    code = main([
+        "--config", str(config), "--window-seconds", "1", "--duration", "1.2",
+        "--jsonl", str(out), "--report-json", str(report),
+    ])
+
+    assert code == 0
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    data = json.loads(report.read_text())
+    assert len(rows) == data["aggregated_total"] > 0
+    assert all(r["event_type"] == "aggregated" for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_ui_bridge_batches_json_ready_envelopes_per_tick():
+    out_q: "queue.Queue" = queue.Queue()
+    stop = asyncio.Event()
+    cfg = EngineConfig(sources=("ramp",), ramp_rate_eps=1000, window_seconds=1, metrics_interval_seconds=0.2)
+
+    sampler = RateLimitedSampler(0.1)
+    task = asyncio.create_task(run_engine_for_ui(stop, out_q, cfg, tick_seconds=0.05, sampler=sampler))
+    await asyncio.sleep(1.5)
+    stop.set()
+    await asyncio.wait_for(task, 5)
+
+    envelopes = [out_q.get_nowait() for _ in range(out_q.qsize())]
+    assert {e["type"] for e in envelopes} == {"event", "agg", "metrics"}
+    # one envelope per type per tick, every item already JSON-ready
+    assert len(envelopes) < 3 * 1.5 / 0.05 + 3
+    json.dumps([e["items"] for e in envelopes])
+    assert all(isinstance(item["timestamp"], str) for e in envelopes if e["type"] != "metrics" for item in e["items"])
+    # one snapshot per metrics envelope, stamped when it was taken
+    metrics = [e for e in envelopes if e["type"] == "metrics"]
+    assert all(len(e["items"]) == 1 for e in metrics)
+    assert [e["ts"] for e in metrics] == sorted(e["ts"] for e in metrics)
+    last = [e for e in envelopes if e["type"] == "event"][-1]["sampling"]
+    assert last["sampled_total"] + last["skipped_total"] >= 1000
+    assert last["fraction"] < 0.1
+
+
+def test_bridge_items_are_json_ready_for_any_payload():
+    when = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    item = _json_ready(Event(timestamp=when, payload={"when": when, "ids": {7}, "pair": (1, 2)}, tags={"k": "v"}))
+
+    assert json.loads(json.dumps(item))["payload"] == {"when": str(when), "ids": "{7}", "pair": [1, 2]}
+
+
+def test_headless_does_not_import_the_ui():
+    code = "import sys, runtime.headless; print(sorted(m for m in sys.modules if m.split('.')[0] in ('ui', 'streamlit', 'pyarrow')))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
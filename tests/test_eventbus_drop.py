@@ -3,6 +3,7 @@ import pytest
 
 from core.bus import EventBus
 from core.models import Event, EventSource, EventType
+from metrics.collector import MetricsCollector
 
 
 @pytest.mark.asyncio
@@ -23,3 +24,41 @@ async def test_eventbus_drops_when_merged_queue_full():
 
     assert ok1 is True
     assert ok2 is False
+
+
+@pytest.mark.asyncio
+async def test_eventbus_samples_queue_depths_off_the_publish_path():
+    metrics = MetricsCollector()
+    bus = EventBus(merged_queue_size=10, metrics=metrics, enable_per_source_queues=False)
+
+    for i in range(4):
+        await bus.publish(Event(id=str(i), source=EventSource.LOG, event_type=EventType.RAW, timestamp=None, payload={}))
+    assert metrics.queue_depths == {}
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(bus.sample_queue_depths(stop, interval_seconds=0.01, report_seconds=0.02))
+    await asyncio.sleep(0.05)
+    stop.set()
+    await task
+
+    depth = metrics.snapshot()["queue_depth"]["merged"]
+    assert depth["max"] == 4
+    assert depth["high_water"] == 4
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_matches_per_event_publish():
+    def mk(i, source):
+        return Event(id=str(i), source=source, event_type=EventType.RAW, timestamp=None, payload={})
+
+    events = [mk(i, EventSource.LOG if i % 3 else EventSource.SENSOR) for i in range(10)]
+    one, batched = MetricsCollector(), MetricsCollector()
+    bus_one = EventBus(per_source_queue_size=2, merged_queue_size=6, metrics=one)
+    bus_batched = EventBus(per_source_queue_size=2, merged_queue_size=6, metrics=batched)
+
+    accepted = [await bus_one.publish(e) for e in events].count(True)
+
+    assert await bus_batched.publish_batch(events) == accepted == 6
+    for attr in ("ingested_total", "ingested_by_source", "dropped_total", "dropped_by_source"):
+        assert getattr(batched, attr) == getattr(one, attr)
+    assert bus_batched.queue_sizes() == bus_one.queue_sizes()
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from metrics.collector import MetricsCollector
+from metrics.exposition import CONTENT_TYPE, MetricsServer, render_openmetrics
+
+
+def populated() -> MetricsCollector:
+    m = MetricsCollector()
+    for _ in range(3):
+        m.record_ingest("sensor", dropped=False)
+    m.record_ingest("log", dropped=True)
+    for ms in (1.0, 2.0, 4.0):
+        m.record_processed("sensor", ms)
+    m.record_queue_sample({"merged": 5})
+    m.roll_queue_depths()
+    m.record_stage("queue_wait", 0.5)
+    m.record_sink_flush("parquet", 10, 3.0)
+    return m
+
+
+def test_render_openmetrics_families():
+    text = render_openmetrics(populated())
+    lines = text.splitlines()
+
+    assert lines[-1] == "# EOF"
+    assert "# TYPE pipeline_events_ingested counter" in lines
+    assert 'pipeline_events_ingested_total{source="sensor"} 3' in lines
+    assert 'pipeline_events_dropped_total{source="log"} 1' in lines
+    assert "# TYPE pipeline_event_processing_latency_seconds summary" in lines
+    assert 'pipeline_event_processing_latency_seconds_count{source="sensor"} 3' in lines
+    assert 'pipeline_event_processing_latency_seconds_sum{source="sensor"} 0.007' in lines
+    assert any(l.startswith('pipeline_event_processing_latency_seconds{source="sensor",quantile="0.99"}') for l in lines)
+    assert 'pipeline_queue_depth{queue="merged",stat="max"} 5' in lines
+    assert 'pipeline_queue_depth_high_water{queue="merged"} 5' in lines
+    assert 'pipeline_stage_latency_seconds_count{stage="queue_wait"} 1' in lines
+    assert 'pipeline_sink_rows_total{sink="parquet"} 10' in lines
+
+
+def test_empty_collector_omits_per_source_families():
+    text = render_openmetrics(MetricsCollector())
+    assert text.endswith("# EOF\n")
+    assert "pipeline_events_ingested_total" not in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_scrapes():
+    server = MetricsServer(populated(), port=0)
+    await server.start()
+    try:
+        async def get(path: str) -> bytes:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+            return data
+
+        ok = await get("/metrics")
+        assert ok.startswith(b"HTTP/1.1 200 OK")
+        assert f"Content-Type: {CONTENT_TYPE}".encode() in ok
+        assert ok.endswith(b"# EOF\n")
+
+        missing = await get("/nope")
+        assert missing.startswith(b"HTTP/1.1 404")
+    finally:
+        await server.close()
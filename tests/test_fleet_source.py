@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from core.bus import EventBus
+from core.models import EventSource
+from runtime.engine import EngineConfig
+from runtime.headless import run_headless
+from sources.fleet_source import FleetSource
+
+
+def fleet(**kw) -> FleetSource:
+    return FleetSource(EventBus(), asyncio.Event(), **kw)
+
+
+def test_step_rotates_through_the_fleet_and_is_seeded():
+    a, b = fleet(n_sensors=100, seed=3), fleet(n_sensors=100, seed=3)
+
+    first = a.step(60, 0.0, 0.6)
+    second = a.step(60, 0.6, 1.2)
+    assert list(first.sensor) == list(range(60))
+    assert list(second.sensor) == list(range(60, 100)) + list(range(20))
+    assert np.all(np.diff(np.concatenate([first.ts, second.ts])) > 0)
+
+    assert np.array_equal(b.step(60, 0.0, 0.6).value, first.value)
+    assert not np.array_equal(fleet(n_sensors=100, seed=4).step(60, 0.0, 0.6).value, first.value)
+
+
+def test_drift_and_anomalies_are_per_sensor_state():
+    f = fleet(n_sensors=50, noise_std=0.0, drift_per_minute=60.0, anomaly_probability=0.0, seed=1)
+    f.step(50, 0.0, 1.0)
+    later = f.step(50, 10.0, 11.0)
+    # ~10s at ~1/s drift each, scaled by the per-sensor rate
+    assert 2.0 < float(np.mean(later.value - f.base)) < 18.0
+
+    f = fleet(n_sensors=10, noise_std=0.0, drift_per_minute=0.0, anomaly_probability=1.0, anomaly_ticks=3, seed=1)
+    flags = [f.step(10, float(t), float(t) + 1).anomaly.all() for t in range(4)]
+    # every sensor starts an anomaly, holds it 3 readings, then starts the next one
+    assert flags == [True, True, True, True]
+    assert np.allclose(np.abs(f.step(10, 5.0, 6.0).value - f.base), 10.0, atol=1e-3)
+
+
+def test_to_events_matches_sensor_payloads():
+    f = fleet(n_sensors=5, seed=0)
+    events = f.to_events(f.step(5, 0.0, 1.0))
+
+    assert [e.payload["sensor_id"] for e in events] == [f"sensor-{i}" for i in range(5)]
+    assert all(e.source == EventSource.SENSOR for e in events)
+    assert set(events[0].payload) == {"sensor_id", "metric", "value", "unit", "location"}
+    assert len({e.id for e in events}) == 5
+
+
+@pytest.mark.asyncio
+async def test_run_reports_every_sensor_once_per_interval():
+    bus = EventBus(merged_queue_size=100_000, enable_per_source_queues=False)
+    stop = asyncio.Event()
+    columns = []
+    src = FleetSource(bus, stop, n_sensors=2000, interval_seconds=0.5, tick_seconds=0.02, seed=0)
+    col_src = FleetSource(bus, stop, n_sensors=2000, interval_seconds=0.5, tick_seconds=0.02, on_columns=columns.append)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = [asyncio.create_task(src.run()), asyncio.create_task(col_src.run())]
+    await asyncio.sleep(0.5)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+
+    # 2000 sensors every 0.5s; bounded by the measured run time, not the nominal sleep
+    assert 4000 * (elapsed - 0.15) <= src.published_total <= 4000 * elapsed + 1
+    assert bus.get_merged_queue().qsize() == src.accepted_total == src.published_total
+    assert sum(len(c) for c in columns) == col_src.published_total
+
+
+@pytest.mark.asyncio
+async def test_engine_sizes_the_bus_and_aggregates_per_location():
+    aggs = []
+    cfg = EngineConfig(
+        sources=("fleet",), fleet_sensors=2000, seed=3, window_seconds=3600,
+        aggregate_sensors_by="location", loop_monitor=False,
+    )
+
+    report = await run_headless(cfg, duration=1.0, on_aggregate=aggs.append)
+
+    assert report["ingested_total"] > 1000
+    assert report["dropped_total"] == 0
+    assert {a.payload["partition"] for a in aggs} == {f"site-{i}" for i in range(10)}
+    assert sum(a.payload["window"]["count"] for a in aggs) == report["processed_total"]
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+import metrics.histogram as histogram
+from metrics.collector import LatencyMeter
+from metrics.histogram import LogHistogram, WindowedHistogram
+
+
+def exact_quantile(xs, q):
+    xs = sorted(xs)
+    return xs[max(0, int(-(-q * len(xs) // 1)) - 1)]
+
+
+def test_quantiles_within_relative_error():
+    rng = random.Random(1)
+    xs = [rng.lognormvariate(1.0, 1.5) for _ in range(20000)]
+    h = LogHistogram(relative_error=0.01)
+    for x in xs:
+        h.record(x)
+
+    for q in (0.5, 0.95, 0.99, 0.999):
+        est = h.quantile(q)
+        exact = exact_quantile(xs, q)
+        assert abs(est - exact) / exact <= 0.0101
+
+    assert h.mean() == pytest.approx(sum(xs) / len(xs))
+
+
+def test_merge_equals_single_histogram():
+    rng = random.Random(2)
+    a, b, both = LogHistogram(), LogHistogram(), LogHistogram()
+    for i in range(5000):
+        x = rng.expovariate(0.1)
+        (a if i % 2 else b).record(x)
+        both.record(x)
+
+    a.merge(b)
+    assert a.count == both.count
+    assert a.quantiles() == both.quantiles()
+
+
+def test_merge_rejects_different_layouts():
+    with pytest.raises(ValueError):
+        LogHistogram(relative_error=0.01).merge(LogHistogram(relative_error=0.02))
+
+
+def test_windowed_view_decays_but_cumulative_keeps_history(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(histogram, "_now_s", lambda: now[0])
+
+    w = WindowedHistogram(window_seconds=60, slices=6)
+    for _ in range(100):
+        w.record(500.0)
+    now[0] += 30
+    for _ in range(100):
+        w.record(1.0)
+
+    assert w.recent().count == 200
+    now[0] += 40
+    recent = w.recent()
+    assert recent.count == 100
+    assert recent.quantile(0.99) == pytest.approx(1.0, rel=0.01)
+    assert w.cumulative.count == 200
+
+
+def test_latency_meter_snapshot_reports_tail_percentiles():
+    m = LatencyMeter()
+    for i in range(1, 1001):
+        m.add(float(i))
+    snap = m.snapshot()
+    assert snap["count"] == 1000
+    assert snap["p99_ms"] == pytest.approx(990, rel=0.01)
+    assert snap["p999_ms"] == pytest.approx(999, rel=0.01)
@@ -0,0 +1,64 @@
+import math
+
+from ui.history import MetricsHistory, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    xs = [float(i) for i in range(1000)]
+    ys = [math.sin(i / 50) for i in range(1000)]
+    ys[437] = 25.0
+
+    idx = lttb_indices(xs, ys, 100)
+
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert idx == sorted(set(idx))
+    assert 437 in idx
+    assert lttb_indices(xs[:50], ys[:50], 100) == list(range(50))
+
+
+def test_raw_level_is_a_ring_in_time_order():
+    h = MetricsHistory(["v"], capacity=10, resolutions=())
+    for t in range(25):
+        h.append(float(t), {"v": t * 2.0})
+
+    s = h.series()
+    assert list(s["ts"]) == [float(t) for t in range(15, 25)]
+    assert list(s["v"]) == [t * 2.0 for t in range(15, 25)]
+    assert len(h) == 10
+
+
+def test_coarse_levels_hold_bucket_means():
+    h = MetricsHistory(["v"], capacity=100, resolutions=(10.0,))
+    for t in range(35):
+        h.append(float(t), {"v": float(t)})
+
+    s = h.series(level=1)
+    # buckets [0,10) [10,20) [20,30) are complete, [30,40) is still open
+    assert list(s["ts"]) == [0.0, 10.0, 20.0]
+    assert list(s["v"]) == [4.5, 14.5, 24.5]
+
+
+def test_span_seconds_per_level():
+    h = MetricsHistory(["v"], capacity=10, resolutions=(60.0,))
+    assert h.span_seconds(0) == 0.0
+    for t in range(0, 50, 2):
+        h.append(float(t), {"v": 1.0})
+
+    # raw: what the ring holds now; coarse: bucket width * capacity
+    assert h.span_seconds(0) == 18.0
+    assert h.span_seconds(1) == 600.0
+
+
+def test_chart_is_cached_until_new_points_arrive():
+    h = MetricsHistory(["a", "b"], capacity=500, resolutions=())
+    for t in range(400):
+        h.append(float(t), {"a": float(t % 7), "b": float(t % 11)})
+
+    first = h.chart(["a", "b"], max_points=50)
+    assert h.chart(["a", "b"], max_points=50) is first
+    assert 50 <= len(first["time"]) <= 100
+    assert len(first["a"]) == len(first["b"]) == len(first["time"])
+
+    h.append(400.0, {"a": 1.0, "b": 2.0})
+    assert h.chart(["a", "b"], max_points=50) is not first
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+from metrics.collector import MetricsCollector
+from runtime.loop_monitor import LoopMonitor
+
+
+async def blocker():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_lag_tasks_and_slow_callbacks():
+    metrics = MetricsCollector()
+    stop = asyncio.Event()
+    monitor = LoopMonitor(metrics, probe_interval=0.01, slow_callback_ms=50.0, task_count_interval=0.01)
+    task = asyncio.create_task(monitor.run(stop))
+
+    await asyncio.sleep(0.05)
+    await asyncio.create_task(blocker())
+    await asyncio.sleep(0.1)
+    stop.set()
+    await task
+
+    loop = metrics.snapshot()["loop"]
+    assert loop["lag_ms"]["count"] > 0
+    assert loop["lag_ms"]["p999_ms"] >= 100
+    assert loop["tasks"].get("LoopMonitor.run") == 1
+
+    assert loop["slow_callbacks_total"] == 1
+    slow = loop["slow_callbacks"][0]
+    assert slow["task"] == "blocker"
+    assert "blocker" in slow["where"]
+    assert 100 <= slow["blocked_ms"] <= 400
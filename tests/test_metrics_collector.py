@@ -0,0 +1,77 @@
+import pytest
+
+import metrics.collector as collector
+from metrics.collector import MetricsCollector, RateMeter
+
+
+class FakeClock:
+    def __init__(self, t: float = 1000.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(collector, "_now_s", c)
+    return c
+
+
+def test_rate_meter_counts_within_window(clock):
+    meter = RateMeter(window_seconds=10.0, bucket_seconds=0.1)
+    meter.mark()
+    meter.mark(49)
+    clock.t += 5.0
+    meter.mark(50)
+
+    assert meter.rate_per_sec() == pytest.approx(10.0)
+
+
+def test_rate_meter_expires_old_buckets(clock):
+    meter = RateMeter(window_seconds=10.0, bucket_seconds=0.1)
+    meter.mark(100)
+    clock.t += 9.95
+    assert meter.count() == 100
+
+    clock.t += 0.1
+    assert meter.count() == 0
+
+    # a bucket slot reused after a full lap must not keep its old count
+    meter.mark(3)
+    assert meter.count() == 3
+
+
+def test_rate_meter_memory_is_constant(clock):
+    meter = RateMeter(window_seconds=10.0, bucket_seconds=0.1)
+    for _ in range(1000):
+        meter.mark(1000)
+        clock.t += 0.01
+    assert len(meter._counts) == 100
+    assert meter.count() == 1000 * 1000
+
+
+def test_collector_snapshot_rates(clock):
+    m = MetricsCollector()
+    for _ in range(20):
+        m.record_processed("sensor", 1.0)
+    snap = m.snapshot()
+    assert snap["rates_eps"]["process"] == pytest.approx(2.0)
+    assert snap["per_source_processing"]["sensor"]["process_eps"] == pytest.approx(2.0)
+
+
+def test_queue_depth_interval_stats_and_high_water():
+    m = MetricsCollector()
+    for depth in (3, 7, 2):
+        m.record_queue_sample({"merged": depth})
+    m.roll_queue_depths()
+    m.record_queue_sample({"merged": 1})
+
+    snap = m.snapshot()
+    assert snap["queue_sizes"] == {"merged": 1}
+    assert snap["queue_depth"]["merged"] == {"min": 2, "max": 7, "mean": 4.0, "high_water": 7}
+
+    m.roll_queue_depths()
+    depth = m.snapshot()["queue_depth"]["merged"]
+    assert (depth["min"], depth["max"], depth["high_water"]) == (1, 1, 7)
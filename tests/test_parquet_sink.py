@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pyarrow.dataset as ds
+import pytest
+
+from core.models import Event, EventSource, EventType
+from runtime.async_processor import WindowBatch, aggregate_batch
+from sinks.parquet_sink import ParquetSink
+
+
+def mk_aggs():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"value": 10.0}),
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"value": 20.0}),
+        Event(source=EventSource.LOG, timestamp=start, payload={"level": "INFO"}),
+    ]
+    return aggregate_batch(WindowBatch(start=start, end=start + timedelta(seconds=5), events=events))
+
+
+@pytest.mark.asyncio
+async def test_writes_partitioned_parquet(tmp_path):
+    sink = ParquetSink(tmp_path, max_rows=2)
+    for agg in mk_aggs():
+        sink.add(agg)
+    sink.add(Event(source=EventSource.LOG, event_type=EventType.RAW))
+    await sink.close()
+
+    assert sink.rows_written == 2
+    assert (tmp_path / "source=sensor" / "date=2026-01-01").is_dir()
+
+    table = ds.dataset(tmp_path, format="parquet", partitioning="hive").to_table()
+    rows = {r["aggregation"]: r for r in table.to_pylist()}
+    assert rows["avg"]["value"] == 15.0
+    assert rows["avg"]["event_count"] == 2
+    assert '"INFO": 1' in rows["count_by_level"]["payload_json"]
+
+
+@pytest.mark.asyncio
+async def test_run_flushes_on_stop(tmp_path):
+    q: asyncio.Queue = asyncio.Queue(maxsize=10)
+    stop = asyncio.Event()
+    sink = ParquetSink(tmp_path, max_rows=100, max_interval_seconds=60)
+    task = asyncio.create_task(sink.run(q, stop))
+
+    for agg in mk_aggs():
+        await q.put(agg)
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert sink.rows_written == 2
+    assert sink.files_written == 2
+
+
+@pytest.mark.asyncio
+async def test_flush_blocks_while_writes_are_pending(tmp_path, monkeypatch):
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    sink = ParquetSink(tmp_path, max_rows=1, max_pending_writes=1)
+
+    def slow_write(rows, seq):
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        return 1
+
+    monkeypatch.setattr(sink, "write_rows", slow_write)
+
+    aggs = mk_aggs()
+    sink.add(aggs[0])
+    await sink.flush()
+    sink.add(aggs[1])
+    second = asyncio.create_task(sink.flush())
+    await asyncio.sleep(0.05)
+    assert not second.done()
+
+    release.set()
+    await second
+    await sink.close()
+    assert sink.rows_written == 2
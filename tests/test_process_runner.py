@@ -0,0 +1,68 @@
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from core.models import Event, EventSource, EventType
+from core.serialization import event_to_dict
+from runtime.engine import EngineConfig
+from runtime.sampling import ReservoirSampler
+from storage.timeseries import TimeSeriesStore
+from ui.process_runner import _pump, decode_frame, encode_frame, start_engine_process
+from ui.runner import stop_background_loop
+
+
+def test_frame_roundtrip_keeps_envelopes():
+    ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    raw = Event(source=EventSource.SENSOR, event_type=EventType.RAW, timestamp=ts, payload={"value": 1.5})
+    agg = Event(source=EventSource.LOG, event_type=EventType.AGGREGATED, timestamp=ts, payload={"counts": {"INFO": 3}})
+    envelopes = [
+        {"type": "event", "ts": 1.0, "items": [event_to_dict(raw)]},
+        {"type": "metrics", "ts": 2.0, "items": [{"processed_total": 7, "loop": {"lag_ms": {"p99_ms": None}}}]},
+        {"type": "agg", "ts": 3.0, "items": [event_to_dict(agg)]},
+    ]
+
+    assert decode_frame(encode_frame(envelopes)) == envelopes
+
+
+def test_pump_sends_unencodable_payloads_as_strings():
+    class Conn:
+        def __init__(self):
+            self.frames = []
+
+        def send_bytes(self, buf):
+            self.frames.append(buf)
+
+    when = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    out_q: "queue.Queue" = queue.Queue()
+    out_q.put({"type": "agg", "ts": 1.0, "items": [{"payload": {"when": when, "ok": 1}}]})
+    out_q.put({"type": "metrics", "ts": 2.0, "items": [{"processed_total": 7}]})
+    done = threading.Event()
+    done.set()
+    conn = Conn()
+
+    _pump(out_q, conn, done)
+
+    assert [env for frame in conn.frames for env in decode_frame(frame)] == [
+        {"type": "agg", "ts": 1.0, "items": [{"payload": {"when": str(when), "ok": 1}}]},
+        {"type": "metrics", "ts": 2.0, "items": [{"processed_total": 7}]},
+    ]
+
+
+def test_engine_process_streams_to_the_ui_queue_and_stops():
+    store = TimeSeriesStore()
+    cfg = EngineConfig(sources=("ramp",), ramp_rate_eps=500, window_seconds=1, metrics_interval_seconds=0.3)
+    state = start_engine_process(cfg, store, sampler=ReservoirSampler(k=5))
+
+    kinds = set()
+    deadline = time.monotonic() + 15
+    while {"event", "agg", "metrics"} - kinds and time.monotonic() < deadline:
+        kinds.add(state.out_queue.get(timeout=15)["type"])
+
+    stop_background_loop(state)
+    state.thread.join(10)
+
+    assert kinds == {"event", "agg", "metrics"}
+    assert not state.thread.is_alive()
+    assert state.process.exitcode == 0
+    assert ("metrics", "processed_total") in store.series()
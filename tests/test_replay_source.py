@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.bus import EventBus
+from core.event_log import EventLog
+from core.models import Event, EventSource, EventType
+from core.serialization import event_from_dict, event_to_dict
+from sources.replay_source import ReplaySource
+
+
+def mk_event(i, step=timedelta(seconds=1)):
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    return Event(
+        id=f"e{i}",
+        source=EventSource.LOG,
+        event_type=EventType.RAW,
+        timestamp=t0 + i * step,
+        payload={"level": "INFO"},
+        tags={"level": "INFO"},
+    )
+
+
+def test_event_dict_roundtrip():
+    ev = mk_event(3)
+    assert event_from_dict(json.loads(json.dumps(event_to_dict(ev)))) == ev
+
+
+@pytest.mark.asyncio
+async def test_replays_jsonl_as_fast_as_possible(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text("\n".join(json.dumps(event_to_dict(mk_event(i))) for i in range(1000)))
+
+    bus = EventBus(merged_queue_size=2000, enable_per_source_queues=False)
+    src = ReplaySource(bus, asyncio.Event(), path, batch_size=100)
+    await src.run()
+
+    q = bus.get_merged_queue()
+    assert src.published_total == 1000
+    assert q.qsize() == 1000
+    assert q.get_nowait().id == "e0"
+
+
+@pytest.mark.asyncio
+async def test_replays_event_log_paced_by_timestamps(tmp_path):
+    log = EventLog(tmp_path / "log")
+    for i in range(5):
+        log.append(mk_event(i, step=timedelta(milliseconds=100)))
+    log.close()
+
+    bus = EventBus(merged_queue_size=100, enable_per_source_queues=False)
+    src = ReplaySource(bus, asyncio.Event(), tmp_path / "log", speed=4.0)
+
+    t0 = time.monotonic()
+    await src.run()
+    elapsed = time.monotonic() - t0
+
+    assert bus.get_merged_queue().qsize() == 5
+    # 400ms of recorded time at 4x speed
+    assert 0.08 <= elapsed < 0.5
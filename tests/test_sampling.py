@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.models import Event, EventSource, EventType
+from runtime.sampling import EventSampler, RateLimitedSampler, ReservoirSampler
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def mk(i: int, source=EventSource.SENSOR, level=None) -> Event:
+    payload = {"value": i} if level is None else {"level": level, "message": "x"}
+    return Event(source=source, event_type=EventType.RAW, timestamp=T0 + timedelta(milliseconds=i), payload=payload)
+
+
+def test_rate_limited_keeps_one_per_source_and_always_errors():
+    s = RateLimitedSampler(interval_seconds=60)
+    for i in range(100):
+        s.offer(mk(i))
+        s.offer(mk(i, EventSource.LOG, "INFO"))
+    s.offer(mk(200, EventSource.LOG, "ERROR"))
+
+    picked = s.drain()
+    assert [e.payload.get("level") for e in picked] == [None, "INFO", "ERROR"]
+    assert (s.sampled_total, s.skipped_total) == (3, 198)
+    assert s.drain() == []
+
+
+def test_sampler_needs_a_selection_rule():
+    with pytest.raises(TypeError):
+        EventSampler()
+
+
+def test_errors_always_can_be_disabled():
+    s = RateLimitedSampler(interval_seconds=60, errors_always=False)
+    for i in range(5):
+        s.offer(mk(i, EventSource.LOG, "CRITICAL"))
+    assert len(s.drain()) == 1
+
+
+def test_reservoir_is_uniform_per_drain_interval():
+    s = ReservoirSampler(k=10, seed=1)
+    hits = [0] * 100
+    for _ in range(500):
+        for i in range(100):
+            s.offer(mk(i))
+        picked = s.drain()
+        assert len(picked) == 10
+        assert picked == sorted(picked, key=lambda e: e.timestamp)
+        for e in picked:
+            hits[e.payload["value"]] += 1
+
+    # every position expected 50 times; a cut-off sampler would never show the tail
+    assert min(hits) > 20 and max(hits) < 90
+    assert s.sampled_total == 5000 and s.skipped_total == 45000
+    assert s.fraction == 0.1
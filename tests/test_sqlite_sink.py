@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.models import Event, EventSource, EventType
+from metrics.collector import MetricsCollector
+from runtime.async_processor import WindowBatch, aggregate_batch
+from sinks.sqlite_sink import SQLiteSink
+
+
+def mk_aggs(start):
+    events = [
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"value": 1.0}),
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"value": 3.0}),
+        Event(source=EventSource.FEED, timestamp=start, payload={"action": "login", "success": True}),
+    ]
+    return aggregate_batch(WindowBatch(start=start, end=start + timedelta(seconds=5), events=events))
+
+
+@pytest.mark.asyncio
+async def test_writes_batches_and_reports_metrics(tmp_path):
+    metrics = MetricsCollector()
+    sink = SQLiteSink(tmp_path / "out.db", batch_size=100, flush_interval_seconds=0.05, metrics=metrics)
+
+    q: asyncio.Queue = asyncio.Queue()
+    stop = asyncio.Event()
+    task = asyncio.create_task(sink.run(q, stop))
+
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    for i in range(3):
+        for agg in mk_aggs(t0 + timedelta(seconds=5 * i)):
+            await q.put(agg)
+    await q.put(Event(source=EventSource.LOG, event_type=EventType.ALERT, timestamp=t0, payload={"level": "CRITICAL"}))
+
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if sink.rows_written == 7:
+            break
+
+    rows = sink.query_aggregates(source="sensor", start=t0.timestamp() + 1)
+    assert [r["value"] for r in rows] == [2.0, 2.0]
+
+    with sink.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 1
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    snap = metrics.snapshot()["sinks"]["sqlite"]
+    assert snap["rows_total"] == 7
+    assert snap["flush_latency_ms"]["avg_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drain_waits_for_a_full_writer_queue(tmp_path):
+    path = tmp_path / "out.db"
+    sink = SQLiteSink(path, queue_size=4)
+
+    q: asyncio.Queue = asyncio.Queue()
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    for i in range(25):
+        for agg in mk_aggs(t0 + timedelta(seconds=5 * i)):
+            q.put_nowait(agg)
+    stop = asyncio.Event()
+    stop.set()
+
+    await asyncio.wait_for(sink.run(q, stop), 10)
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM aggregates").fetchone()[0] == 50
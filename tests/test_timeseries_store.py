@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+from core.models import Event, EventSource
+from runtime.async_processor import WindowBatch, aggregate_batch, sensor_field_registry
+from storage.timeseries import TimeSeriesStore
+
+
+def test_range_query_is_half_open_and_sorted():
+    store = TimeSeriesStore()
+    for t in (30.0, 10.0, 20.0, 40.0):
+        store.put("sensor", "sensor.value", t, t / 10)
+
+    res = store.query("sensor", "sensor.value", 10.0, 40.0)
+    assert res.points() == [(10.0, 1.0), (20.0, 2.0), (30.0, 3.0)]
+
+
+def test_aggregates_are_indexed_by_source_metric_and_window():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"value": 4.0}),
+        Event(source=EventSource.LOG, timestamp=start, payload={"level": "ERROR"}),
+    ]
+    store = TimeSeriesStore()
+    for agg in aggregate_batch(WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)):
+        store.add_aggregate(agg)
+
+    assert ("sensor", "sensor.value") in store.series()
+    assert store.latest("log", "levels.ERROR") == (start.timestamp(), 1.0)
+    assert store.latest("sensor", "window.count") == (start.timestamp(), 1.0)
+
+
+def test_partitioned_aggregates_get_their_own_series():
+    start = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    events = [
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"location": "site-0", "value": 1.0}),
+        Event(source=EventSource.SENSOR, timestamp=start, payload={"location": "site-1", "value": 2.0}),
+    ]
+    batch = WindowBatch(start=start, end=start + timedelta(seconds=5), events=events)
+    store = TimeSeriesStore()
+    for agg in aggregate_batch(batch, sensor_field_registry("location")):
+        store.add_aggregate(agg)
+
+    assert store.latest("sensor/site-0", "sensor.value") == (start.timestamp(), 1.0)
+    assert store.latest("sensor/site-1", "sensor.value") == (start.timestamp(), 2.0)
+    assert ("sensor", "sensor.value") not in store.series()
+
+
+def test_retention_downsamples_then_drops():
+    store = TimeSeriesStore(raw_retention_seconds=100, rollup_seconds=10, rollup_retention_seconds=1000)
+    for t in range(0, 200, 2):
+        store.put("metrics", "rates_eps.ingest", float(t), float(t))
+
+    store.apply_retention(now=200.0)
+
+    rollup = store.query_rollup("metrics", "rates_eps.ingest", 0, 100)
+    assert list(rollup.timestamps) == [float(b) for b in range(0, 100, 10)]
+    assert list(rollup.counts) == [5] * 10
+    assert rollup.means[0] == 4.0 and rollup.maxs[0] == 8.0
+
+    mixed = store.query("metrics", "rates_eps.ingest", 80, 110)
+    assert list(mixed.timestamps) == [80.0, 90.0, 100.0, 102.0, 104.0, 106.0, 108.0]
+
+    store.apply_retention(now=1095.0)
+    assert list(store.query_rollup("metrics", "rates_eps.ingest", 0, 1000).timestamps) == [
+        float(b) for b in range(100, 200, 10)
+    ]
+
+
+def test_dump_and_load(tmp_path):
+    store = TimeSeriesStore()
+    store.put("sensor", "m", 1.0, 2.0)
+    store.dump(tmp_path / "ts.pkl")
+
+    other = TimeSeriesStore()
+    other.load(tmp_path / "ts.pkl")
+    assert other.latest("sensor", "m") == (1.0, 2.0)
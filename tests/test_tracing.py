@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.bus import EventBus
+from core.models import Event, EventSource, EventType
+from metrics.collector import MetricsCollector
+from metrics.tracing import StageTracer
+from runtime.async_processor import run_live_aggregation
+
+
+def mk_event(i, ts):
+    return Event(
+        id=f"e{i}",
+        source=EventSource.SENSOR,
+        event_type=EventType.RAW,
+        timestamp=ts,
+        payload={"value": i},
+    )
+
+
+def test_tracer_samples_one_in_n_and_caps_in_flight():
+    tracer = StageTracer(MetricsCollector(), sample_every=2, max_in_flight=3)
+    t0 = datetime.now(timezone.utc)
+    for i in range(20):
+        tracer.on_enqueue(mk_event(i, t0))
+
+    assert tracer.in_flight == 3
+    assert tracer.on_dequeue(mk_event(1, t0)) is True
+    assert tracer.on_dequeue(mk_event(1, t0)) is False
+    assert tracer.on_dequeue(mk_event(2, t0)) is False
+
+
+def test_batch_enqueue_samples_the_same_events():
+    t0 = datetime.now(timezone.utc)
+    events = [mk_event(i, t0) for i in range(23)]
+    one = StageTracer(MetricsCollector(), sample_every=4)
+    batched = StageTracer(MetricsCollector(), sample_every=4)
+
+    for e in events:
+        one.on_enqueue(e)
+    for chunk in (events[:5], events[5:6], events[6:]):
+        batched.on_enqueue_batch(chunk)
+
+    assert batched._stamps.keys() == one._stamps.keys() == {"e3", "e7", "e11", "e15", "e19"}
+
+
+@pytest.mark.asyncio
+async def test_stage_spans_reach_the_collector():
+    metrics = MetricsCollector()
+    tracer = StageTracer(metrics, sample_every=2)
+    bus = EventBus(merged_queue_size=100, metrics=metrics, enable_per_source_queues=False, tracer=tracer)
+
+    t0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    for i in range(6):
+        await bus.publish(mk_event(i, t0 + timedelta(seconds=i)))
+
+    out_q: asyncio.Queue = asyncio.Queue()
+    stop = asyncio.Event()
+    in_q = bus.get_merged_queue()
+    task = asyncio.create_task(
+        run_live_aggregation(in_q, out_q, timedelta(seconds=5), stop, metrics=metrics, tracer=tracer)
+    )
+    while not in_q.empty():
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    stages = metrics.snapshot()["stage_latency_ms"]
+    for stage in ("source_to_bus", "queue_wait", "predicates", "mappers", "window_push"):
+        assert stages[stage]["count"] == 3
+    # one window closed by event 5, one flushed on cancel
+    assert stages["aggregate"]["count"] == 2
+    assert stages["sink"]["count"] == 2
+    assert tracer.in_flight == 0
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from array import array
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep
+    the visual shape of the series. The first and last points are always
+    kept; each bucket in between contributes the point forming the largest
+    triangle with the previous pick and the next bucket's average.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    out = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        nxt_lo, nxt_hi = hi, min(int((i + 2) * every) + 1, n)
+        if nxt_hi <= nxt_lo:
+            nxt_lo, nxt_hi = n - 1, n
+        span = nxt_hi - nxt_lo
+        avg_x = sum(xs[nxt_lo:nxt_hi]) / span
+        avg_y = sum(ys[nxt_lo:nxt_hi]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+class _Level:
+    """Fixed-capacity ring of (ts, columns...) rows; ``width`` > 0 averages rows into buckets."""
+
+    __slots__ = ("width", "capacity", "ts", "cols", "written", "_bucket", "_sums", "_count")
+
+    def __init__(self, columns: Sequence[str], capacity: int, width: float):
+        self.width = width
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.cols = {c: array("d", bytes(8 * capacity)) for c in columns}
+        self.written = 0
+
+        self._bucket: Optional[float] = None
+        self._sums = dict.fromkeys(columns, 0.0)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def _put(self, ts: float, values: Mapping[str, float]) -> None:
+        i = self.written % self.capacity
+        self.ts[i] = ts
+        for c, col in self.cols.items():
+            col[i] = values[c]
+        self.written += 1
+
+    def add(self, ts: float, values: Mapping[str, float]) -> None:
+        if not self.width:
+            self._put(ts, values)
+            return
+        bucket = ts - ts % self.width
+        if self._bucket is not None and bucket != self._bucket:
+            self._put(self._bucket, {c: s / self._count for c, s in self._sums.items()})
+            self._sums = dict.fromkeys(self._sums, 0.0)
+            self._count = 0
+        self._bucket = bucket
+        for c in self._sums:
+            self._sums[c] += values[c]
+        self._count += 1
+
+    def _ordered(self, col: array) -> array:
+        if self.written <= self.capacity:
+            return col[: self.written]
+        i = self.written % self.capacity
+        return col[i:] + col[:i]
+
+    def column(self, name: str) -> array:
+        return self._ordered(self.ts if name == "ts" else self.cols[name])
+
+
+class MetricsHistory:
+    """
+    Column-oriented chart history at several resolutions.
+
+    Level 0 keeps the last ``capacity`` raw points; every entry of
+    ``resolutions`` (seconds) adds a level of the same capacity that keeps
+    bucket averages, so the default covers an hour of 2s snapshots, four
+    hours at 10s and a day at 1min. ``append`` is O(levels * columns) and
+    never touches older points; ``chart`` downsamples a level with LTTB and
+    is cached until that level receives a new row.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        capacity: int = 1800,
+        resolutions: Sequence[float] = (10.0, 60.0),
+    ):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.levels = [_Level(self.columns, capacity, 0.0)]
+        self.levels.extend(_Level(self.columns, capacity, w) for w in resolutions)
+        self._cache: Dict[Tuple, Tuple[int, Dict[str, list]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def append(self, ts: float, values: Mapping[str, float]) -> None:
+        for level in self.levels:
+            level.add(ts, values)
+
+    def clear(self) -> None:
+        self.levels = [_Level(self.columns, self.capacity, level.width) for level in self.levels]
+        self._cache.clear()
+
+    def span_seconds(self, level: int) -> float:
+        """How far back ``level`` reaches once full (raw level: by its own timestamps)."""
+        lv = self.levels[level]
+        if lv.width:
+            return lv.width * lv.capacity
+        ts = lv.column("ts")
+        return ts[-1] - ts[0] if len(ts) > 1 else 0.0
+
+    def series(self, level: int = 0) -> Dict[str, array]:
+        lv = self.levels[level]
+        return {"ts": lv.column("ts"), **{c: lv.column(c) for c in self.columns}}
+
+    def chart(self, columns: Sequence[str], max_points: int = 300, level: int = 0) -> Dict[str, list]:
+        """
+        ``{"time": [datetime...], column: [...]}`` for st.line_chart. Every
+        column is LTTB-downsampled to ``max_points`` and the union of the
+        picked rows is returned, so each series keeps its own peaks.
+        """
+        lv = self.levels[level]
+        key = (level, tuple(columns), max_points)
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] == lv.written:
+            return hit[1]
+
+        ts = lv.column("ts")
+        cols = {c: lv.column(c) for c in columns}
+        picked = set()
+        for ys in cols.values():
+            picked.update(lttb_indices(ts, ys, max_points))
+        rows = sorted(picked)
+
+        out: Dict[str, list] = {"time": [datetime.fromtimestamp(ts[i]) for i in rows]}
+        for c, ys in cols.items():
+            out[c] = [ys[i] for i in rows]
+        self._cache[key] = (lv.written, out)
+        return out
@@ -0,0 +1,129 @@
+import asyncio
+import multiprocessing as mp
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.codec import decode_value, encode_value, to_encodable
+from core.serialization import event_from_dict
+from runtime.engine import EngineConfig
+from runtime.sampling import EventSampler
+from storage.timeseries import TimeSeriesStore
+from ui.runner import RunnerState
+
+# One pipe message per frame: encode_value() of a list of engine_bridge
+# envelopes. The codec's per-frame string dictionary writes each payload key
+# and repeated value (source, level, metric names) once per frame.
+
+MAX_FRAME_MESSAGES = 512
+
+
+def encode_frame(envelopes: List[Dict[str, Any]]) -> bytes:
+    return encode_value(envelopes)
+
+
+def decode_frame(buf: bytes) -> List[Dict[str, Any]]:
+    return decode_value(buf)
+
+
+# -------------------------
+# ENGINE PROCESS
+# -------------------------
+
+def _pump(out_q: "queue.Queue[Any]", conn, done: threading.Event) -> None:
+    # batches whatever the engine queued since the last send into one frame
+    while not (done.is_set() and out_q.empty()):
+        try:
+            batch = [out_q.get(timeout=0.1)]
+        except queue.Empty:
+            continue
+        while len(batch) < MAX_FRAME_MESSAGES:
+            try:
+                batch.append(out_q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            frame = encode_frame(batch)
+        except TypeError:
+            # a payload the codec cannot represent: send those values as their str()
+            frame = encode_frame(to_encodable(batch))
+        try:
+            conn.send_bytes(frame)
+        except (BrokenPipeError, OSError):
+            return
+
+
+def _engine_process_main(conn, stop_event, config: Optional[EngineConfig], sampler: Optional[EventSampler]) -> None:
+    from ui.engine_bridge import run_engine_for_ui
+
+    out_q: "queue.Queue[Any]" = queue.Queue(maxsize=5000)
+    done = threading.Event()
+    sender = threading.Thread(target=_pump, args=(out_q, conn, done), daemon=True)
+    sender.start()
+    try:
+        asyncio.run(run_engine_for_ui(stop_event, out_q, config, sampler=sampler))
+    finally:
+        done.set()
+        sender.join()
+        conn.close()
+
+
+# -------------------------
+# UI SIDE
+# -------------------------
+
+def _read_frames(conn, out_q: "queue.Queue[Any]", store: Optional[TimeSeriesStore], process) -> None:
+    try:
+        while True:
+            try:
+                frame = conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            for env in decode_frame(frame):
+                if store is not None:
+                    if env["type"] == "agg":
+                        for agg in env["items"]:
+                            store.add_aggregate(event_from_dict(agg))
+                    elif env["type"] == "metrics":
+                        for snap in env["items"]:
+                            store.add_metrics_snapshot(snap, ts=env["ts"])
+                try:
+                    out_q.put_nowait(env)
+                except queue.Full:
+                    pass
+    finally:
+        conn.close()
+        process.join(timeout=5.0)
+
+
+def start_engine_process(
+    config: Optional[EngineConfig] = None,
+    store: Optional[TimeSeriesStore] = None,
+    sampler: Optional[EventSampler] = None,
+) -> RunnerState:
+    """
+    Runs the engine in its own process so UI reruns do not compete with it
+    for the GIL. Envelopes arrive on the returned state's ``out_queue`` in the
+    same shape as with start_background_loop; ``store`` is filled here, on
+    the UI side. The reader thread lives as long as the engine process, and
+    stop_background_loop stops both.
+    """
+    # spawn: forking a multi-threaded Streamlit server is not safe
+    ctx = mp.get_context("spawn")
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    stop_event = ctx.Event()
+
+    process = ctx.Process(
+        target=_engine_process_main,
+        args=(send_conn, stop_event, config, sampler),
+        name="pipeline-engine",
+        daemon=True,
+    )
+    process.start()
+    send_conn.close()
+
+    out_q: "queue.Queue[Any]" = queue.Queue(maxsize=5000)
+    reader = threading.Thread(target=_read_frames, args=(recv_conn, out_q, store, process), daemon=True)
+    reader.start()
+
+    return RunnerState(thread=reader, stop_event=stop_event, out_queue=out_q, process=process)
@@ -8,8 +8,10 @@ from typing import Any, Optional, Callable
 @dataclass
 class RunnerState:
     thread: Optional[threading.Thread] = None
-    stop_event: Optional[threading.Event] = None
+    # threading.Event, or a multiprocessing Event in process mode
+    stop_event: Optional[Any] = None
     out_queue: Optional["queue.Queue[Any]"] = None
+    process: Optional[Any] = None
 
 
 def start_background_loop(